@@ -11,6 +11,17 @@ pth = os.path.dirname(__file__)
 sys.path.append(pth)
 # import glob
 
+# timings depend on the machine load, they are only checked on request
+benchmark = int(os.environ.get("VCS_BENCHMARK", 0))
+
+
+def checkTiming(test, label, elapsed, limit):
+    """Prints elapsed seconds and fails test if they are over limit, only when
+    the VCS_BENCHMARK environment variable is set"""
+    if benchmark:
+        print("%s: %.3fs" % (label, elapsed))
+        test.assertLess(elapsed, limit)
+
 
 class VCSBaseTest(unittest.TestCase):
 
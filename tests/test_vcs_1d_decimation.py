@@ -0,0 +1,72 @@
+import basevcstest
+import cdms2
+import numpy
+import vcs
+
+
+class TestVCS1DDecimation(basevcstest.VCSBaseTest):
+    def __init__(self, *args, **kwargs):
+        kwargs["geometry"] = {"width": 400, "height": 300}
+        super(TestVCS1DDecimation, self).__init__(*args, **kwargs)
+
+    def hourly(self, n=200000):
+        time = cdms2.createAxis(numpy.arange(n, dtype=numpy.float64), id="time")
+        time.designateTime()
+        time.units = "hours since 1980"
+        values = numpy.sin(numpy.arange(n) / 500.) + numpy.random.RandomState(2).normal(0., .1, n)
+        data = cdms2.createVariable(values, axes=[time], id="station")
+        data[1000:1010] = numpy.ma.masked
+        return data
+
+    def testLineRuns(self):
+        x = numpy.ma.arange(10.)
+        y = numpy.ma.arange(10.) ** 2
+        y[3] = numpy.ma.masked
+        x[7] = numpy.ma.masked
+        y[9] = numpy.ma.masked
+        xs, ys = vcs.utils.lineRuns(x, y)
+        self.assertEqual([r.tolist() for r in xs], [[0., 1., 2.], [4., 5., 6.], [8.]])
+        self.assertEqual([r.tolist() for r in ys], [[0., 1., 4.], [16., 25., 36.], [64.]])
+        self.assertEqual(vcs.utils.lineRuns(numpy.ma.masked_all(3), numpy.ma.arange(3.)), ([], []))
+
+    def testDecimate(self):
+        x = numpy.arange(10000.)
+        y = numpy.random.RandomState(1).normal(size=10000)
+        columns = vcs.utils.lineColumns(x, 0., 10000., 100)
+        xd, yd = vcs.utils.decimate1D(x, y, columns, "minmax")
+        self.assertTrue(len(xd) <= 400)
+        self.assertTrue(numpy.all(numpy.diff(xd) > 0))
+        # every column keeps its extremes
+        for c in range(100):
+            kept = yd[(xd >= c * 100) & (xd < (c + 1) * 100)]
+            self.assertEqual(kept.min(), y[c * 100:(c + 1) * 100].min())
+            self.assertEqual(kept.max(), y[c * 100:(c + 1) * 100].max())
+        xd, yd = vcs.utils.decimate1D(x, y, columns, "lttb")
+        self.assertEqual(len(xd), 200)
+        self.assertEqual((xd[0], xd[-1]), (0., 9999.))
+        self.assertTrue(numpy.all(numpy.diff(xd) > 0))
+        # decreasing lines are decimated too, in their own order
+        xd, yd = vcs.utils.decimate1D(x[::-1], y[::-1], columns[::-1], "minmax")
+        self.assertTrue(len(xd) <= 400)
+        self.assertEqual(xd[0], 9999.)
+        # lines going back and forth are left alone
+        zigzag = numpy.tile([0., 1.], 5000)
+        columns = vcs.utils.lineColumns(zigzag, 0., 1., 100)
+        self.assertEqual(len(vcs.utils.decimate1D(zigzag, y, columns, "lttb")[0]), 10000)
+        with self.assertRaises(ValueError):
+            vcs.utils.decimate1D(x, y, columns, "mean")
+
+    def testPlotDecimation(self):
+        data = self.hourly()
+        for method in [True, "lttb", "mean"]:
+            dsp = self.x.plot(data, self.x.create1d(), lod=method, bg=self.bg)
+            # 2D methods fall back to the default
+            columns, used = dsp.backend["vtk_backend_lod1d"]
+            self.assertEqual(used, "lttb" if method == "lttb" else "minmax")
+            self.assertTrue(0 < columns <= 400)
+            self.x.clear()
+        dsp = self.x.plot(data, self.x.create1d(), bg=self.bg)
+        self.assertFalse("vtk_backend_lod1d" in dsp.backend)
+        self.x.clear()
+        with self.assertRaises(ValueError):
+            self.x.plot(data, self.x.create1d(), lod="minmaxx", bg=self.bg)
@@ -0,0 +1,69 @@
+import basevcstest
+import multiprocessing
+import os
+import shutil
+
+
+class TestVCSAnimateParallel(basevcstest.VCSBaseTest):
+    def testParallelFramesMatchSerial(self):
+        s = self.clt("clt", slice(0, 4))
+        gm = self.x.createboxfill()
+        self.x.plot(s, gm, bg=self.bg)
+        self.x.animate.create()
+        create_thread = self.x.animate.create_thread
+        # serial rendering first, kept as reference
+        self.assertTrue(self.x.animate.render_frames(processes=1))
+        serial = []
+        for frame_num in range(4):
+            fnm = os.path.join(self.pngsdir, "test_vcs_animate_parallel_serial_%i.png" % frame_num)
+            shutil.copy(create_thread.get_frame_name(frame_num), fnm)
+            serial.append(fnm)
+        shutil.rmtree(os.path.dirname(create_thread.get_frame_name(0)))
+
+        progress = []
+        completed = self.x.animate.render_frames(processes=2,
+                                                 progress=lambda done, total: progress.append((done, total)))
+        self.assertTrue(completed)
+        self.assertEqual(progress, [(1, 4), (2, 4), (3, 4), (4, 4)])
+        self.assertEqual(len(self.x.animate.animation_files), 4)
+        for frame_num in range(4):
+            self.checkImage(create_thread.get_frame_name(frame_num), serial[frame_num], pngReady=True)
+        shutil.rmtree(os.path.dirname(create_thread.get_frame_name(0)))
+
+    def testWorkerSetupFailure(self):
+        s = self.clt("clt", slice(0, 4))
+        self.x.plot(s, self.x.createboxfill(), bg=self.bg)
+        self.x.animate.create()
+
+        def failing(*args, **kargs):
+            raise ValueError("no canvas")
+        # the forked workers inherit the failing setup, it fails right here
+        # when no worker can be forked
+        expected = RuntimeError if self.x.animate.fork_frame_workers() else ValueError
+        self.x.animate.plot_to_canvas = failing
+        try:
+            with self.assertRaises(expected):
+                self.x.animate.render_frames(processes=2)
+        finally:
+            del self.x.animate.plot_to_canvas
+
+    def testSerialFallback(self):
+        s = self.clt("clt", slice(0, 4))
+        self.x.plot(s, self.x.createboxfill(), bg=self.bg)
+        self.x.animate.create()
+        # a canvas with a window never forks, frames are rendered here
+        bg = self.x.backend.bg
+        get_context = multiprocessing.get_context
+
+        def no_fork(*args, **kargs):
+            raise AssertionError("no process should be forked")
+        self.x.backend.bg = False
+        multiprocessing.get_context = no_fork
+        try:
+            self.assertFalse(self.x.animate.fork_frame_workers())
+            self.assertTrue(self.x.animate.render_frames(processes=2))
+        finally:
+            self.x.backend.bg = bg
+            multiprocessing.get_context = get_context
+        self.assertEqual(len(self.x.animate.animation_files), 4)
+        shutil.rmtree(os.path.dirname(self.x.animate.create_thread.get_frame_name(0)))
@@ -0,0 +1,45 @@
+import basevcstest
+import numpy
+import time
+import vcs.VTKAnimate
+
+
+class TestVCSAnimatePrefetch(basevcstest.VCSBaseTest):
+    def waitFor(self, prefetcher, frame_num):
+        for i in range(100):
+            if frame_num in prefetcher._ready:
+                return
+            time.sleep(.05)
+
+    def testPrefetchNextFrames(self):
+        s = self.clt("clt", slice(0, 6))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        prefetcher = self.x.animate.create_prefetcher(self.x)
+        dims = self.x.animate._number_of_dims_used_for_plot
+        for frame_num in range(6):
+            slices = prefetcher.get(frame_num)
+            expected = vcs.VTKAnimate.read_frame_slices(self.x, dims, frame_num)
+            self.assertTrue(numpy.ma.allequal(slices[0][0], expected[0][0]))
+            if frame_num < 5:
+                self.waitFor(prefetcher, frame_num + 1)
+        self.assertEqual((prefetcher.hits, prefetcher.misses), (5, 1))
+        prefetcher.close()
+
+    def testPrefetchMemoryCap(self):
+        s = self.clt("clt", slice(0, 6))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        frame_bytes = s[0].nbytes
+        self.assertEqual(self.x.animate.prefetch(depth=4, memory=2 * frame_bytes), (4, 2 * frame_bytes))
+        prefetcher = self.x.animate.create_prefetcher(self.x)
+        prefetcher.get(0)
+        self.waitFor(prefetcher, 2)
+        # only two frames fit in memory
+        self.assertEqual(sorted(prefetcher._ready), [1, 2])
+        prefetcher.close()
+        # no reading ahead
+        self.x.animate.prefetch(depth=0)
+        prefetcher = self.x.animate.create_prefetcher(self.x)
+        prefetcher.get(0)
+        self.assertIsNone(prefetcher._thread)
@@ -0,0 +1,120 @@
+import basevcstest
+import numpy
+import vcs.vcs2vtk
+from vtk.util import numpy_support as VN
+
+
+class TestVCSBandedFill(basevcstest.VCSBaseTest):
+    def testClassifyBands(self):
+        values = numpy.array([-1., 0., .5, 1., 1.5, 2., 3., numpy.nan])
+        band = vcs.vcs2vtk.classifyBands(values, [0., 1., 2.], [1., 2., 2.5])
+        # shared edges go to the last band, as when bands were drawn in turn
+        self.assertEqual(band.tolist(), [-1, 0, 0, 1, 1, 2, -1, -1])
+        # overlapping bands
+        band = vcs.vcs2vtk.classifyBands(values[:7], [0., .4], [10., .6])
+        self.assertEqual(band.tolist(), [-1, 0, 1, 0, 0, 0, 0])
+        # the top of a band followed by a gap is in the gap
+        self.assertEqual(vcs.vcs2vtk.classifyBands([0., 10., 15., 20.], [0., 20.], [10., 30.]).tolist(),
+                         [0, -1, -1, 1])
+        band = vcs.vcs2vtk.classifyBands([0., 10., 15., 20., 30.], [0., 20.], [10., 30.], closed=True)
+        self.assertEqual(band.tolist(), [0, 0, -1, 1, 1])
+
+    def testIsofillNonContiguousLevels(self):
+        clt = self.clt("clt")
+        gm = self.x.createisofill()
+        gm.levels = [[0, 10], [20, 30]]
+        gm.fillareacolors = [16, 200]
+        dsp = self.x.plot(clt[0], gm, bg=self.bg)
+        bands = dsp.backend["vtk_backend_bands"]
+        self.assertEqual((bands.lows, bands.highs), ([0, 20], [10, 30]))
+        scalars = VN.vtk_to_numpy(bands.filter.GetOutput().GetCellData().GetScalars())
+        # cells between 10 and 20 hold 10 and are not filled
+        self.assertTrue(numpy.any(scalars == 10.))
+        self.assertTrue(numpy.all(bands.band[scalars == 10.] == -1))
+        self.assertTrue(numpy.all(bands.band[scalars == 0.] == 0))
+        self.assertTrue(numpy.all(bands.band[scalars == 20.] == 1))
+
+    def testCustomBoxfillSinglePass(self):
+        clt = self.clt("clt")
+        gm = self.x.createboxfill()
+        gm.boxfill_type = "custom"
+        gm.levels = list(range(0, 101, 2))
+        gm.fillareacolors = vcs.getcolors(gm.levels)
+        dsp = self.x.plot(clt[0], gm, bg=self.bg)
+        bands = dsp.backend["vtk_backend_bands"]
+        self.assertFalse("vtk_backend_geofilters" in dsp.backend)
+        self.assertEqual(len(bands.lows), 50)
+        dsp.update(clt[5])
+        # only the band index was recomputed
+        self.assertIs(dsp.backend["vtk_backend_bands"], bands)
+        expected = vcs.vcs2vtk.classifyBands(numpy.ravel(clt[5].filled(0)), bands.lows, bands.highs)
+        self.assertEqual(sorted(set(bands.band)), sorted(set(expected)))
+
+    def testMeshfillPatterns(self):
+        clt = self.clt("clt")
+        gm = self.x.createmeshfill()
+        gm.levels = [0, 25, 50, 75, 100]
+        gm.fillareastyle = "hatch"
+        gm.fillareaindices = [1, 2, 3, 4]
+        dsp = self.x.plot(clt[0], gm, bg=self.bg)
+        # the banded item and one pattern per band
+        self.assertEqual(len(dsp.backend["vtk_backend_actors"]), 5)
+
+    def testPatternsFollowUpdate(self):
+        clt = self.clt("clt")
+        gm = self.x.createmeshfill()
+        gm.levels = [0, 25, 50, 75, 100]
+        gm.fillareastyle = "hatch"
+        gm.fillareaindices = [1, 2, 3, 4]
+        dsp = self.x.plot(clt[0], gm, bg=self.bg)
+        bands = dsp.backend["vtk_backend_bands"]
+        items = [item for item, first, last, args in bands.patterns]
+        self.assertEqual([a[0] for a in dsp.backend["vtk_backend_actors"][1:]], items)
+        # every cell moves to the first band, the other patterns go away
+        dsp.update(clt[0] * 0. + 10.)
+        cells = [item.GetPolyData().GetNumberOfCells() for item in items]
+        self.assertGreater(cells[0], 0)
+        self.assertEqual(cells[1:], [0, 0, 0])
+        # and every cell moves to the last band
+        dsp.update(clt[0] * 0. + 90.)
+        cells = [item.GetPolyData().GetNumberOfCells() for item in items]
+        self.assertEqual(cells[:3], [0, 0, 0])
+        self.assertGreater(cells[3], 0)
+
+    def testIsofillPatternsFollowUpdate(self):
+        clt = self.clt("clt")
+        gm = self.x.createisofill()
+        gm.levels = [0, 25, 50, 75, 100]
+        gm.fillareastyle = "hatch"
+        gm.fillareaindices = [1, 2, 3, 4]
+        dsp = self.x.plot(clt[0], gm, bg=self.bg)
+        bands = dsp.backend["vtk_backend_bands"]
+        items = [item for item, first, last, args in bands.patterns]
+        self.assertEqual(len(items), 4)
+        self.assertEqual([a[0] for a in dsp.backend["vtk_backend_actors"][-4:]], items)
+        # every cell moves to the first band, the other patterns go away
+        dsp.update(clt[0] * 0. + 10.)
+        cells = [item.GetPolyData().GetNumberOfCells() for item in items]
+        self.assertGreater(cells[0], 0)
+        self.assertEqual(cells[1:], [0, 0, 0])
+        # and every cell moves to the last band
+        dsp.update(clt[0] * 0. + 90.)
+        cells = [item.GetPolyData().GetNumberOfCells() for item in items]
+        self.assertEqual(cells[:3], [0, 0, 0])
+        self.assertGreater(cells[3], 0)
+
+    def testIsofillSingleContourPass(self):
+        clt = self.clt("clt")
+        gm = self.x.createisofill()
+        gm.levels = [0, 20, 40, 60, 80, 100]
+        # a different hatch per level makes one style group per level
+        gm.fillareastyle = "hatch"
+        gm.fillareaindices = [1, 2, 3, 4, 5]
+        dsp = self.x.plot(clt[0], gm, bg=self.bg)
+        bands = dsp.backend["vtk_backend_bands"]
+        self.assertTrue(bands.filter.IsA("vtkBandedPolyDataContourFilter"))
+        self.assertEqual(bands.filter.GetNumberOfContours(), 6)
+        self.assertEqual(len(bands.lows), 5)
+        self.assertTrue(set(bands.band) <= set(range(5)))
+        dsp.update(clt[5])
+        self.assertIs(dsp.backend["vtk_backend_bands"], bands)
@@ -0,0 +1,80 @@
+import copy
+import numpy
+import unittest
+import vcs
+
+
+class TestVCSColormapArray(unittest.TestCase):
+    def loopMatch(self, cmap, color):
+        # the per cell search match_color used to do
+        diff = None
+        for index in range(256):
+            c = cmap.index[index]
+            d = numpy.sqrt(sum((numpy.array(c[:3]) - numpy.array(color)) ** 2))
+            if diff is None or d < diff:
+                diff = d
+                match = index
+        return match
+
+    def testMatch(self):
+        cmap = vcs.getcolormap("rainbow")
+        colors = numpy.random.RandomState(3).uniform(0., 100., (20, 3))
+        expected = [self.loopMatch(cmap, c) for c in colors]
+        self.assertEqual(cmap.index.match(colors).tolist(), expected)
+        self.assertEqual(cmap.index.match(colors[4]), expected[4])
+        self.assertEqual(vcs.utils.match_color(list(colors[4]), cmap), expected[4])
+        self.assertEqual(vcs.match_color("red", "rainbow"), 242)
+        self.assertEqual(vcs.match_color([0, 0, 100], "default"), 52)
+
+    def testIndexAPI(self):
+        cmap = vcs.createcolormap()
+        self.assertEqual(cmap.getcolorcell(16), [26, 0, 33, 100])
+        self.assertEqual(len(cmap.index), 256)
+        self.assertEqual(list(cmap.index.keys()), list(range(256)))
+        self.assertTrue(16 in cmap.index)
+        self.assertFalse(256 in cmap.index)
+        version = cmap.index.version()
+        table = cmap.index.uint8()
+        self.assertTrue(cmap.index.uint8() is table)
+        cmap.setcolorcell(16, 100, 50, 0, 50)
+        self.assertEqual(cmap.index[16], [100, 50, 0, 50])
+        self.assertEqual(cmap.index.data[16], [100, 50, 0, 50])
+        self.assertGreater(cmap.index.version(), version)
+        self.assertEqual(cmap.index.uint8()[16].tolist(), [255, 128, 0, 128])
+        with self.assertRaises(ValueError):
+            cmap.index[300] = [0, 0, 0]
+
+    def testCopy(self):
+        cmap = vcs.createcolormap()
+        for other in [copy.copy(cmap.index), cmap.index.copy()]:
+            other[16] = [0, 0, 0]
+            self.assertEqual(other[16], [0, 0, 0, 100])
+            self.assertEqual(cmap.index[16], [26, 0, 33, 100])
+        # cells set through data are set in the table
+        cmap.index.data[16] = [0, 100, 0]
+        self.assertEqual(cmap.index[16], [0, 100, 0, 100])
+        with self.assertRaises(ValueError):
+            cmap.index.data[16] = [0, 200, 0]
+        with self.assertRaises(TypeError):
+            del cmap.index.data[16]
+
+    def testScriptRoundTrip(self):
+        cmap = vcs.createcolormap("array_json")
+        cmap.index[20] = [10.5, 20, 30, 40]
+        d = vcs.utils.dumpToDict(cmap)[0]
+        self.assertEqual(list(d["index"].keys()), ["data"])
+        self.assertEqual(d["index"]["data"][20], [10.5, 20, 30, 40])
+
+    def testLookupTable(self):
+        from vcs import vcs2vtk
+        cmap = vcs.createcolormap()
+        lut = vcs2vtk.colorsLookupTable(cmap, range(256))
+        self.assertEqual(lut.GetNumberOfTableValues(), 256)
+        self.assertTrue(numpy.allclose(lut.GetTableValue(16), (66 / 255., 0., 84 / 255., 1.)))
+        cmap.index[16] = [0, 0, 100]
+        modified = vcs2vtk.colorsLookupTable(cmap, [16])
+        self.assertTrue(numpy.allclose(modified.GetTableValue(0), (0., 0., 1., 1.)))
+        lut = vcs2vtk.colorsLookupTable(cmap, [16, "red", [0, 100, 0, 50]])
+        self.assertEqual(lut.GetNumberOfTableValues(), 3)
+        self.assertTrue(numpy.allclose(lut.GetTableValue(1), (1., 0., 0., 1.)))
+        self.assertTrue(numpy.allclose(lut.GetTableValue(2), (0., 1., 0., 128 / 255.)))
@@ -0,0 +1,79 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy
+from vtk.util import numpy_support as VN
+import vcs.vcs2vtk
+
+
+class TestVCSContinentsCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.orig_env = os.environ.get("UVCDAT_DIR")
+        os.environ["UVCDAT_DIR"] = self.tmpdir
+        self.orig_sidecar = vcs.vcs2vtk.continentsSidecar
+        vcs.vcs2vtk.continentsSidecar = True
+        self.fnm = os.path.join(self.tmpdir, "data_continent_test")
+        with open(self.fnm, "w") as f:
+            # a free format line and a fixed width one
+            f.write("6\n10. 20. 11. 21. 12. 22.\n")
+            f.write("4\n%8.3f%8.3f%8.3f%8.3f\n" % (-10., -20., -11., -21.))
+            f.write("-99 -99\n")
+
+    def tearDown(self):
+        if self.orig_env is None:
+            del os.environ["UVCDAT_DIR"]
+        else:
+            os.environ["UVCDAT_DIR"] = self.orig_env
+        vcs.vcs2vtk.continentsSidecar = self.orig_sidecar
+        shutil.rmtree(self.tmpdir)
+
+    def testParsedOnce(self):
+        poly = vcs.vcs2vtk.prepContinents(self.fnm)
+        self.assertEqual(poly.GetNumberOfLines(), 2)
+        pts = VN.vtk_to_numpy(poly.GetPoints().GetData())
+        self.assertTrue(numpy.allclose(pts[:, :2], [[20., 10.], [21., 11.], [22., 12.],
+                                                    [-20., -10.], [-21., -11.]]))
+        self.assertTrue(os.path.exists(vcs.vcs2vtk.continentsSidecarPath(self.fnm)))
+        # the cached copy is not affected by changes to the returned one
+        poly.GetPoints().SetPoint(0, 0., 0., 0.)
+        again = vcs.vcs2vtk.prepContinents(self.fnm)
+        self.assertEqual(again.GetPoints().GetPoint(0), (20., 10., 0.))
+        keys = [k for k in vcs.vcs2vtk.vcsContinents if k[0] == os.path.abspath(self.fnm)]
+        self.assertEqual(len(keys), 1)
+
+    def testSidecarMatchesText(self):
+        lats, lons, lengths = vcs.vcs2vtk.parseContinents(self.fnm)
+        vcs.vcs2vtk.loadContinents(self.fnm)
+        sidecarLats, sidecarLons, sidecarLengths = vcs.vcs2vtk.loadContinents(self.fnm)
+        self.assertTrue(numpy.array_equal(lats, sidecarLats))
+        self.assertTrue(numpy.array_equal(lons, sidecarLons))
+        self.assertEqual(list(sidecarLengths), [3, 2])
+
+    def testSidecarOptional(self):
+        vcs.vcs2vtk.continentsSidecar = False
+        lats, lons, lengths = vcs.vcs2vtk.loadContinents(self.fnm)
+        self.assertEqual(list(lengths), [3, 2])
+        self.assertFalse(os.path.exists(os.path.dirname(vcs.vcs2vtk.continentsSidecarPath(self.fnm))))
+        # a directory that cannot be created is not an error
+        vcs.vcs2vtk.continentsSidecar = True
+        os.environ["UVCDAT_DIR"] = os.path.join(self.fnm, "not_a_directory")
+        lats, lons, lengths = vcs.vcs2vtk.loadContinents(self.fnm)
+        self.assertEqual(list(lengths), [3, 2])
+
+    def testProjectedContinentsReused(self):
+        cache = vcs.vcs2vtk.continentsCache
+        cache.clear()
+        robinson = vcs.createprojection()
+        robinson.type = "robinson"
+        wc = [-180., 180., -90., 90.]
+        first = vcs.vcs2vtk.prepProjectedContinents(self.fnm, wc, robinson)
+        second = vcs.vcs2vtk.prepProjectedContinents(self.fnm, wc, robinson)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(first.GetNumberOfPoints(), second.GetNumberOfPoints())
+        self.assertEqual(first.GetPoints().GetPoint(0), second.GetPoints().GetPoint(0))
+        # a modified projection is a different entry
+        robinson.centralmeridian = 90.
+        vcs.vcs2vtk.prepProjectedContinents(self.fnm, wc, robinson)
+        self.assertEqual(cache.stats()["misses"], 2)
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+import vcs
+
+
+class TestVCSDeferredValidation(unittest.TestCase):
+    def testSetAttributes(self):
+        gm = vcs.createisofill()
+        gm.setattributes(levels=[0, 10, 20], fillareacolors=[16, 20], missing="red")
+        self.assertEqual(len(gm.levels), 3)
+        self.assertEqual(gm.fillareacolors, [16, 20])
+        # a single failure is the setter's own error
+        with self.assertRaises(ValueError) as context:
+            gm.setattributes(fillareastyle="bogus")
+        self.assertFalse(isinstance(context.exception, vcs.VCSValidationError))
+        # several failures are reported together, valid attributes are still set
+        with self.assertRaises(vcs.VCSValidationError) as context:
+            gm.setattributes(fillareastyle="bogus", ext_1=True, xaxisconvert="nope")
+        self.assertEqual([a for o, a, e in context.exception.errors], ["fillareastyle", "xaxisconvert"])
+        self.assertTrue(gm.ext_1)
+
+    def testDeferredValidation(self):
+        gm = vcs.createboxfill()
+        with vcs.deferred_validation():
+            gm.setattributes(boxfill_type="custom")
+            gm.setattributes(levels=[0, 1], color_1=20)
+            gm.setattributes(levels=[0, 1, 2])
+            # nothing is assigned before the context exits
+            self.assertEqual(gm.boxfill_type, "linear")
+        self.assertEqual(gm.boxfill_type, "custom")
+        self.assertEqual(len(gm.levels), 3)
+        self.assertEqual(gm.color_1, 20)
+        tt = vcs.createtexttable()
+        with self.assertRaises(vcs.VCSValidationError) as context:
+            with vcs.deferred_validation():
+                gm.setattributes(fillareastyle="bogus")
+                tt.setattributes(font="not_a_font", priority=3)
+        self.assertEqual([(o, a) for o, a, e in context.exception.errors],
+                         [(gm, "fillareastyle"), (tt, "font")])
+        self.assertEqual(tt.priority, 3)
+
+    def testDeferredValidationOrder(self):
+        gm = vcs.createboxfill()
+        order = []
+        boxfill_type = vcs.boxfill.Gfb.boxfill_type
+        levels = vcs.boxfill.Gfb.levels
+
+        def setboxfill_type(obj, value):
+            order.append("boxfill_type")
+            boxfill_type.fset(obj, value)
+
+        def setlevels(obj, value):
+            order.append("levels")
+            levels.fset(obj, value)
+        vcs.boxfill.Gfb.boxfill_type = property(boxfill_type.fget, setboxfill_type)
+        vcs.boxfill.Gfb.levels = property(levels.fget, setlevels)
+        try:
+            # a queued attribute given again is assigned after the others
+            with vcs.deferred_validation():
+                gm.setattributes(levels=[0, 1])
+                gm.setattributes(boxfill_type="custom")
+                gm.setattributes(levels=[0, 1, 2])
+            self.assertEqual(order, ["boxfill_type", "levels"])
+            # a direct assignment wins over the queued value
+            del order[:]
+            with vcs.deferred_validation():
+                gm.setattributes(levels=[0, 5], boxfill_type="linear")
+                gm.levels = [0, 10, 20, 30]
+                self.assertEqual(order, ["levels"])
+            self.assertEqual(order, ["levels", "boxfill_type"])
+        finally:
+            vcs.boxfill.Gfb.boxfill_type = boxfill_type
+            vcs.boxfill.Gfb.levels = levels
+        self.assertEqual(len(gm.levels), 4)
+        self.assertEqual(gm.boxfill_type, "linear")
+
+    def testScriptrunUsesDeferredValidation(self):
+        gm = vcs.createisofill("deferred_json")
+        gm.levels = [0, 25, 50, 100]
+        gm.fillareacolors = [16, 50, 200]
+        tmpl = vcs.createtemplate("deferred_json")
+        tmpl.title.x = .33
+        fd, pth = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(pth)
+        gm.script(pth)
+        tmpl.script(pth)
+        with open(pth) as f:
+            content = json.load(f)
+        vcs.removeobject(gm)
+        vcs.removeobject(tmpl)
+        vcs.scriptrun(pth)
+        os.remove(pth)
+        gm = vcs.getisofill("deferred_json")
+        self.assertEqual(len(gm.levels), 4)
+        self.assertEqual(gm.fillareacolors, [16, 50, 200])
+        self.assertEqual(vcs.gettemplate("deferred_json").title.x, .33)
+        self.assertTrue("deferred_json" in content["Gfi"])
+
+    def testUnchangedNotValidated(self):
+        tt = vcs.createtexttable()
+        font = vcs.texttable.Tt.font
+        calls = []
+
+        def setfont(obj, value):
+            calls.append(value)
+            font.fset(obj, value)
+        other = 2 if tt.font == 1 else 1
+        vcs.texttable.Tt.font = property(font.fget, setfont)
+        try:
+            # a value the attribute already holds is not validated again
+            with vcs.deferred_validation():
+                tt.setattributes(font=tt.font, priority=3)
+            self.assertEqual(calls, [])
+            with vcs.deferred_validation():
+                tt.setattributes(font=other)
+            self.assertEqual(calls, [other])
+        finally:
+            vcs.texttable.Tt.font = font
+        self.assertEqual(tt.priority, 3)
+        self.assertEqual(tt.font, other)
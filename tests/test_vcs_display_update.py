@@ -0,0 +1,32 @@
+import basevcstest
+
+
+class TestVCSDisplayUpdate(basevcstest.VCSBaseTest):
+    def testUpdateData(self):
+        clt = self.clt("clt")
+        dsp = self.x.plot(clt[0], "default", "boxfill")
+        grid = dsp.backend["vtk_backend_grid"]
+        slab = clt[5]
+        dsp.update(slab)
+        # same pipeline, new values
+        self.assertIs(dsp.backend["vtk_backend_grid"], grid)
+        self.assertEqual(dsp.backend["vtk_backend_Min_text_actor"].GetInput(), "Min %g" % slab.min())
+        self.assertEqual(dsp.backend["vtk_backend_Max_text_actor"].GetInput(), "Max %g" % slab.max())
+        self.assertIs(dsp.array[0], slab)
+
+    def testUpdateWrongShape(self):
+        clt = self.clt("clt")
+        dsp = self.x.plot(clt[0], "default", "boxfill")
+        with self.assertRaises(ValueError):
+            dsp.update(clt[1, ::2])
+
+    def testUpdateOtherGrid(self):
+        clt = self.clt("clt")
+        dsp = self.x.plot(clt[0], "default", "boxfill")
+        # same shape, shifted longitudes
+        other = clt[1].clone()
+        lon = other.getLongitude().clone()
+        lon[:] = lon[:] + 1.
+        other.setAxis(1, lon)
+        with self.assertRaises(ValueError):
+            dsp.update(other)
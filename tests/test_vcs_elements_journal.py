@@ -0,0 +1,49 @@
+import basevcstest
+import vcs
+
+
+class TestVCSElementsJournal(basevcstest.VCSBaseTest):
+    def testPlotRecordsCreatedElements(self):
+        clt = self.clt("clt")
+        before = dict((e, set(vcs.elements[e].keys())) for e in vcs.elements)
+        dsp = self.x.plot(clt[0], "default", "isofill", bg=self.bg)
+        for e in vcs.elements:
+            created = set(vcs.elements[e].keys()) - before[e]
+            self.assertTrue(set(dsp.newelements.get(e, [])) <= created)
+        self.assertTrue(dsp.name in dsp.newelements["display"])
+        self.x.clear()
+        for e in vcs.elements:
+            if e != "display":
+                self.assertEqual(set(vcs.elements[e].keys()), before[e])
+
+    def testScopesIgnoreDeletedElements(self):
+        scope = vcs._elementsJournal.open()
+        vcs.createline("journal_kept")
+        vcs.createline("journal_deleted")
+        vcs.removeobject(vcs.getline("journal_deleted"))
+        self.assertEqual(vcs._elementsJournal.close(scope), {"line": ["journal_kept"]})
+        # closed scopes do not record anymore
+        vcs.createline("journal_after")
+        self.assertEqual(vcs._elementsJournal.created(scope), {"line": ["journal_kept"]})
+
+    def testCleanAutoGeneratedObjects(self):
+        clt = self.clt("clt")
+        self.x.plot(clt[0], bg=self.bg)
+        generated = vcs._elementsJournal.generated("textorientation")
+        self.assertTrue(len(generated) > 0)
+        for name in generated:
+            self.assertTrue(name in vcs.elements["textorientation"])
+        self.x.clean_auto_generated_objects("textorientation")
+        self.assertEqual(vcs._elementsJournal.generated("textorientation"), [])
+        self.assertEqual([nm for nm in vcs.listelements("textorientation") if nm[:2] == "__"], [])
+
+    def testCleanAutoGeneratedAliases(self):
+        vcs.createxvsy("__journal_xvsy")
+        vcs.createscatter("__journal_scatter")
+        self.x.clean_auto_generated_objects("xvsy")
+        self.assertFalse("__journal_xvsy" in vcs.elements["1d"])
+        self.assertTrue("__journal_scatter" in vcs.elements["1d"])
+        self.x.clean_auto_generated_objects(["scatter"])
+        self.assertFalse("__journal_scatter" in vcs.elements["1d"])
+        with self.assertRaises(Exception):
+            self.x.clean_auto_generated_objects("notavcstype")
@@ -0,0 +1,58 @@
+import basevcstest
+import os
+import vcs
+import vcs.VTKAnimate
+
+
+class TestVCSFFMPEGStream(basevcstest.VCSBaseTest):
+    def testStreamFrames(self):
+        clt = self.clt("clt", slice(0, 5))
+        movie = self.x.ffmpegstream("test_vcs_ffmpeg_stream.mp4", rate=5, buffered=2)
+        for i in range(5):
+            self.x.clear()
+            self.x.plot(clt[i], bg=self.bg)
+            movie.write(self.x.image())
+        result = movie.close()
+        self.assertEqual(result.result, 0)
+        self.assertTrue(os.path.getsize("test_vcs_ffmpeg_stream.mp4") > 0)
+        os.remove("test_vcs_ffmpeg_stream.mp4")
+
+    def testAnimationStream(self):
+        s = self.clt("clt", slice(0, 4))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        result = self.x.animate.save("test_vcs_animate_stream.mp4", stream=True)
+        self.assertEqual(result.result, 0)
+        # no png frames were rendered
+        self.assertEqual(self.x.animate.animation_files, [])
+        os.remove("test_vcs_animate_stream.mp4")
+
+    def testAnimationStreamError(self):
+        s = self.clt("clt", slice(0, 4))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        writers = []
+        ffmpegstream = vcs.Canvas.Canvas.ffmpegstream
+        update_input = vcs.VTKAnimate.update_input
+
+        def capture(canvas, *args, **kargs):
+            writers.append(ffmpegstream(canvas, *args, **kargs))
+            return writers[-1]
+
+        def failing(canvas, dimensions, frame_num, **kargs):
+            if frame_num == 2:
+                raise ValueError("unreadable frame")
+            return update_input(canvas, dimensions, frame_num, **kargs)
+        vcs.Canvas.Canvas.ffmpegstream = capture
+        vcs.VTKAnimate.update_input = failing
+        try:
+            with self.assertRaises(ValueError):
+                self.x.animate.save("test_vcs_animate_stream_error.mp4", stream=True)
+        finally:
+            vcs.Canvas.Canvas.ffmpegstream = ffmpegstream
+            vcs.VTKAnimate.update_input = update_input
+        # ffmpeg and the thread feeding it are stopped
+        self.assertIsNotNone(writers[0].process.poll())
+        self.assertFalse(writers[0]._thread.is_alive())
+        if os.path.exists("test_vcs_animate_stream_error.mp4"):
+            os.remove("test_vcs_animate_stream_error.mp4")
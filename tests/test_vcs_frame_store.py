@@ -0,0 +1,53 @@
+import basevcstest
+import numpy
+import os
+import vcs.cache
+
+
+class TestVCSFrameStore(basevcstest.VCSBaseTest):
+    def testSpillPastBudget(self):
+        disk = {}
+        frame = numpy.zeros((10, 10, 3), dtype=numpy.uint8)
+        store = vcs.cache.FrameStore(maxbytes=2 * frame.nbytes, write=disk.__setitem__, read=disk.__getitem__)
+        for i in range(4):
+            store.put(i, frame + i)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(sorted(disk), [0, 1])
+        self.assertEqual(store.nbytes, 2 * frame.nbytes)
+        self.assertEqual(store.get(3)[0, 0, 0], 3)
+        # spilled frame comes back in memory, pushing frame 2 to disk
+        self.assertEqual(store.get(0)[0, 0, 0], 0)
+        self.assertEqual(sorted(disk), [0, 1, 2])
+        self.assertIsNone(store.get(5))
+        stats = store.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["reads"], stats["spills"]), (1, 2, 1, 3))
+        self.assertEqual(stats["frames"], 4)
+        self.assertEqual(stats["in_memory"], 2)
+
+    def testAnimationFramesInMemory(self):
+        s = self.clt("clt", slice(0, 4))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        create_thread = self.x.animate.create_thread
+        for frame_num in range(4):
+            create_thread.get_frame(frame_num)
+        self.assertEqual(self.x.animate.frames_rendered(), 4)
+        # second pass is served from memory
+        for frame_num in range(4):
+            create_thread.get_frame(frame_num)
+        stats = self.x.animate.frame_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["spills"]), (4, 4, 0))
+        self.assertFalse(os.path.exists(create_thread.get_frame_name(0)))
+        # no memory left: frames go to png files
+        self.x.animate.frame_memory(0)
+        self.assertEqual(self.x.animate.frame_stats()["in_memory"], 0)
+        # invalid values leave the controller and its store alone
+        with self.assertRaises(ValueError):
+            self.x.animate.frame_memory(-1)
+        self.assertEqual(self.x.animate.frame_memory(), 0)
+        self.assertEqual(self.x.animate.frame_stats()["maxbytes"], 0)
+        self.assertTrue(os.path.exists(create_thread.get_frame_name(3)))
+        self.assertEqual(create_thread.get_frame(2).shape[:2],
+                         (create_thread.canvas.height, create_thread.canvas.width))
+        self.x.animate.reset()
+        self.assertEqual(self.x.animate.frames_rendered(), 0)
@@ -0,0 +1,59 @@
+import basevcstest
+import cdms2
+import os
+import vtk
+import vcs.vcs2vtk
+import vcs.cache
+
+
+class TestVCSGridCache(basevcstest.VCSBaseTest):
+    def testSameGridIsReused(self):
+        cache = vcs.vcs2vtk.gridCache
+        cache.clear()
+        clt = self.clt("clt", slice(0, 1), squeeze=1)
+        self.x.plot(clt, "default", "boxfill")
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 0)
+        self.x.clear()
+        self.x.plot(clt * 2., "default", "boxfill")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["size"], 1)
+        # different world coordinates need a new grid
+        self.x.clear()
+        self.x.plot(clt(longitude=(0, 180)), "default", "boxfill")
+        self.assertEqual(cache.stats()["misses"], 2)
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "size": 0, "maxsize": cache.maxsize})
+
+    def testUnstructuredGridSecondPlot(self):
+        cache = vcs.vcs2vtk.gridCache
+        cache.clear()
+        vcs.vcs2vtk.gridSeen.clear()
+        f = cdms2.open(os.path.join(vcs.sample_data, "sampleCurveGrid4.nc"))
+        data = f("sample")
+        f.close()
+        gm = self.x.createmeshfill()
+        stats = []
+        for i in range(3):
+            dsp = self.x.plot(data, gm, bg=self.bg)
+            stats.append((cache.stats()["hits"], cache.stats()["misses"]))
+            unstructured = dsp.backend["vtk_backend_grid"].GetExtentType() == vtk.VTK_PIECES_EXTENT
+            self.x.clear()
+        if unstructured:
+            # deep copied only when plotted again, seen once is not a hit
+            self.assertEqual(stats, [(0, 1), (0, 2), (1, 2)])
+        else:
+            self.assertEqual(stats, [(0, 1), (1, 1), (2, 1)])
+
+    def testLRUEviction(self):
+        cache = vcs.cache.LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertTrue("a" in cache)
+        self.assertFalse("b" in cache)
+        cache.maxsize = 0
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            cache.maxsize = -1
@@ -0,0 +1,52 @@
+import basevcstest
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+snapshot = """
+import json
+import vcs
+out = {"pending": len(vcs.elements["template"].pending()) if hasattr(vcs.elements["template"], "pending") else 0}
+out["names"] = dict((typ, sorted(vcs.listelements(typ))) for typ in ["template", "colormap", "isofill", "line"])
+out["protected"] = sorted(vcs._protected_elements["template"])
+t = vcs.gettemplate("por_topof3")
+out["template"] = [t.data.x1, t.data.x2, t.data.y1, t.data.y2, t.title.texttable]
+out["colormap"] = vcs.getcolormap("blue2darkred").index[10]
+out["deprecated"] = vcs.getcolormap("bl_to_darkred").index[10]
+print(json.dumps(out))
+"""
+
+
+class TestVCSImportBenchmark(unittest.TestCase):
+    def importVCS(self, lazy, code="import vcs"):
+        env = dict(os.environ)
+        env["VCS_LAZY_DEFAULTS"] = "1" if lazy else "0"
+        start = time.time()
+        out = subprocess.check_output([sys.executable, "-c", code], env=env)
+        return time.time() - start, out.decode("utf-8").strip().split("\n")[-1]
+
+    def testImportTime(self):
+        code = "import vcs; print(len(vcs.listelements('template')))"
+        # first import warms up the file system and byte code caches
+        self.importVCS(False, code)
+        eager = [self.importVCS(False, code) for i in range(3)]
+        lazy = [self.importVCS(True, code) for i in range(3)]
+        # both ways know the same elements
+        self.assertEqual(set(out for elapsed, out in eager + lazy), set([eager[0][1]]))
+        self.assertGreater(int(eager[0][1]), 0)
+        eager = min(elapsed for elapsed, out in eager)
+        lazy = min(elapsed for elapsed, out in lazy)
+        basevcstest.checkTiming(self, "import vcs with VCS_LAZY_DEFAULTS=1 (%.3fs without)" % eager,
+                                lazy, eager * 1.1)
+
+    def testLazyDefaultsMatch(self):
+        eager = json.loads(self.importVCS(False, snapshot)[1])
+        lazy = json.loads(self.importVCS(True, snapshot)[1])
+        self.assertEqual(eager["pending"], 0)
+        # nothing but the defaults was built during import
+        self.assertGreater(lazy["pending"], 0)
+        for key in ["names", "protected", "template", "colormap", "deprecated"]:
+            self.assertEqual(eager[key], lazy[key])
@@ -0,0 +1,131 @@
+import basevcstest
+import cdms2
+import numpy
+import vcs
+
+
+class TestVCSLevelOfDetail(basevcstest.VCSBaseTest):
+    def __init__(self, *args, **kwargs):
+        kwargs["geometry"] = {"width": 400, "height": 300}
+        super(TestVCSLevelOfDetail, self).__init__(*args, **kwargs)
+
+    def quarterDegree(self):
+        lat = cdms2.createAxis(numpy.arange(-89.875, 90., .25), id="latitude")
+        lat.designateLatitude()
+        lat.units = "degrees_north"
+        lon = cdms2.createAxis(numpy.arange(.125, 360., .25), id="longitude")
+        lon.designateLongitude()
+        lon.units = "degrees_east"
+        values = numpy.cos(numpy.radians(lat[:]))[:, None] * numpy.sin(numpy.radians(lon[:]))[None, :]
+        data = cdms2.createVariable(values, axes=[lat, lon], id="data")
+        data[:30, :40] = numpy.ma.masked
+        return data
+
+    def testBlockReduce2D(self):
+        values = numpy.ma.arange(35.).reshape((5, 7))
+        values[0, :3] = numpy.ma.masked
+        values[1, :3] = numpy.ma.masked
+        values[2, 1] = numpy.nan
+        mean = vcs.utils.blockReduce2D(values, (2, 3), "mean")
+        self.assertEqual(mean.shape, (3, 3))
+        # blocks with no valid cell are masked, invalid values are ignored
+        self.assertTrue(mean.mask[0, 0])
+        self.assertEqual(mean[0, 1], numpy.mean([3, 4, 5, 10, 11, 12]))
+        self.assertEqual(mean[1, 0], numpy.mean([14, 16, 21, 22, 23]))
+        # the last blocks are shorter
+        self.assertEqual(mean[2, 2], 34.)
+        self.assertEqual(vcs.utils.blockReduce2D(values, (2, 3), "max")[1, 1], 26.)
+        nearest = vcs.utils.blockReduce2D(values, (2, 3), "nearest")
+        self.assertEqual(nearest[:, 1].tolist(), [11., 25., 32.])
+        with self.assertRaises(ValueError):
+            vcs.utils.blockReduce2D(values, (2, 3), "median")
+
+    def testLodMethod(self):
+        self.assertEqual(vcs.utils.lodMethod(False, ("mean", "max"), "mean"), None)
+        self.assertEqual(vcs.utils.lodMethod(True, ("mean", "max"), "mean"), "mean")
+        self.assertEqual(vcs.utils.lodMethod("max", ("mean", "max"), "mean"), "max")
+        # the other kind of plot's methods fall back to the default
+        self.assertEqual(vcs.utils.lodMethod("lttb", ("mean", "max"), "mean"), "mean")
+        for lod in ["maxx", 1, "True"]:
+            with self.assertRaises(ValueError):
+                vcs.utils.lodMethod(lod, ("mean", "max"), "mean")
+
+    def testBlockReduceAxes(self):
+        clt = self.clt("clt")[0]
+        reduced = vcs.utils.blockReduce2D(clt, (2, 5), "mean")
+        self.assertEqual(reduced.shape, (23, 15))
+        lat = reduced.getLatitude()
+        lon = reduced.getLongitude()
+        self.assertTrue(lat is not None and lon is not None)
+        self.assertTrue(numpy.allclose(lat.getBounds()[0], [clt.getLatitude().getBounds()[0, 0],
+                                                            clt.getLatitude().getBounds()[1, 1]]))
+        self.assertTrue(numpy.allclose(lon.getBounds()[-1], [clt.getLongitude().getBounds()[70, 0],
+                                                             clt.getLongitude().getBounds()[71, 1]]))
+        self.assertTrue(numpy.allclose(reduced[0, 0], clt[:2, :5].mean()))
+
+    def testPlotLevelOfDetail(self):
+        data = self.quarterDegree()
+        for gm in [self.x.createboxfill(), self.x.createisofill()]:
+            dsp = self.x.plot(data, gm, lod=True, bg=self.bg)
+            factors, method = dsp.backend["vtk_backend_lod"]
+            self.assertEqual(method, "mean")
+            self.assertTrue(factors[0] > 1 and factors[1] > 1)
+            reduced = vcs.utils.blockReduce2D(data, factors, method)
+            self.assertTrue(dsp.backend["vtk_backend_grid"].GetNumberOfCells() < data.size / 4)
+            # new data goes through the same aggregation
+            dsp.update(data * 2.)
+            # the template strings still describe the full array
+            self.assertEqual(dsp.backend["vtk_backend_Max_text_actor"].GetInput(), "Max %g" % (data * 2.).max())
+            if vcs.isboxfill(gm):
+                self.assertTrue(numpy.allclose(dsp.probe(reduced.getLongitude()[5], reduced.getLatitude()[100]),
+                                               2. * reduced[100, 5]))
+            self.x.clear()
+        # 1D methods fall back to the graphics method's
+        dsp = self.x.plot(data, self.x.createboxfill(), lod="lttb", bg=self.bg)
+        self.assertEqual(dsp.backend["vtk_backend_lod"][1], "mean")
+        self.x.clear()
+        dsp = self.x.plot(data, self.x.createboxfill(), bg=self.bg)
+        self.assertFalse("vtk_backend_lod" in dsp.backend)
+        self.x.clear()
+        with self.assertRaises(ValueError):
+            self.x.plot(data, self.x.createboxfill(), lod="maxx", bg=self.bg)
+
+    def testLevelOfDetailAutoLevels(self):
+        data = self.quarterDegree()
+        # a single spike the aggregation averages away
+        data[400, 700] = 5.
+        gm = self.x.createisofill()
+        dsp = self.x.plot(data, gm, bg=self.bg)
+        lows = dsp.backend["vtk_backend_bands"].lows
+        highs = dsp.backend["vtk_backend_bands"].highs
+        self.x.clear()
+        dsp = self.x.plot(data, gm, lod=True, bg=self.bg)
+        self.assertTrue("vtk_backend_lod" in dsp.backend)
+        self.assertTrue(numpy.allclose(dsp.backend["vtk_backend_bands"].lows, lows))
+        self.assertTrue(numpy.allclose(dsp.backend["vtk_backend_bands"].highs, highs))
+        self.x.clear()
+        gm = self.x.createboxfill()
+        dsp = self.x.plot(data, gm, bg=self.bg)
+        luts = dsp.backend["vtk_backend_luts"][0][1]
+        self.x.clear()
+        dsp = self.x.plot(data, gm, lod=True, bg=self.bg)
+        self.assertEqual(dsp.backend["vtk_backend_luts"][0][1], luts)
+
+    def testZoomedLevelOfDetail(self):
+        data = self.quarterDegree()
+        gm = self.x.createboxfill()
+        gm.boxfill_type = "custom"
+        gm.datawc_x1 = 0.
+        gm.datawc_x2 = 10.
+        gm.datawc_y1 = 0.
+        gm.datawc_y2 = 10.
+        # 40x40 cells are shown, fewer than the data area pixels
+        dsp = self.x.plot(data, gm, lod=True, bg=self.bg)
+        self.assertFalse("vtk_backend_lod" in dsp.backend)
+        gm.datawc_x1 = 0.
+        gm.datawc_x2 = 360.
+        gm.datawc_y1 = -90.
+        gm.datawc_y2 = 90.
+        self.x.clear()
+        dsp = self.x.plot(data, gm, lod=True, bg=self.bg)
+        self.assertEqual(dsp.backend["vtk_backend_lod"][1], "nearest")
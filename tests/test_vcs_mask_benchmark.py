@@ -0,0 +1,43 @@
+import basevcstest
+import unittest
+import time
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+import vcs.vcs2vtk
+
+
+class TestVCSMaskBenchmark(unittest.TestCase):
+    def makeGrid(self, nx, ny, withPedigreeIds):
+        grid = vtk.vtkStructuredGrid()
+        grid.SetDimensions(nx + 1, ny + 1, 1)
+        if withPedigreeIds:
+            # reversed ids, as if the grid had been wrapped
+            ids = numpy.arange(nx * ny - 1, -1, -1, dtype=numpy.int32)
+            pedigreeIds = vcs.vcs2vtk.numpy_to_vtk_wrapper(ids, deep=False)
+            pedigreeIds.SetName("PedigreeIds")
+            grid.GetCellData().SetPedigreeIds(pedigreeIds)
+        return grid
+
+    def timeMask(self, nx, ny, withPedigreeIds, limit):
+        data = numpy.ma.arange(nx * ny, dtype=numpy.float32).reshape((ny, nx))
+        # mask every third row
+        data[::3] = numpy.ma.masked
+        grid = self.makeGrid(nx, ny, withPedigreeIds)
+        start = time.time()
+        vcs.vcs2vtk.putMaskOnVTKGrid(data, grid, cellData=True, deep=False)
+        elapsed = time.time() - start
+        ghost = VN.vtk_to_numpy(grid.GetCellData().GetArray(vtk.vtkDataSetAttributes.GhostArrayName()))
+        expected = numpy.ravel(data.mask) * vtk.vtkDataSetAttributes.HIDDENCELL
+        if withPedigreeIds:
+            expected = expected[::-1]
+        self.assertTrue(numpy.array_equal(ghost, expected))
+        basevcstest.checkTiming(self, "%i cells (pedigree ids: %s)" % (nx * ny, withPedigreeIds), elapsed, limit)
+
+    def testMask1M(self):
+        for withPedigreeIds in [False, True]:
+            self.timeMask(1000, 1000, withPedigreeIds, 1.)
+
+    def testMask10M(self):
+        for withPedigreeIds in [False, True]:
+            self.timeMask(4000, 2500, withPedigreeIds, 10.)
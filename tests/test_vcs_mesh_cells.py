@@ -0,0 +1,20 @@
+import unittest
+import numpy
+import vcs.vcs2vtk
+
+
+class TestVCSMeshCells(unittest.TestCase):
+    def testMeshCellsSkipMissingVertices(self):
+        nan = numpy.nan
+        # 3 cells of 4 vertices: a triangle, a square and an empty cell
+        vertices = numpy.array([[0., 0., 0.], [1., 0., 0.], [1., 1., 0.], [nan, nan, 0.],
+                                [2., 0., 0.], [3., 0., 0.], [3., 1., 0.], [2., 1., 0.],
+                                [nan, nan, 0.], [nan, nan, 0.], [nan, nan, 0.], [nan, nan, 0.]])
+        cells = vcs.vcs2vtk.genMeshCells(vertices, 3, 4)
+        self.assertEqual(cells.GetNumberOfCells(), 3)
+        expected = [[0, 1, 2], [4, 5, 6, 7], []]
+        cells.InitTraversal()
+        for ids in expected:
+            idList = vcs.vcs2vtk.vtk.vtkIdList()
+            cells.GetNextCell(idList)
+            self.assertEqual([idList.GetId(i) for i in range(idList.GetNumberOfIds())], ids)
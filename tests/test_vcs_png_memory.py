@@ -0,0 +1,28 @@
+import basevcstest
+import os
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+
+
+class TestVCSPngMemory(basevcstest.VCSBaseTest):
+    def testPngBytesAndArray(self):
+        self.x.plot(self.clt("clt", slice(0, 1), squeeze=1), "default", "boxfill")
+        fnm = os.path.join(self.pngsdir, "test_vcs_png_memory.png")
+        self.x.png(fnm)
+        with open(fnm, "rb") as f:
+            on_disk = f.read()
+        in_memory = self.x.png()
+        self.assertEqual(in_memory[:8], b"\x89PNG\r\n\x1a\n")
+        self.assertEqual(in_memory, on_disk)
+
+        img = self.x.image()
+        self.assertEqual(img.dtype, numpy.uint8)
+        self.assertEqual(img.shape, (self.geometry["height"], self.geometry["width"], 3))
+        reader = vtk.vtkPNGReader()
+        reader.SetFileName(fnm)
+        reader.Update()
+        w, h, _ = reader.GetOutput().GetDimensions()
+        pixels = VN.vtk_to_numpy(reader.GetOutput().GetPointData().GetScalars()).reshape((h, w, -1))[::-1]
+        self.assertTrue(numpy.array_equal(img, pixels))
+        self.assertEqual(self.x.to_array(draw_white_background=False).shape[-1], 4)
@@ -0,0 +1,61 @@
+import basevcstest
+import numpy
+
+
+class TestVCSProbe(basevcstest.VCSBaseTest):
+    def testDisplayProbe(self):
+        clt = self.clt("clt")
+        dsp = self.x.plot(clt[0], "default", "boxfill")
+        lat = clt.getLatitude()[:]
+        lon = clt.getLongitude()[:]
+        # cell centers come back with the data values
+        values = dsp.probe([lon[3], lon[10]], [lat[5], lat[20]])
+        self.assertTrue(numpy.allclose(values, [clt[0, 5, 3], clt[0, 20, 10]]))
+        self.assertTrue(numpy.allclose(dsp.probe(lon[3], lat[5]), clt[0, 5, 3]))
+        # outside of the grid
+        self.assertTrue(dsp.probe(lon[3], 200.) is numpy.ma.masked)
+
+    def testLocatorKeptAcrossUpdates(self):
+        clt = self.clt("clt")
+        dsp = self.x.plot(clt[0], "default", "boxfill")
+        lat = clt.getLatitude()[:]
+        lon = clt.getLongitude()[:]
+        dsp.probe(lon[3], lat[5])
+        source = dsp.backend["vtk_backend_probe_source"][0]
+        dsp.update(clt[5])
+        self.assertTrue(numpy.allclose(dsp.probe(lon[3], lat[5]), clt[5, 5, 3]))
+        self.assertIs(dsp.backend["vtk_backend_probe_source"][0], source)
+        # the locator used by clicks is kept the same way
+        locator = self.x.backend.getCellLocator(dsp.backend)
+        dsp.update(clt[6])
+        self.assertIs(self.x.backend.getCellLocator(dsp.backend), locator)
+
+    def testProbeProjected(self):
+        clt = self.clt("clt")
+        gm = self.x.createboxfill()
+        gm.projection = "robinson"
+        dsp = self.x.plot(clt[0], gm)
+        geo = dsp.backend["vtk_backend_geo"]
+        forward = geo.TransformPoint(10., 45., 0.)
+        lat = clt.getLatitude()[:]
+        lon = clt.getLongitude()[:]
+        values = dsp.probe(lon[3:40], numpy.repeat(lat[20], 37))
+        self.assertTrue(numpy.allclose(values, clt[0, 20, 3:40]))
+        w, h = self.x.backend.renWin.GetSize()
+        info = self.x.probe([w // 2, w // 3], [h // 2, h // 2])
+        self.assertTrue(numpy.allclose(info["value"], dsp.probe(info["x"], info["y"])))
+        # the shared transform was not left inverted
+        self.assertIs(dsp.backend["vtk_backend_geo"], geo)
+        self.assertTrue(numpy.allclose(geo.TransformPoint(10., 45., 0.), forward))
+
+    def testCanvasProbe(self):
+        clt = self.clt("clt")
+        dsp = self.x.plot(clt[0], "default", "boxfill")
+        w, h = self.x.backend.renWin.GetSize()
+        info = self.x.probe(w // 2, h // 2)
+        self.assertIs(info["display"], dsp)
+        self.assertTrue(numpy.allclose(info["value"], dsp.probe(info["x"], info["y"])))
+        info = self.x.probe([w // 2, 0], [h // 2, 0])
+        self.assertEqual(len(info["value"]), 2)
+        # bottom left corner of the window is not on the data
+        self.assertTrue(info["value"].mask[1])
@@ -0,0 +1,61 @@
+import unittest
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+import vcs.vcs2vtk
+
+
+class TestVCSProjectPoints(unittest.TestCase):
+    def setUp(self):
+        self.proj = vcs.createprojection()
+        self.proj.type = "robinson"
+        self.wc = [-180., 180., -90., 90.]
+
+    def testNumpyMatchesVTKPoints(self):
+        lon, lat = numpy.meshgrid(numpy.linspace(-170, 170, 20), numpy.linspace(-80, 80, 10))
+        xy = numpy.transpose([lon.ravel(), lat.ravel()])
+        pts = vtk.vtkPoints()
+        for x, y in xy:
+            pts.InsertNextPoint(x, y, 0.)
+        geo, geopts = vcs.vcs2vtk.projectPoints(pts, self.proj, self.wc)
+        geo2, projected = vcs.vcs2vtk.projectPoints(xy, self.proj, self.wc)
+        self.assertIs(geo, geo2)
+        self.assertEqual(projected.shape, xy.shape)
+        self.assertTrue(numpy.allclose(projected, VN.vtk_to_numpy(geopts.GetData())[:, :2]))
+
+    def testProjectArrayInPlace(self):
+        values = vtk.vtkDoubleArray()
+        values.SetNumberOfComponents(3)
+        values.InsertNextTypedTuple([10., 20., 0.])
+        values.InsertNextTypedTuple([-30., 40., 0.])
+        expected = [vcs.vcs2vtk.getGeoTransform(self.proj, self.wc).TransformPoint(p)
+                    for p in [(10., 20., 0.), (-30., 40., 0.)]]
+        vcs.vcs2vtk.projectArray(values, self.proj, self.wc)
+        self.assertTrue(numpy.allclose(VN.vtk_to_numpy(values), expected))
+
+    def testSetInfToValid(self):
+        pts = vtk.vtkPoints()
+        for p in [(numpy.inf, 1., 0.), (2., 3., 0.), (4., -numpy.inf, 0.)]:
+            pts.InsertNextPoint(p)
+        ghost = vtk.vtkUnsignedCharArray()
+        ghost.SetNumberOfTuples(3)
+        ghost.Fill(0)
+        self.assertTrue(vcs.vcs2vtk.setInfToValid(pts, ghost))
+        self.assertEqual([pts.GetPoint(i) for i in range(3)],
+                         [(2., 1., 0.), (2., 3., 0.), (4., 3., 0.)])
+        hidden = vtk.vtkDataSetAttributes.HIDDENPOINT
+        self.assertEqual(list(VN.vtk_to_numpy(ghost)), [hidden, 0, hidden])
+
+    def testTransformRegistry(self):
+        robinson = vcs.createprojection()
+        robinson.type = "robinson"
+        robinson.centralmeridian = 0.
+        # central meridian is set so the world coordinates do not matter
+        geo = vcs.vcs2vtk.getGeoTransform(robinson, [-180., 180., -90., 90.])
+        self.assertIs(vcs.vcs2vtk.getGeoTransform(robinson, [0., 360., -90., 90.]), geo)
+        self.assertIs(vcs.vcs2vtk.getGeoTransform(self.proj, [-180., 180., -90., 90.]), geo)
+        # modified projection gets its own transform
+        robinson.centralmeridian = 180.
+        other = vcs.vcs2vtk.getGeoTransform(robinson, [-180., 180., -90., 90.])
+        self.assertIsNot(other, geo)
+        self.assertEqual(other.GetDestinationProjection().GetCentralMeridian(), 180.)
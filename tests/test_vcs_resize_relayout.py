@@ -0,0 +1,72 @@
+import basevcstest
+import numpy
+import vcs
+
+
+class TestVCSResizeRelayout(basevcstest.VCSBaseTest):
+    def setUp(self):
+        super(TestVCSResizeRelayout, self).setUp()
+        self.replots = []
+        plot = self.x.plot
+
+        def countingPlot(*args, **kargs):
+            self.replots.append(args)
+            return plot(*args, **kargs)
+        self.s = numpy.reshape(numpy.sin(numpy.arange(100)), (10, 10))
+        self.x.plot(self.s, bg=self.bg)
+        self.x.plot = countingPlot
+
+    def actors(self):
+        d = vcs.elements["display"][self.x.display_names[0]]
+        return [a[0] for a in d.backend["vtk_backend_actors"]]
+
+    def testSameAspectKeepsPipeline(self):
+        w, h = self.x.backend.renWin.GetSize()
+        actors = self.actors()
+        self.x.backend.setsize(w // 2, h // 2)
+        self.assertEqual(self.replots, [])
+        self.assertEqual(self.actors(), actors)
+        self.assertEqual(self.x.backend._lastSize, (w // 2, h // 2))
+        self.x.backend.setsize(w, h)
+        self.assertEqual(self.replots, [])
+        # back to where we started, same picture as a fresh plot
+        self.checkImage("test_vcs_boxfill_10x10_numpy.png")
+
+    def testNewAspectKeepsPipeline(self):
+        w, h = self.x.backend.renWin.GetSize()
+        actors = self.actors()
+        self.x.backend.setsize(w, h * 2)
+        # a linear boxfill stretches with the window
+        self.assertEqual(self.replots, [])
+        self.assertEqual(self.actors(), actors)
+        self.x.backend.setsize(w, h)
+        self.checkImage("test_vcs_boxfill_10x10_numpy.png")
+
+    def testRatioReplots(self):
+        self.x.clear()
+        self.x.plot(self.s, ratio="autot", bg=self.bg)
+        del self.replots[:]
+        w, h = self.x.backend.renWin.GetSize()
+        self.x.backend.setsize(w, h * 2)
+        self.assertEqual(len(self.replots), 1)
+
+    def testProjectionReplots(self):
+        self.x.clear()
+        gm = self.x.createboxfill()
+        gm.projection = "polar"
+        self.x.plot(self.s, gm, bg=self.bg)
+        del self.replots[:]
+        w, h = self.x.backend.renWin.GetSize()
+        self.x.backend.setsize(w // 2, h // 2)
+        self.assertEqual(len(self.replots), 1)
+
+    def testMarkersReplot(self):
+        m = self.x.createmarker()
+        m.x = [.5]
+        m.y = [.5]
+        self.x.plot(m, bg=self.bg)
+        del self.replots[:]
+        w, h = self.x.backend.renWin.GetSize()
+        self.x.backend.setsize(w // 2, h // 2)
+        # markers stay the same size in pixels, the displays are replotted
+        self.assertTrue(len(self.replots) > 0)
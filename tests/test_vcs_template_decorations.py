@@ -0,0 +1,46 @@
+import basevcstest
+import numpy
+import vcs
+
+
+class TestVCSTemplateDecorations(basevcstest.VCSBaseTest):
+    def elementNames(self):
+        return dict((e, set(vcs.elements[e])) for e in ["texttable", "textorientation", "textcombined",
+                                                        "line", "marker", "fillarea"])
+
+    def testBoxfillDecorationsLeaveRegistryAlone(self):
+        s = numpy.reshape(numpy.sin(numpy.arange(100)), (10, 10))
+        before = self.elementNames()
+        inserted = []
+        plot = self.x.backend.plotDecorations
+
+        def plotDecorations(decorations, bg, **kargs):
+            inserted.extend(decorations)
+            return plot(decorations, bg, **kargs)
+        self.x.backend.plotDecorations = plotDecorations
+        self.x.plot(s, bg=self.bg)
+        self.assertEqual(self.elementNames(), before)
+        # ticks, labels, boxes and the colorbar went through the batch
+        self.assertTrue(len(inserted) > 10)
+        for d in inserted:
+            self.assertTrue(d.s_name in ["Tc", "Tl", "Tm", "Tf"])
+        # same picture as when each decoration was plotted on its own
+        self.checkImage("test_vcs_boxfill_10x10_numpy.png")
+
+    def test1DDecorations(self):
+        before = self.elementNames()
+        self.x.plot(numpy.sin(numpy.arange(100) / 10.), bg=self.bg)
+        self.assertEqual(self.elementNames(), before)
+
+    def testRatioFallsBackToPlot(self):
+        decorations = vcs.decorations.Decorations(self.x, ratio="2t")
+        ln = decorations.createline()
+        ln.x = [.1, .9]
+        ln.y = [.1, .9]
+        decorations.plot(ln)
+        # the ratio changes the viewport, Canvas.plot takes care of it
+        self.assertEqual(decorations.queue, [])
+        decorations.plot(ln, ratio="none")
+        self.assertEqual(decorations.queue, [ln])
+        decorations.draw()
+        self.assertEqual(decorations.queue, [])
@@ -0,0 +1,43 @@
+import basevcstest
+import unittest
+import time
+import numpy
+import vtk
+import vcs.vcs2vtk
+
+
+class TestVCSWrapBenchmark(unittest.TestCase):
+    def makeGrid(self, nx, ny):
+        # one degree cells, covering [0, 360] x [-90, 90]
+        lon, lat = numpy.meshgrid(numpy.linspace(0., 360., nx + 1), numpy.linspace(-90., 90., ny + 1))
+        xyz = numpy.zeros((lon.size, 3))
+        xyz[:, 0] = lon.ravel()
+        xyz[:, 1] = lat.ravel()
+        pts = vtk.vtkPoints()
+        pts.SetData(vcs.vcs2vtk.numpy_to_vtk_wrapper(xyz, deep=True))
+        grid = vtk.vtkStructuredGrid()
+        grid.SetDimensions(nx + 1, ny + 1, 1)
+        grid.SetPoints(pts)
+        return grid
+
+    def testWrapWidths(self):
+        nx, ny = 720, 360
+        for width in [360., 720., 1080.]:
+            grid = self.makeGrid(nx, ny)
+            start = time.time()
+            result = vcs.vcs2vtk.doWrapData(grid, [0., width, -90., 90.], wrap=[0., 360.])
+            elapsed = time.time() - start
+            bounds = result.GetBounds()
+            self.assertAlmostEqual(bounds[0], 0.)
+            self.assertAlmostEqual(bounds[1], width)
+            # one copy of the data per 360 degrees, cells on the clip border are kept
+            copies = int(width // 360)
+            self.assertGreaterEqual(result.GetNumberOfCells(), copies * nx * ny)
+            self.assertLessEqual(result.GetNumberOfCells(), (copies + 1) * nx * ny)
+            basevcstest.checkTiming(self, "wrap 0-%i: %i cells" % (width, result.GetNumberOfCells()),
+                                    elapsed, 2. * copies)
+
+    def testOffsets(self):
+        self.assertEqual(vcs.vcs2vtk.wrapOffsets(0., 360., -180., 180., 360.), [-360., 0.])
+        self.assertEqual(vcs.vcs2vtk.wrapOffsets(0., 360., 0., 1080., 360.), [0., 360., 720.])
+        self.assertEqual(vcs.vcs2vtk.wrapOffsets(-90., 90., -90., 90., 0.), [0.])
@@ -54,6 +54,7 @@ import random
 from cdms2.grid import AbstractRectGrid
 import shutil
 import subprocess
+import threading
 import inspect
 from . import VCS_validation_functions
 from .xmldocs import plot_keywords_doc, graphics_method_core, axesconvert, xaxisconvert, \
@@ -72,6 +73,10 @@ try:
     basestring
 except Exception:
     basestring = str
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 try:
     from IPython import get_ipython
 except Exception:
@@ -110,6 +115,107 @@ class JupyterFFMPEG(object):
         return html
 
 
+class FFMPEGStream(object):
+    """Encodes frames with ffmpeg without writing them to disk.
+
+    Raw RGB frames are piped to ffmpeg's stdin by a background thread. At most
+    'buffered' frames wait to be encoded, write() blocks when ffmpeg falls
+    behind. ffmpeg is started with the first frame, which sets the movie size.
+    """
+
+    def __init__(self, movie, bitrate=1024, rate=None, options=None, buffered=4):
+        self.movie = movie
+        self.bitrate = bitrate
+        self.rate = rate
+        self.options = options
+        self.process = None
+        self.error = None
+        self.size = None
+        self._frames = queue.Queue(maxsize=max(buffered, 1))
+        self._thread = None
+
+    def _start(self, width, height):
+        args = ["ffmpeg", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", "%dx%d" % (width, height)]
+
+        if self.rate is not None:
+            args.extend(("-framerate", str(self.rate)))
+
+        args.extend(("-i", "-", "-pix_fmt", "yuv420p"))
+        # H264 requires even numbered heights and widths
+        args.extend(("-vf", "scale=%d:%d" % (width + width % 2, height + height % 2)))
+
+        if self.options is not None:
+            args.append(self.options)
+
+        args.append(self.movie)
+        self.size = (width, height)
+        self.process = subprocess.Popen(args, stdin=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._feed)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _feed(self):
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                # ffmpeg is gone, keep draining so write() does not block
+                continue
+            try:
+                self.process.stdin.write(frame.data)
+            except (IOError, OSError) as err:
+                self.error = err
+
+    def write(self, frame):
+        """Queues a (height, width, 3) uint8 frame, top row first (see Canvas.image)"""
+        if self.error is not None:
+            raise vcsError("ffmpeg stopped accepting frames: %s" % self.error)
+        height, width = frame.shape[:2]
+        if self.process is None:
+            self._start(width, height)
+        elif (width, height) != self.size:
+            raise vcsError("Frame size %dx%d differs from movie size %dx%d" %
+                           ((width, height) + self.size))
+        self._frames.put(numpy.ascontiguousarray(frame[..., :3], dtype=numpy.uint8))
+
+    def close(self):
+        """Waits for ffmpeg to encode the queued frames.
+
+        :returns: A object that Jupyter notebook can display
+        :rtype: JupyterFFMPEG
+        """
+        result = None
+        if self.process is not None:
+            self._frames.put(None)
+            self._thread.join()
+            self._closeStdin()
+            result = self.process.wait()
+        return JupyterFFMPEG(self.movie, result)
+
+    def terminate(self):
+        """Stops ffmpeg and the feeding thread without encoding the queued frames"""
+        if self.process is None:
+            return
+        if self.error is None:
+            # the feeding thread drains the queue without writing
+            self.error = vcsError("stream terminated")
+        self.process.kill()
+        self._frames.put(None)
+        self._thread.join()
+        self._closeStdin()
+        self.process.wait()
+
+    def _closeStdin(self):
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError) as err:
+            # ffmpeg exited early (broken pipe), its exit code is returned
+            if self.error is None:
+                self.error = err
+
+
 class SIGNAL(object):
 
     def __init__(self, name=None):
@@ -1217,27 +1323,29 @@ class Canvas(vcs.bestMatch):
             type = [type, ]
         elif not isinstance(type, (list, tuple)):
             return
+        templatesInUse = None
         for objtype in type:
-            for obj in self.listelements(objtype):
-                if obj[:2] == "__":
-                    try:
-                        loc = locals()
-                        exec("o = self.get%s(obj)" % objtype)
-                        o = loc["o"]
-                        destroy = True
-                        if objtype == 'template':
-                            # print o.name
-                            dnames = self.return_display_names()
-                            for d in dnames:
+            if objtype in vcs.elements:
+                # the journal knows the generated ("__") names, no need to scan everything
+                names = vcs._elementsJournal.generated(objtype)
+            else:
+                # 1d aliases ("xvsy", "scatter", ...), unknown types raise
+                names = [obj for obj in self.listelements(objtype) if obj[:2] == "__"]
+            for obj in names:
+                try:
+                    o = getattr(self, "get%s" % objtype)(obj)
+                    destroy = True
+                    if objtype == 'template':
+                        if templatesInUse is None:
+                            templatesInUse = set()
+                            for d in self.return_display_names():
                                 dpy = self.getplot(d)
-                                if o.name in [
-                                        dpy.template, dpy._template_origin]:
-                                    destroy = False
-                                    break
-                        if destroy:
-                            self.removeobject(o)
-                    except Exception:
-                        pass
+                                templatesInUse.update([dpy.template, dpy._template_origin])
+                        destroy = o.name not in templatesInUse
+                    if destroy:
+                        self.removeobject(o)
+                except Exception:
+                    pass
 
         return
 
@@ -2480,6 +2588,48 @@ class Canvas(vcs.bestMatch):
             out.append([outx, outy])
         return out
 
+    def probe(self, x, y):
+        """Returns the data values under window pixels, as shown when clicking on a plot
+
+        The values are looked up on the last display plotted with data, see
+        :py:func:`vcs.displayplot.Dp.probe`. Arrays of pixels are looked up
+        in one call, which makes it suitable for hover tooltips.
+
+        :Example:
+
+            .. doctest:: canvas_probe
+
+                >>> a=vcs.init(bg=True)
+                >>> f=cdms2.open(vcs.sample_data+"/clt.nc")
+                >>> dsp=a.plot(f("clt", time=slice(0, 1), squeeze=1))
+                >>> info=a.probe(400, 300)
+                >>> sorted(info.keys())
+                ['display', 'value', 'x', 'y']
+
+        :param x: Horizontal pixel position(s), from the left of the window
+        :type x: `int`_ or `list`_
+
+        :param y: Vertical pixel position(s), from the bottom of the window
+        :type y: `int`_ or `list`_
+
+        :returns: Dictionary with keys: "display" (the display probed), "x" and "y"
+            (data coordinates of the pixels) and "value" (masked where there is no data),
+            or None if nothing with data is plotted
+        :rtype: dict
+        """
+        scalar = numpy.ndim(x) == 0
+        x = numpy.ravel(x)
+        y = numpy.ravel(y)
+        if len(x) != len(y):
+            raise vcsError("x and y must have the same number of points")
+        probed = self.backend.probeScreen(x, y)
+        if probed is None:
+            return None
+        display, X, Y, value = probed
+        if scalar:
+            X, Y, value = X[0], Y[0], value[0]
+        return {"display": display, "x": X, "y": Y, "value": value}
+
     def match_color(self, color, colormap=None):  # noqa
         return vcs.match_color(color, colormap)
     match_color.__doc__ = vcs.utils.match_color.__doc__
@@ -2749,6 +2899,23 @@ class Canvas(vcs.bestMatch):
                         point attributes, boxfill and meshfill need cell attributes
                         the default is True (if the parameter is not specified).
 
+                * Level of detail for large rectilinear boxfill and isofill data and long 1D series (VTK backend only)
+
+                    .. code-block:: python
+
+                        # aggregate blocks of cells down to about one cell per pixel of the data area
+                        # True uses the graphics method's choice (nearest for custom boxfill, mean otherwise)
+                        lod = False | True | "mean" | "max" | "nearest"
+
+                        # 1D plots keep a few points per pixel column of the data area instead
+                        # True uses "minmax" (first, last, lowest and highest point of each column)
+                        # markers are still drawn on every point
+                        lod = False | True | "minmax" | "lttb"
+
+                        # methods of the other kind of plot fall back to True, so one lod value
+                        # can be passed to every plot: "lttb" on a boxfill is the same as True
+                        # any other value raises a ValueError
+
                 * Graphics Output in Background Mode:
 
                     .. code-block:: python
@@ -2834,27 +3001,21 @@ class Canvas(vcs.bestMatch):
                                    plot_2_1D_input,
                                    plot_output)
 
-    def __new_elts(self, original, new):
-        for e in list(vcs.elements.keys()):
-            for k in list(vcs.elements[e].keys()):
-                if k not in original[e]:
-                    new[e].append(k)
-        return new
-
     def __plot(self, arglist, keyargs):
+        # Journal the elements created while plotting, so that anything added
+        # (temp objects) can be removed at clear time
+        new_elts = vcs._elementsJournal.open()
+        try:
+            return self.__plot_journaled(arglist, keyargs, new_elts)
+        finally:
+            vcs._elementsJournal.close(new_elts)
+
+    def __plot_journaled(self, arglist, keyargs, new_elts):
 
         # This routine has five arguments in arglist from _determine_arg_list
         # It adds one for bg and passes those on to Canvas.plot as its sixth
         # arguments.
 
-        # First of all let's remember which elets we have before comin in here
-        # so that anything added (temp objects) can be removed at clear
-        # time
-        original_elts = {}
-        new_elts = {}
-        for k in list(vcs.elements.keys()):
-            original_elts[k] = list(vcs.elements[k].keys())
-            new_elts[k] = []
         # First of all try some cleanup
         assert len(arglist) == 6
         xtrakw = arglist.pop(5)
@@ -3797,7 +3958,7 @@ class Canvas(vcs.bestMatch):
                     delattr(arglist[0], p)
                 else:
                     setattr(arglist[0], p, tmp)
-            dn.newelements = self.__new_elts(original_elts, new_elts)
+            dn.newelements = vcs._elementsJournal.created(new_elts)
             dn._parent = self
 
             """
@@ -4083,7 +4244,7 @@ class Canvas(vcs.bestMatch):
                     dn._template_origin = template_origin
                     dn.ratio = keyargs.get("ratio", None)
                     dn.continents_line = self.getcontinentsline()
-                    dn.newelements = self.__new_elts(original_elts, new_elts)
+                    dn.newelements = vcs._elementsJournal.created(new_elts)
 
             if self.mode != 0:
                 # self.update()
@@ -4244,7 +4405,7 @@ class Canvas(vcs.bestMatch):
                     if e == "display":
                         continue
                     for k in new_elts[e]:
-                        if k in list(vcs.elements[e].keys()):
+                        if k in vcs.elements[e]:
                             del(vcs.elements[e][k])
             if not preserve_display:
                 del(vcs.elements["display"][nm])
@@ -4779,6 +4940,45 @@ class Canvas(vcs.bestMatch):
 
         return JupyterFFMPEG(movie, result)
 
+    def ffmpegstream(self, movie, bitrate=1024, rate=None, options=None, buffered=4):
+        """Starts a movie fed with raw frames instead of png files.
+        Nothing is written to disk but the movie itself.
+
+        :Example:
+
+            .. doctest:: canvas_ffmpegstream
+
+                >>> a=vcs.init(bg=True)
+                >>> import cdms2
+                >>> f = cdms2.open(vcs.sample_data+'/clt.nc')
+                >>> clt = f('clt')
+                >>> movie = a.ffmpegstream('m1.mp4', rate=5)
+                >>> for i in range(10):
+                ...     a.clear()
+                ...     a.plot(clt[i])
+                ...     movie.write(a.image())
+                <vcs.displayplot.Dp object at 0x...>
+                ...
+                >>> movie.close()
+                <vcs.Canvas.JupyterFFMPEG object at 0x...>
+
+        :param movie: Output video file name
+        :type movie: `str`_
+
+        :param rate: Desired output framerate
+        :type rate: `str`_
+
+        :param options: Additional FFMPEG arguments
+        :type options: `str`_
+
+        :param buffered: Number of frames that can wait for ffmpeg before write blocks
+        :type buffered: `int`_
+
+        :returns: A stream, pass frames to its write method and call close once done
+        :rtype: FFMPEGStream
+        """
+        return FFMPEGStream(movie, bitrate, rate, options, buffered)
+
     def getantialiasing(self):
         """Returns the current antialiasing rate for the canvas.
 
@@ -4862,8 +5062,8 @@ class Canvas(vcs.bestMatch):
                 >>> a.clear() # clear the bars off the canvas
                 >>> a.put_png_on_canvas("bars.png") # put 'bars.png' on canvas
 
-        :param file: Input image filename
-        :type file: `str`_
+        :param file: Input image filename, or an image array as returned by image()
+        :type file: `str`_ or numpy.ndarray
 
         :param zoom: scale factor
         :type zoom: `int`_
@@ -4892,7 +5092,7 @@ class Canvas(vcs.bestMatch):
             *args,
             **kargs)
 
-    def png(self, file, width=None, height=None,
+    def png(self, file=None, width=None, height=None,
             units=None, draw_white_background=True, provenance=False, **args):
         """PNG output, dimensions set via setbgoutputdimensions
 
@@ -4905,6 +5105,7 @@ class Canvas(vcs.bestMatch):
                 >>> a.plot(array)
                 <vcs.displayplot.Dp ...>
                 >>> a.png('example') # Overwrite a png file
+                >>> data = a.png() # png encoded bytes, nothing written to disk
 
         %s
         %s
@@ -4914,10 +5115,14 @@ class Canvas(vcs.bestMatch):
         :param draw_white_background: Boolean value indicating if the
             background should be white. Defaults to True.
         :type draw_white_background: bool
+
+        :returns: The png encoded bytes if file is None
+        :rtype: bytes
         """
-        base = os.path.dirname(file)
-        if base != "" and not os.path.exists(base):
-            raise vcsError("Output path: %s does not exist" % base)
+        if file is not None:
+            base = os.path.dirname(file)
+            if base != "" and not os.path.exists(base):
+                raise vcsError("Output path: %s does not exist" % base)
         if units not in [
                 'inches', 'in', 'cm', 'mm',
                 None, 'pixel', 'pixels', 'dot', 'dots']:
@@ -4944,6 +5149,46 @@ class Canvas(vcs.bestMatch):
                                  xmldocs.output_height,
                                  xmldocs.output_units)
 
+    def image(self, width=None, height=None, units=None, draw_white_background=True):
+        """Returns the canvas as a numpy array, without writing anything to disk
+
+        :Example:
+
+            .. doctest:: canvas_image
+
+                >>> a=vcs.init()
+                >>> array = [range(1, 11) for _ in range(1, 11)]
+                >>> a.plot(array)
+                <vcs.displayplot.Dp ...>
+                >>> img = a.image() # (height, width, 3) uint8 array
+
+        %s
+        %s
+        %s
+
+        :param draw_white_background: Boolean value indicating if the
+            background should be white. If False the array has an alpha channel.
+            Defaults to True.
+        :type draw_white_background: bool
+
+        :returns: RGB or RGBA pixels, first row is the top of the canvas.
+            The array shares its memory with the VTK image.
+        :rtype: numpy.ndarray
+        """
+        if units not in [
+                'inches', 'in', 'cm', 'mm',
+                None, 'pixel', 'pixels', 'dot', 'dots']:
+            raise Exception(
+                "units must be on of inches, in, cm, mm, pixel(s) or dot(s)")
+
+        W, H = self._compute_width_height(
+            width, height, units, background=True)
+        return self.backend.image(W, H, units, draw_white_background)
+    image.__doc__ = image.__doc__ % (xmldocs.output_width,
+                                     xmldocs.output_height,
+                                     xmldocs.output_units)
+    to_array = image
+
     def pdf(self, file, width=None, height=None, units='inches',
             textAsPaths=True):
         """PDF output is another form of vector graphics.
@@ -50,16 +50,8 @@ def color2vcs(col):
 
 
 def matchVcsColor(r, g, b, colormap="default"):
-    rmsmin = 100000000.
-    color = None
     cmap = vcs.elements["colormap"][colormap]
-    for i in range(256):
-        r2, g2, b2 = cmap.index[i][:3]
-        rms = numpy.sqrt((r2 - r) ** 2 + (g2 - g) ** 2 + (b2 - b) ** 2)
-        if rms < rmsmin:
-            rmsmin = rms
-            color = i
-    return color
+    return cmap.index.match([r, g, b])
 
 
 def checkedRaise(self, value, ex, err):
@@ -5,19 +5,32 @@ from . import animate_helper
 import time
 import random
 import hashlib
+import collections
 import os
 import shutil
-import glob
+import sys
+import multiprocessing
+import threading
+import vtk
 import vcs
+from . import vcs2vtk
+from .cache import FrameStore
 
+# Memory the rendered frames of an animation may use before they are written to disk
+frameMemoryBytes = 512 * 1024 * 1024
+# Number of frames read ahead during animations and memory they may use
+prefetchDepth = 4
+prefetchMemoryBytes = 256 * 1024 * 1024
 
-def update_input(canvas, dimensions, frame_num, update=True):
-    # Ok let's loop through the arrays and figure out the slice needed and
-    # update
-    for i, info in enumerate(canvas.animate_info):
-        disp, slabs = info
+
+def read_frame_slices(canvas, dimensions, frame_num):
+    """Reads the data of a frame, returns one (array1, array2) pair per
+    animated display of the canvas (None for displays without data)"""
+    slices = []
+    for disp, slabs in canvas.animate_info:
         slab = slabs[0]
         if slab is None:
+            slices.append(None)
             continue  # nothing to do
         # Ok we have a slab, let's figure which slice it is
         args = []
@@ -28,20 +41,184 @@ def update_input(canvas, dimensions, frame_num, update=True):
             args.append(slice(n, n + 1))
         args = args[::-1]
         if slabs[1] is None:
-            canvas.backend.update_input(
-                disp.backend,
-                slab(
-                    *
-                    args),
-                update=update)
+            slices.append((slab(*args), None))
+        else:
+            slices.append((slab(*args), slabs[1](*args)))
+    return slices
+
+
+def update_input(canvas, dimensions, frame_num, update=True, prefetcher=None):
+    # Ok let's loop through the arrays, get the slice needed and update
+    if prefetcher is not None:
+        slices = prefetcher.get(frame_num)
+    else:
+        slices = read_frame_slices(canvas, dimensions, frame_num)
+    for info, arrays in zip(canvas.animate_info, slices):
+        if arrays is None:
+            continue
+        disp = info[0]
+        if arrays[1] is None:
+            canvas.backend.update_input(disp.backend, arrays[0], update=update)
+        else:
+            canvas.backend.update_input(disp.backend, arrays[0], arrays[1], update=update)
+
+
+class FramePrefetcher(object):
+
+    """Reads the data of the next frames in a background thread while the
+    current frame renders.
+
+    Up to depth frames are read ahead of the last frame asked for, fewer if
+    they would use more than maxbytes. Reads are done one at a time since
+    the file libraries are not thread safe. A depth of 0 reads each frame
+    when it is asked for.
+    """
+
+    def __init__(self, canvas, dimensions, number_of_frames,
+                 depth=4, maxbytes=256 * 1024 * 1024, loop=False):
+        self.canvas = canvas
+        self.dimensions = dimensions
+        self.number_of_frames = number_of_frames
+        self.depth = depth
+        self.maxbytes = maxbytes
+        self.loop = loop
+        self.frame_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._ready = {}
+        self._todo = collections.deque()
+        self._reading = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._read_lock = threading.Lock()
+        self._thread = None
+
+    def _read(self, frame_num):
+        with self._read_lock:
+            slices = read_frame_slices(self.canvas, self.dimensions, frame_num)
+        nbytes = 0
+        for arrays in slices:
+            if arrays is not None:
+                nbytes += sum(a.nbytes for a in arrays if a is not None)
+        self.frame_bytes = max(self.frame_bytes, nbytes)
+        return slices
+
+    def _upcoming(self, frame_num):
+        depth = self.depth
+        if self.frame_bytes > 0:
+            depth = min(depth, self.maxbytes // self.frame_bytes)
+        frames = []
+        for n in range(frame_num + 1, frame_num + depth + 1):
+            if n >= self.number_of_frames:
+                if not self.loop:
+                    break
+                n %= self.number_of_frames
+            if n == frame_num or n in frames:
+                break
+            frames.append(n)
+        return frames
+
+    def get(self, frame_num):
+        """Returns the data of frame_num and starts reading the next frames"""
+        with self._cond:
+            while self._reading == frame_num:
+                self._cond.wait()
+            slices = self._ready.pop(frame_num, None)
+        if slices is None:
+            self.misses += 1
+            slices = self._read(frame_num)
         else:
-            canvas.backend.update_input(
-                disp.backend,
-                slab(
-                    *args),
-                slabs[1](
-                    *args),
-                update=update)
+            self.hits += 1
+        if self.depth > 0 and not self._closed:
+            with self._cond:
+                upcoming = self._upcoming(frame_num)
+                # frames we moved away from are dropped
+                for n in list(self._ready):
+                    if n not in upcoming:
+                        del self._ready[n]
+                self._todo = collections.deque(
+                    n for n in upcoming if n not in self._ready and n != self._reading)
+                self._cond.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+        return slices
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._todo and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                frame_num = self._todo.popleft()
+                self._reading = frame_num
+            try:
+                slices = self._read(frame_num)
+            except Exception:
+                # get() will read it again and report the error
+                slices = None
+            with self._cond:
+                self._reading = None
+                if slices is not None:
+                    self._ready[frame_num] = slices
+                self._cond.notify_all()
+
+    def close(self):
+        """Stops the reading thread and drops the frames read ahead"""
+        with self._cond:
+            self._closed = True
+            self._todo.clear()
+            self._ready.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# Offscreen canvas and number of plotted dimensions of each frame rendering process
+_frame_canvas = None
+_frame_dimensions = None
+# error raised while setting up a worker process, reported by its first frame
+_frame_init_error = None
+
+
+def _init_frame_process(controller, width, height):
+    """Rebuilds the animated displays on a new offscreen canvas"""
+    global _frame_canvas, _frame_dimensions
+    _frame_canvas = vcs.init(bg=True)
+    _frame_canvas.width, _frame_canvas.height = width, height
+    _frame_canvas.setantialiasing(controller.vcs_self.getantialiasing())
+    _frame_canvas.setcolormap(controller.vcs_self.getcolormapname())
+    controller.plot_to_canvas(_frame_canvas, controller.vcs_self.display_names, bg=1)
+    _frame_dimensions = controller._number_of_dims_used_for_plot
+
+
+def _init_frame_worker(controller, width, height):
+    """Pool initializer, a failing initializer would make the pool respawn
+    workers forever so the error is kept for the frames to raise"""
+    global _frame_init_error
+    try:
+        _init_frame_process(controller, width, height)
+    except Exception as err:
+        _frame_init_error = err
+
+
+def _close_frame_canvas():
+    global _frame_canvas
+    if _frame_canvas is not None:
+        _frame_canvas.close()
+        _frame_canvas = None
+
+
+def _render_frame_in_process(frame, prefetcher=None):
+    frame_num, png_name = frame
+    if _frame_init_error is not None:
+        raise RuntimeError("Could not set up the frame rendering process: %r" % (_frame_init_error,))
+    update_input(_frame_canvas, _frame_dimensions, frame_num, update=False, prefetcher=prefetcher)
+    _frame_canvas.png(png_name)
+    return frame_num
 
 
 class VTKAnimationCreate(animate_helper.StoppableThread):
@@ -56,6 +233,9 @@ class VTKAnimationCreate(animate_helper.StoppableThread):
         # space to work with.
         self.canvas.width *= 2
         self.canvas.height *= 2
+        # rendered frames, in memory up to the budget then in png files
+        self.frames = FrameStore(controller.frame_memory(), self.write_frame, self.read_frame)
+        self.prefetcher = None
         self.controller.animation_created = True
         import atexit
         atexit.register(self.close)
@@ -79,30 +259,48 @@ class VTKAnimationCreate(animate_helper.StoppableThread):
         return png_name
 
     def get_frame(self, frame_num):
-        png_name = self.get_frame_name(frame_num)
+        """Returns the image of the frame, rendering it if needed"""
+        frame = self.frames.get(frame_num)
+        if frame is None:
+            frame = self.draw_frame(frame_num)
+        return frame
 
-        if not os.path.exists(png_name):
-            self.draw_frame(frame_num, png_name)
-
-        self.controller.animation_files = sorted(
-            glob.glob(
-                os.path.join(
-                    os.path.dirname(png_name),
-                    "*.png")))
-
-        return png_name
-
-    def draw_frame(self, frame_num, png_name):
+    def draw_frame(self, frame_num):
         """
-        Draw the specified frame on the offscreen canvas, render to png_name, add to controller's animation_files
+        Draw the specified frame on the offscreen canvas and keep its image in the frame store
         """
+        if self.prefetcher is None:
+            self.prefetcher = self.controller.create_prefetcher(self.canvas, loop=True)
         update_input(
             self.canvas,
             self.controller._number_of_dims_used_for_plot,
             frame_num,
-            update=False)
-
-        self.canvas.png(png_name)
+            update=False,
+            prefetcher=self.prefetcher)
+
+        frame = self.canvas.image()
+        self.frames.put(frame_num, frame)
+        return frame
+
+    def write_frame(self, frame_num, frame):
+        """Writes a frame image leaving the memory to its png file"""
+        writer = vtk.vtkPNGWriter()
+        writer.SetInputData(vcs2vtk.numpyToImageData(frame))
+        writer.SetFileName(self.get_frame_name(frame_num))
+        writer.Write()
+
+    def read_frame(self, frame_num):
+        reader = vtk.vtkPNGReader()
+        reader.SetFileName(self.get_frame_name(frame_num))
+        reader.Update()
+        return vcs2vtk.imageDataToNumpy(reader.GetOutput())
+
+    def clear_frames(self):
+        """Forgets all rendered frames and removes their png files"""
+        self.frames.clear()
+        frames_dir = os.path.dirname(self.get_frame_name(0))
+        if os.path.exists(frames_dir):
+            shutil.rmtree(frames_dir)
 
     def describe(self):
         for info in self.controller.animate_info:
@@ -115,7 +313,13 @@ class VTKAnimationCreate(animate_helper.StoppableThread):
             else:
                 print("No Array")
 
+    def close_prefetcher(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
     def close(self):
+        self.close_prefetcher()
         self.canvas.close()
 
 
@@ -159,6 +363,11 @@ class VTKAnimate(animate_helper.AnimationController):
         self.renderers = []
         self.last_size = None
         self.modified_listener = None
+        self._render_cancelled = threading.Event()
+        self._frame_memory = frameMemoryBytes
+        self._prefetch_depth = prefetchDepth
+        self._prefetch_memory = prefetchMemoryBytes
+        self._live_prefetcher = None
 
     def modified(self, obj, event):
         # Use this to sync canvas sizes and to prevent configureEvent from
@@ -180,9 +389,8 @@ class VTKAnimate(animate_helper.AnimationController):
             self.vcs_self.backend._lastSize = new_size
             # All of the images are now the wrong size; need to blow them all
             # away.
-            if self.animation_files:
-                shutil.rmtree(os.path.dirname(self.animation_files[0]))
-                self.animation_files = []
+            self.create_thread.clear_frames()
+            self.animation_files = []
             # We'll use None as a sentinel value to tell us to replot in
             # retrieve_renderers
             self.renderers = None
@@ -296,7 +504,7 @@ class VTKAnimate(animate_helper.AnimationController):
         else:
             self.frame_num = frame_num
 
-        if len(self.animation_files) == self.number_of_frames():
+        if self.frames_rendered() == self.number_of_frames():
             # Attempt to extract the renderers and place them onto the create
             # thread
             self.extract_renderers()
@@ -310,35 +518,204 @@ class VTKAnimate(animate_helper.AnimationController):
         else:
             # self.reclaim_renderers()
 
+            if self._live_prefetcher is None:
+                self._live_prefetcher = self.create_prefetcher(
+                    self.vcs_self, loop=self.playback_params.loop)
             update_input(
                 self.vcs_self,
                 self._number_of_dims_used_for_plot,
                 frame_num,
-                update=False)
+                update=False,
+                prefetcher=self._live_prefetcher)
 
             self.vcs_self.backend.renWin.Render()
 
             if main_window_png or self.playback_params.zoom_factor != 1:
-                png_name = self.create_thread.get_frame_name(self.frame_num)
-                self.vcs_self.png(png_name)
-                self.animation_files = sorted(
-                    glob.glob(
-                        os.path.join(
-                            os.path.dirname(png_name),
-                            "*.png")))
+                self.create_thread.frames.put(self.frame_num, self.vcs_self.image())
 
         if self.signals is not None:
             self.signals.drawn.emit(self.frame_num)
 
+    def render_frames(self, processes=None, progress=None):
+        """
+        Renders all the frames not rendered yet to png files
+          processes: Number of offscreen canvases rendering frames in parallel, defaults to the number of cpus
+          progress: Function called as progress(frames_done, number_of_frames) each time a frame is ready
+        Frames are reported in order. render_cancel() stops the rendering,
+        in which case False is returned.
+        Worker processes are forked (see fork_frame_workers), otherwise the
+        frames are rendered one after the other in this process.
+        """
+        self._render_cancelled.clear()
+        total = self.number_of_frames()
+        frames = self.create_thread.frames
+        # frames only held in memory go to their png files
+        frames.flush()
+        todo = []
+        for frame_num in range(total):
+            png_name = self.create_thread.get_frame_name(frame_num)
+            if not os.path.exists(png_name):
+                todo.append((frame_num, png_name))
+        done = total - len(todo)
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        processes = min(processes, len(todo))
+        context = None
+        if processes > 1 and self.fork_frame_workers():
+            # workers inherit the displays, graphics methods and templates,
+            # no prefetch thread may run while forking
+            self.close_prefetchers()
+            context = multiprocessing.get_context("fork")
+
+        canvas = self.create_thread.canvas
+        if todo and context is None:
+            # same rendering as the worker processes, in this process
+            _init_frame_process(self, canvas.width, canvas.height)
+            prefetcher = self.create_prefetcher(_frame_canvas)
+            try:
+                for frame in todo:
+                    if self._render_cancelled.is_set():
+                        break
+                    frames.add_spilled(_render_frame_in_process(frame, prefetcher))
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+            finally:
+                prefetcher.close()
+                _close_frame_canvas()
+        elif todo:
+            pool = context.Pool(processes, _init_frame_worker, (self, canvas.width, canvas.height))
+            try:
+                for frame_num in pool.imap(_render_frame_in_process, todo):
+                    frames.add_spilled(frame_num)
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+                    if self._render_cancelled.is_set():
+                        break
+            finally:
+                pool.terminate()
+                pool.join()
+
+        self.animation_files = [self.create_thread.get_frame_name(frame_num)
+                                for frame_num in range(total) if frame_num in frames]
+        return done == total
+
+    def fork_frame_workers(self):
+        """Whether render_frames can fork worker processes. Forking copies the
+        state of this process, which is only safe without a window and its
+        OpenGL context: the canvas must be offscreen (bg=True), and macOS
+        (where fork is not the default) always renders in this process."""
+        if sys.platform == "darwin" or not self.vcs_self.backend.bg:
+            return False
+        try:
+            multiprocessing.get_context("fork")
+        except (AttributeError, ValueError):
+            return False
+        return True
+
+    def render_cancel(self):
+        """Stops render_frames once the frames being rendered are done"""
+        self._render_cancelled.set()
+
+    def save(self, movie, bitrate=1024, rate=None, options=None, processes=None, stream=False):
+        """Save animation to a file, frames are rendered in parallel (see render_frames).
+        With stream=True frames are piped to ffmpeg as they are rendered, no png is written."""
+        if stream:
+            return self.stream(movie, bitrate, rate, options)
+        if self.created() and not self.render_frames(processes):
+            return
+        return super(VTKAnimate, self).save(movie, bitrate, rate, options)
+
+    def stream(self, movie, bitrate=1024, rate=None, options=None):
+        """Renders the frames on an offscreen canvas and feeds them to ffmpeg
+        (see Canvas.ffmpegstream). render_cancel() stops the movie early."""
+        if not self.created():
+            return
+        if rate is None:
+            rate = self.playback_params.fps()
+        self._render_cancelled.clear()
+        writer = self.vcs_self.ffmpegstream(movie, bitrate, rate, options)
+        canvas = self.create_thread.canvas
+        _init_frame_process(self, canvas.width, canvas.height)
+        prefetcher = self.create_prefetcher(_frame_canvas)
+        written = False
+        try:
+            for frame_num in range(self.number_of_frames()):
+                if self._render_cancelled.is_set():
+                    break
+                update_input(_frame_canvas, _frame_dimensions, frame_num, update=False, prefetcher=prefetcher)
+                writer.write(_frame_canvas.image())
+            written = True
+        finally:
+            prefetcher.close()
+            _close_frame_canvas()
+            if not written:
+                # do not leave ffmpeg and its feeding thread running
+                writer.terminate()
+        return writer.close()
+
+    def frames_rendered(self):
+        """Number of frames rendered so far, in memory or on disk"""
+        if self.create_thread is None:
+            return 0
+        return len(self.create_thread.frames)
+
+    def frame_memory(self, value=None):
+        """Memory (in bytes) the rendered frames may use before the least
+        recently used ones are written to png files. Returns the current value.
+        """
+        if value is not None:
+            # validated before the controller changes, even without a frame store yet
+            if not isinstance(value, int) or value < 0:
+                raise ValueError("frame memory must be a positive integer or 0")
+            if self.create_thread is not None:
+                self.create_thread.frames.maxbytes = value
+            self._frame_memory = value
+        return self._frame_memory
+
+    def frame_stats(self):
+        """Frame store counters: hits, misses, reads (frames read back from disk),
+        spills, frames, in_memory, nbytes and maxbytes"""
+        if self.create_thread is None:
+            return None
+        return self.create_thread.frames.stats()
+
+    def create_prefetcher(self, canvas, loop=False):
+        """Returns a FramePrefetcher reading the frames of the displays animated on canvas"""
+        return FramePrefetcher(canvas, self._number_of_dims_used_for_plot, self.number_of_frames(),
+                               self._prefetch_depth, self._prefetch_memory, loop)
+
+    def close_prefetchers(self):
+        if self._live_prefetcher is not None:
+            self._live_prefetcher.close()
+            self._live_prefetcher = None
+        if self.create_thread is not None:
+            self.create_thread.close_prefetcher()
+
+    def prefetch(self, depth=None, memory=None):
+        """Number of frames whose data is read ahead in the background while a frame renders,
+        and memory (in bytes) these frames may use. 0 turns reading ahead off.
+        Returns the current (depth, memory).
+        """
+        if depth is not None:
+            self._prefetch_depth = depth
+        if memory is not None:
+            self._prefetch_memory = memory
+        # the next frames use the new settings
+        self.close_prefetchers()
+        return self._prefetch_depth, self._prefetch_memory
+
     def stop(self):
         super(VTKAnimate, self).stop()
+        self.close_prefetchers()
         self.reclaim_renderers()
 
     def reset(self):
+        self.close_prefetchers()
         if self.create_thread:
-            if self.animation_files:
-                shutil.rmtree(os.path.dirname(self.animation_files[0]))
-                self.animation_files = []
+            self.create_thread.clear_frames()
+            self.animation_files = []
             self.create_thread.create_prefix()
             self.reclaim_renderers()
 
@@ -207,6 +207,8 @@ class VTKVCSBackend(object):
     def __init__(self, canvas, renWin=None,
                  debug=False, bg=None):
         self._lastSize = None
+        # context area -> (geometry, window size) it was first laid out for
+        self._areaLayout = {}
         self.canvas = canvas
         self.renWin = renWin
         self.contextView = None
@@ -248,6 +250,9 @@ class VTKVCSBackend(object):
             # "vtk_backend_pipeline_context_area",
             "vtk_backend_viewport_scale",
             "vtk_backend_draw_area_bounds",
+            # block-aggregate boxfill/isofill data to the data area pixel size:
+            # True or "mean", "max", "nearest"
+            "lod",
         ]
         self.numberOfPlotCalls = 0
         self.renderWindowSize = None
@@ -313,20 +318,157 @@ class VTKVCSBackend(object):
             self.configureEvent(caller, evt)
             self.renderWindowSize = window_size
 
-    def leftButtonPressEvent(self, obj, event):
-        pipelineItems = None
-        dataset = None
+    def probeTarget(self):
+        # The display clicks and probes are resolved on: the last one with data
         targetDisplay = None
-        st = ''
-
         for dnm in self.canvas.display_names:
             d = vcs.elements["display"][dnm]
             if d.array[0] is None:
                 continue
             else:
                 targetDisplay = d
-                dataset = d.backend['vtk_backend_grid']
-                pipelineItems = d.backend['vtk_backend_actors']
+        return targetDisplay
+
+    def getCellLocator(self, vtkobjects):
+        """Returns a cell locator over the grid of a display.
+
+        The locator is built on first use and kept in the display backend
+        dictionary. It is rebuilt only when the points or cells of the grid
+        change, not when update_input pushes new values.
+        """
+        dataset = vtkobjects["vtk_backend_grid"]
+        key = vcs2vtk.geometryMTime(dataset)
+        cached = vtkobjects.get("vtk_backend_locator", None)
+        if cached is not None and cached[0].GetDataSet() is dataset and cached[1] == key:
+            return cached[0]
+        cellLocator = vtk.vtkCellLocator()
+        cellLocator.SetDataSet(dataset)
+        cellLocator.BuildLocator()
+        vtkobjects["vtk_backend_locator"] = (cellLocator, key)
+        return cellLocator
+
+    def getProbeSource(self, vtkobjects):
+        """Returns the dataset probe() finds cells in, see vcs2vtk.probeSource.
+
+        Like the cell locator it is kept in the display backend dictionary
+        until the points or cells of the grid change.
+        """
+        dataset = vtkobjects["vtk_backend_grid"]
+        key = vcs2vtk.geometryMTime(dataset)
+        cached = vtkobjects.get("vtk_backend_probe_source", None)
+        if cached is not None and cached[1] is dataset and cached[2] == key:
+            return cached[0]
+        source = vcs2vtk.probeSource(dataset)
+        vtkobjects["vtk_backend_probe_source"] = (source, dataset, key)
+        return source
+
+    def probe(self, vtkobjects, x, y, projected=False):
+        """Returns the values of a display's data at points (x, y).
+
+        :param vtkobjects: backend dictionary of the display
+        :type vtkobjects: `dict`_
+
+        :param x: x coordinates (longitudes) of the points
+        :type x: `numpy.ndarray`_
+
+        :param y: y coordinates (latitudes) of the points
+        :type y: `numpy.ndarray`_
+
+        :param projected: x and y are already in the projected coordinates
+            of the grid
+        :type projected: `bool`_
+
+        :return: one value per point (one row of components for vectors),
+            masked where no cell is found or the data is missing
+        :rtype: `numpy.ma.MaskedArray`_
+        """
+        dataset = vtkobjects["vtk_backend_grid"]
+        xyz = numpy.zeros((len(x), 3))
+        xyz[:, 0] = x
+        xyz[:, 1] = y
+        geoTransform = vtkobjects.get("vtk_backend_geo", None)
+        if geoTransform is not None and not projected:
+            pts = vtk.vtkPoints()
+            pts.SetData(vcs2vtk.numpy_to_vtk_wrapper(xyz, deep=False))
+            geopts = vtk.vtkPoints()
+            geoTransform.TransformPoints(pts, geopts)
+            xyz = VN.vtk_to_numpy(geopts.GetData())
+        cells, closestPoints, found = vcs2vtk.probePoints(self.getProbeSource(vtkobjects), xyz)
+        # ghost arrays are indexed by cell (or point) ids of the grid,
+        # values by global ids, as in leftButtonPressEvent
+        gridIds = numpy.where(found, cells, 0)
+        elements = gridIds
+
+        globalIds = dataset.GetCellData().GetGlobalIds()
+        if globalIds is not None:
+            elements = VN.vtk_to_numpy(globalIds)[gridIds]
+        data = dataset.GetCellData()
+        hidden = vtk.vtkDataSetAttributes.HIDDENCELL
+        attributes = data.GetScalars()
+        if attributes is None:
+            attributes = data.GetVectors()
+        if attributes is None:
+            # point dataset, use the closest point of the cell
+            data = dataset.GetPointData()
+            hidden = vtk.vtkDataSetAttributes.HIDDENPOINT
+            attributes = data.GetScalars()
+            if attributes is None:
+                attributes = data.GetVectors()
+            elements = numpy.where(found, closestPoints, 0)
+            gridIds = elements
+        if attributes is None:
+            return numpy.ma.masked_all((len(cells),))
+        values = VN.vtk_to_numpy(attributes)[elements]
+        missing = ~found
+        ghost = data.GetArray(vtk.vtkDataSetAttributes.GhostArrayName())
+        if ghost is not None:
+            missing |= (VN.vtk_to_numpy(ghost)[gridIds] & hidden) != 0
+        if values.ndim > 1:
+            # vectors, keep the two components of the plot
+            values = values[:, :2]
+            missing = numpy.repeat(missing[:, numpy.newaxis], 2, axis=1)
+        return numpy.ma.array(values, mask=missing)
+
+    def probeScreen(self, x, y):
+        """Returns the display under window pixels (x, y), the data coordinates
+        of the pixels and the values there, see Canvas.probe."""
+        targetDisplay = self.probeTarget()
+        if (targetDisplay is None or
+                not targetDisplay.backend.get("vtk_backend_actors") or
+                targetDisplay.backend.get("vtk_backend_grid") is None):
+            return None
+        # see leftButtonPressEvent, scene mapping is only right after a render
+        self.renWin.Render()
+        item = targetDisplay.backend["vtk_backend_actors"][0][0]
+        # the scene to item mapping is affine, three mapped points give it
+        origin, xAxis, yAxis = [item.MapFromScene(vtk.vtkVector2f(*p)) for p in ((0, 0), (1, 0), (0, 1))]
+        origin = numpy.array([origin[0], origin[1]])
+        xAxis = numpy.array([xAxis[0], xAxis[1]]) - origin
+        yAxis = numpy.array([yAxis[0], yAxis[1]]) - origin
+        world = numpy.zeros((len(x), 3))
+        world[:, :2] = (origin + numpy.asarray(x, dtype=numpy.float64)[:, numpy.newaxis] * xAxis +
+                        numpy.asarray(y, dtype=numpy.float64)[:, numpy.newaxis] * yAxis)
+        values = self.probe(targetDisplay.backend, world[:, 0], world[:, 1], projected=True)
+        lonLat = world
+        geoTransform = targetDisplay.backend.get("vtk_backend_geo", None)
+        if geoTransform is not None:
+            pts = vtk.vtkPoints()
+            pts.SetData(vcs2vtk.numpy_to_vtk_wrapper(world, deep=False))
+            geopts = vtk.vtkPoints()
+            # the transform is shared with other displays, it is not inverted in place
+            vcs2vtk.inverseGeoTransform(geoTransform).TransformPoints(pts, geopts)
+            lonLat = VN.vtk_to_numpy(geopts.GetData())
+        return targetDisplay, lonLat[:, 0].copy(), lonLat[:, 1].copy(), values
+
+    def leftButtonPressEvent(self, obj, event):
+        pipelineItems = None
+        dataset = None
+        st = ''
+
+        targetDisplay = self.probeTarget()
+        if targetDisplay is not None:
+            dataset = targetDisplay.backend['vtk_backend_grid']
+            pipelineItems = targetDisplay.backend['vtk_backend_actors']
 
         if (pipelineItems is not None and
                 len(pipelineItems) > 0 and
@@ -347,9 +489,7 @@ class VTKVCSBackend(object):
             screenPos = vtk.vtkVector2f(xy[0], xy[1])
             worldCoords = item.MapFromScene(screenPos)
 
-            cellLocator = vtk.vtkCellLocator()
-            cellLocator.SetDataSet(dataset)
-            cellLocator.BuildLocator()
+            cellLocator = self.getCellLocator(targetDisplay.backend)
 
             testPoint = [worldCoords[0], worldCoords[1], 0.0]
             closestPoint = [0, 0, 0]
@@ -377,7 +517,8 @@ class VTKVCSBackend(object):
 
             geoTransform = targetDisplay.backend['vtk_backend_geo']
             if (geoTransform):
-                geoTransform.Inverse()
+                # shared with other displays, it is not inverted in place
+                geoTransform = vcs2vtk.inverseGeoTransform(geoTransform)
 
             worldCoords = [worldCoords[0], worldCoords[1], 0.0]
             lonLat = worldCoords
@@ -401,7 +542,6 @@ class VTKVCSBackend(object):
             if (geoTransform):
                 geoTransform.InternalTransformPoint(
                     worldCoords, lonLat)
-                geoTransform.Inverse()
             if (float("inf") not in lonLat):
                 st += "X=%4.1f\nY=%4.1f\n" % (
                     lonLat[0], lonLat[1])
@@ -463,6 +603,10 @@ class VTKVCSBackend(object):
             # not catch configure Events but only modifiedEvents....
             return
 
+        if self.relayout(sz):
+            self._lastSize = sz
+            return
+
         self._lastSize = sz
         plots_args = []
         key_args = []
@@ -520,7 +664,8 @@ class VTKVCSBackend(object):
             new = updateNewElementsDict(d, new)
 
         # Now clean the object created internally that are no longer
-        # in use
+        # in use, i.e. not the graphics method of any existing display
+        inUse = None
         for e in new:
             if e == "display":
                 continue
@@ -528,16 +673,12 @@ class VTKVCSBackend(object):
             for k in new[e]:
                 # Loop through all elements created internally for that type
                 if k in vcs.elements[e]:
-                    found = False
-                    # Loop through all existing displays
-                    for d in list(vcs.elements["display"].values()):
-                        if d.g_type == e and d.g_name == k:
-                            # Ok this is still in use on some display
-                            found = True
+                    if inUse is None:
+                        inUse = set((d.g_type, d.g_name) for d in vcs.elements["display"].values())
                     # object is no longer associated with any display
                     # and it was created internally
                     # we can safely remove it
-                    if not found:
+                    if (e, k) not in inUse:
                         del(vcs.elements[e][k])
 
         # Only keep original displays since we replotted on them
@@ -558,6 +699,74 @@ class VTKVCSBackend(object):
         if restart_anim:
             self.canvas.configurator.start_animating()
 
+    def _needsReplot(self, display):
+        # ratio and autot viewports are computed for the window aspect ratio
+        if display.ratio is not None:
+            return True
+        g_type = display.g_type
+        if g_type in ["xvsy", "xyvsy", "yxvsx", "scatter"]:
+            g_type = "1d"
+        gm = vcs.getgraphicsmethod(g_type, display.g_name)
+        # so are the world coordinates of projected plots
+        projection = getattr(gm, "projection", None)
+        if projection is not None and vcs.elements["projection"][projection].type != "linear":
+            return True
+        # markers and contour labels are sized in pixels when plotted,
+        # moving their context area would scale them with the window
+        if display.g_type in ["marker", "scatter"]:
+            return True
+        if display.g_type in ["xvsy", "xyvsy", "yxvsx"]:
+            return vcs.elements["1d"][display.g_name].marker is not None
+        if display.g_type == "isoline":
+            return vcs.elements["isoline"][display.g_name].label == "y"
+        return False
+
+    def relayout(self, size):
+        """Moves the context areas already in the scene to a new window size
+        instead of replotting every display.
+
+        Context area geometries, and with them pattern spacing and the logo,
+        are scaled with the window. Texts pick up their new font size when
+        painted. Displays plotted with a ratio (autot included) or a non
+        linear projection are laid out for the window aspect ratio, markers
+        and contour labels are sized in pixels: when any display has them
+        nothing is moved and False is returned, the displays need a full
+        replot.
+
+        :param size: new window size
+        :type size: `tuple`_
+
+        :return: True if the scene was laid out for the new size
+        :rtype: `bool`_
+        """
+        if self._lastSize is None or self.contextView is None or 0 in size:
+            return False
+        for dnm in self.canvas.display_names:
+            if self._needsReplot(vcs.elements["display"][dnm]):
+                return False
+        scene = self.contextView.GetScene()
+        areas = []
+        for i in range(scene.GetNumberOfItems()):
+            area = scene.GetItem(i)
+            if not isinstance(area, vtk.vtkContextArea):
+                continue
+            if area not in self._areaLayout:
+                # first move for this area, it was laid out for the last size
+                g = area.GetGeometry()
+                self._areaLayout[area] = (
+                    (g.GetX(), g.GetY(), g.GetWidth(), g.GetHeight()),
+                    self._lastSize)
+            areas.append(area)
+        for area in areas:
+            (x, y, w, h), base = self._areaLayout[area]
+            xs = float(size[0]) / base[0]
+            ys = float(size[1]) / base[1]
+            area.SetGeometry(vtk.vtkRecti(int(round(x * xs)),
+                                          int(round(y * ys)),
+                                          int(round(w * xs)),
+                                          int(round(h * ys))))
+        return True
+
     def clear(self, render=True):
         if self.renWin is None:  # Nothing to clear
             return
@@ -592,6 +801,7 @@ class VTKVCSBackend(object):
                 self.logoContextItemPython = None
 
         self._animationActorTransforms = {}
+        self._areaLayout = {}
 
         self.showGUI(render=False)
 
@@ -881,102 +1091,21 @@ class VTKVCSBackend(object):
             returned.update(self.plot3D(data1, data2, tpl, gm, ren, **kargs))
         elif gtype in ["text"]:
             if tt.priority != 0:
-                # FIXME: May eventually want to use this key to store the context
-                # FIXME: area we create so that we don't have to recompute the projected
-                # FIXME: bounds.
-                # tt_key = (
-                #     tt.priority, tuple(
-                #         tt.viewport), tuple(
-                #         tt.worldcoordinate), tt.projection)
-
-                if vcs.elements["projection"][tt.projection].type != "linear":
-                    plotting_bounds = kargs.get(
-                        "plotting_dataset_bounds", None)
-                    if plotting_bounds:
-                        newbounds = vcs2vtk.getProjectedBoundsForWorldCoords(
-                            plotting_bounds, tt.projection)
-                        if all([not math.isinf(b) for b in newbounds]):
-                            bounds = newbounds
-
-                view = self.contextView
-
-                area = vtk.vtkContextArea()
-                view.GetScene().AddItem(area)
-
-                vp = self.canvas._viewport
-                wc = self.canvas._worldcoordinate
-
-                [renWinWidth, renWinHeight] = self.renWin.GetSize()
-                geom = vtk.vtkRecti(int(round(vp[0] * renWinWidth)),
-                                    int(round(vp[2] * renWinHeight)),
-                                    int(round((vp[1] - vp[0]) * renWinWidth)),
-                                    int(round((vp[3] - vp[2]) * renWinHeight)))
-
-                rect = vtk.vtkRectd(0.0, 0.0, float(
-                    renWinWidth), float(renWinHeight))
-
-                vcs2vtk.configureContextArea(area, rect, geom)
-
-                returned["vtk_backend_text_actors"] = vcs2vtk.genTextActor(
-                    area,
-                    to=to,
-                    tt=tt,
-                    cmap=self.canvas.colormap, geoBounds=bounds, geo=vtk_backend_geo)
+                returned["vtk_backend_text_actors"] = self.plotText(
+                    tt, to, bounds, vtk_backend_geo, kargs.get("plotting_dataset_bounds", None))
         elif gtype == "line":
             if gm.priority != 0:
-                vcs2vtk.prepLine(self, gm, geoBounds=bounds,
-                                 cmap=self.canvas.colormap)
+                self.plotLine(gm, bounds)
                 # FIXME: we may need to keeep track of the context items generated here
                 # returned["vtk_backend_line_actors"] = actors
 
         elif gtype == "marker":
             if gm.priority != 0:
-                view = self.contextView
-
-                area = vtk.vtkContextArea()
-                view.GetScene().AddItem(area)
-
-                vp = gm.viewport
-                wc = gm.worldcoordinate
-
-                [renWinWidth, renWinHeight] = self.renWin.GetSize()
-                geom = vtk.vtkRecti(int(round(vp[0] * renWinWidth)),
-                                    int(round(vp[2] * renWinHeight)),
-                                    int(round((vp[1] - vp[0]) * renWinWidth)),
-                                    int(round((vp[3] - vp[2]) * renWinHeight)))
-
-                xScale, yScale, xc, yc, yd, flipX, flipY = self.computeScaleToFitViewport(
-                    vp,
-                    wc=wc,
-                    geoBounds=None,
-                    geo=None)
-
-                newWc = [wc[0] * xScale, wc[1] * xScale,
-                         wc[2] * yScale, wc[3] * yScale]
-
-                rect = vtk.vtkRectd(
-                    newWc[0], newWc[2], newWc[1] - newWc[0], newWc[3] - newWc[2])
-                vcs2vtk.configureContextArea(area, rect, geom)
-
-                actors = vcs2vtk.prepMarker(gm, [geom[2], geom[3]], scale=[
-                                            xScale, yScale], cmap=self.canvas.colormap)
-                returned["vtk_backend_marker_actors"] = actors
-
-                for g, pd, geo in actors:
-                    item = vtk.vtkPolyDataItem()
-                    item.SetPolyData(g)
-
-                    item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                    colorArray = g.GetCellData().GetArray('Colors')
-
-                    item.SetMappedColors(colorArray)
-                    area.GetDrawAreaItem().AddItem(item)
+                returned["vtk_backend_marker_actors"] = self.plotMarker(gm)
 
         elif gtype == "fillarea":
             if gm.priority != 0:
-                actors = vcs2vtk.prepFillarea(self, self.renWin, gm,
-                                              cmap=self.canvas.colormap)
-                returned["vtk_backend_fillarea_actors"] = actors
+                returned["vtk_backend_fillarea_actors"] = self.plotFillarea(gm)
         else:
             raise Exception(
                 "Graphic type: '%s' not re-implemented yet" %
@@ -989,6 +1118,129 @@ class VTKVCSBackend(object):
 
         return returned
 
+    def plotText(self, tt, to, bounds=None, geo=None, plotting_bounds=None):
+        # FIXME: May eventually want to use this key to store the context
+        # FIXME: area we create so that we don't have to recompute the projected
+        # FIXME: bounds.
+        # tt_key = (
+        #     tt.priority, tuple(
+        #         tt.viewport), tuple(
+        #         tt.worldcoordinate), tt.projection)
+
+        if vcs.elements["projection"][tt.projection].type != "linear":
+            if plotting_bounds:
+                newbounds = vcs2vtk.getProjectedBoundsForWorldCoords(
+                    plotting_bounds, tt.projection)
+                if all([not math.isinf(b) for b in newbounds]):
+                    bounds = newbounds
+
+        view = self.contextView
+
+        area = vtk.vtkContextArea()
+        view.GetScene().AddItem(area)
+
+        vp = self.canvas._viewport
+
+        [renWinWidth, renWinHeight] = self.renWin.GetSize()
+        geom = vtk.vtkRecti(int(round(vp[0] * renWinWidth)),
+                            int(round(vp[2] * renWinHeight)),
+                            int(round((vp[1] - vp[0]) * renWinWidth)),
+                            int(round((vp[3] - vp[2]) * renWinHeight)))
+
+        rect = vtk.vtkRectd(0.0, 0.0, float(
+            renWinWidth), float(renWinHeight))
+
+        vcs2vtk.configureContextArea(area, rect, geom)
+
+        return vcs2vtk.genTextActor(
+            area,
+            to=to,
+            tt=tt,
+            cmap=self.canvas.colormap, geoBounds=bounds, geo=geo)
+
+    def plotLine(self, gm, bounds=None):
+        vcs2vtk.prepLine(self, gm, geoBounds=bounds,
+                         cmap=self.canvas.colormap)
+
+    def plotMarker(self, gm):
+        view = self.contextView
+
+        area = vtk.vtkContextArea()
+        view.GetScene().AddItem(area)
+
+        vp = gm.viewport
+        wc = gm.worldcoordinate
+
+        [renWinWidth, renWinHeight] = self.renWin.GetSize()
+        geom = vtk.vtkRecti(int(round(vp[0] * renWinWidth)),
+                            int(round(vp[2] * renWinHeight)),
+                            int(round((vp[1] - vp[0]) * renWinWidth)),
+                            int(round((vp[3] - vp[2]) * renWinHeight)))
+
+        xScale, yScale, xc, yc, yd, flipX, flipY = self.computeScaleToFitViewport(
+            vp,
+            wc=wc,
+            geoBounds=None,
+            geo=None)
+
+        newWc = [wc[0] * xScale, wc[1] * xScale,
+                 wc[2] * yScale, wc[3] * yScale]
+
+        rect = vtk.vtkRectd(
+            newWc[0], newWc[2], newWc[1] - newWc[0], newWc[3] - newWc[2])
+        vcs2vtk.configureContextArea(area, rect, geom)
+
+        actors = vcs2vtk.prepMarker(gm, [geom[2], geom[3]], scale=[
+                                    xScale, yScale], cmap=self.canvas.colormap)
+
+        for g, pd, geo in actors:
+            item = vtk.vtkPolyDataItem()
+            item.SetPolyData(g)
+
+            item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
+            colorArray = g.GetCellData().GetArray('Colors')
+
+            item.SetMappedColors(colorArray)
+            area.GetDrawAreaItem().AddItem(item)
+        return actors
+
+    def plotFillarea(self, gm):
+        return vcs2vtk.prepFillarea(self, self.renWin, gm,
+                                    cmap=self.canvas.colormap)
+
+    def plotDecorations(self, decorations, bg, **kargs):
+        """Draws a list of unregistered texts, lines, markers and fillareas
+        (see vcs.decorations) exactly as plot() would draw each of them,
+        without going through Canvas.plot and the elements registry."""
+        if self.bg is None:
+            if bg:
+                self.bg = True
+            else:
+                self.bg = False
+        self.createRenWin(**kargs)
+        if self.bg:
+            self.renWin.SetOffScreenRendering(True)
+        self.cell_coordinates = kargs.get('cell_coordinates', None)
+        self.canvas.initLogoDrawing()
+        vtk_dataset_bounds_no_mask = kargs.get(
+            "vtk_dataset_bounds_no_mask", None)
+        bounds = vtk_dataset_bounds_no_mask if vtk_dataset_bounds_no_mask else None
+        for d in decorations:
+            if d.priority == 0:
+                continue
+            # keeps the layers numbering of one plot call per decoration
+            self.numberOfPlotCalls += 1
+            if d.s_name == "Tc":
+                self.plotText(d.Tt, d.To, bounds, kargs.get("vtk_backend_geo", None),
+                              kargs.get("plotting_dataset_bounds", None))
+            elif d.s_name == "Tl":
+                self.plotLine(d, bounds)
+            elif d.s_name == "Tm":
+                self.plotMarker(d)
+            elif d.s_name == "Tf":
+                self.plotFillarea(d)
+        self.scaleLogo()
+
     def setLayer(self, renderer, priority):
         n = self.numberOfPlotCalls + (priority - 1) * 200 + 1
         nMax = max(self.renWin.GetNumberOfLayers(), n + 1)
@@ -1043,15 +1295,8 @@ class VTKVCSBackend(object):
             'xaxisconvert', 'linear')]['forward']
         yforward = vcs.utils.axisConvertFunctions[kargs.get(
             'yaxisconvert', 'linear')]['forward']
-        contData = vcs2vtk.prepContinents(continents_path, xforward, yforward)
-        contData = vcs2vtk.doWrapData(contData, wc, fastClip=False)
-
-        if projection.type != "linear":
-            cpts = contData.GetPoints()
-            # we use plotting coordinates for doing the projection so
-            # that parameters such that central meridian are set correctly.
-            _, gcpts = vcs2vtk.project(cpts, projection, wc)
-            contData.SetPoints(gcpts)
+        contData = vcs2vtk.prepProjectedContinents(continents_path, wc, projection,
+                                                   xforward, yforward)
 
         contLine = self.canvas.getcontinentsline()
 
@@ -1277,11 +1522,15 @@ class VTKVCSBackend(object):
         winSize = self.renWin.GetSize()
         self.hideGUI()
 
-        readerFactory = vtk.vtkImageReader2Factory()
-        reader = readerFactory.CreateImageReader2(filename)
-        reader.SetFileName(filename)
-        reader.Update()
-        imageData = reader.GetOutput()
+        if isinstance(filename, numpy.ndarray):
+            # image already in memory (see image())
+            imageData = vcs2vtk.numpyToImageData(filename)
+        else:
+            readerFactory = vtk.vtkImageReader2Factory()
+            reader = readerFactory.CreateImageReader2(filename)
+            reader.SetFileName(filename)
+            reader.Update()
+            imageData = reader.GetOutput()
 
         spc = imageData.GetSpacing()
         ext = imageData.GetExtent()
@@ -1454,20 +1703,12 @@ class VTKVCSBackend(object):
             geometry='1600x1200'):
         raise RuntimeError("gif method not implemented in VTK backend yet")
 
-    def png(self, file, width=None, height=None,
-            units=None, draw_white_background=True, **args):
-
+    def _windowToImage(self, width=None, height=None, draw_white_background=True, **args):
+        """Renders the window (at width x height if given) into a vtkWindowToImageFilter.
+        Returns the filter and the canvas dimensions to restore with _restoreSize."""
         if self.renWin is None:
             raise Exception("Nothing to dump aborting")
 
-        if not file.split('.')[-1].lower() in ['png']:
-            file += '.png'
-
-        try:
-            os.remove(file)
-        except Exception:
-            pass
-
         user_dims = None
 
         sz = self.renWin.GetSize()
@@ -1499,21 +1740,55 @@ x.geometry(1200,800)
         self.hideGUI()
         self.renWin.Render()
         self.showGUI(render=False)
+        return imgfiltr, user_dims
+
+    def _restoreSize(self, user_dims):
+        if user_dims is not None:
+            self.canvas.width, self.canvas.height = user_dims
+            self.setsize(self.canvas.width, self.canvas.height)
+            self.renWin.Render()
+
+    def png(self, file, width=None, height=None,
+            units=None, draw_white_background=True, **args):
+        """Writes the canvas to png 'file', or returns the png encoded bytes if file is None"""
+        if file is not None:
+            if not file.split('.')[-1].lower() in ['png']:
+                file += '.png'
+
+            try:
+                os.remove(file)
+            except Exception:
+                pass
+
+        imgfiltr, user_dims = self._windowToImage(width, height, draw_white_background, **args)
 
         writer = vtk.vtkPNGWriter()
         compression = args.get('compression', 5)  # get compression from user
         writer.SetCompressionLevel(compression)  # set compression level
         writer.SetInputConnection(imgfiltr.GetOutputPort())
-        writer.SetFileName(file)
+        if file is None:
+            writer.WriteToMemoryOn()
+        else:
+            writer.SetFileName(file)
         # add text chunks to the writer
         m = args.get('metadata', {})
         for k, v in m.items():
             writer.AddText(k, json.dumps(v))
         writer.Write()
-        if user_dims is not None:
-            self.canvas.width, self.canvas.height = user_dims
-            self.setsize(self.canvas.width, self.canvas.height)
-            self.renWin.Render()
+        self._restoreSize(user_dims)
+        if file is None:
+            return VN.vtk_to_numpy(writer.GetResult()).tobytes()
+
+    def image(self, width=None, height=None,
+              units=None, draw_white_background=True, **args):
+        """Returns the canvas as a (height, width, 3 or 4) uint8 numpy array,
+        first row at the top. The array is a view on the VTK image, no copy is made."""
+        imgfiltr, user_dims = self._windowToImage(width, height, draw_white_background, **args)
+        imgfiltr.Update()
+        img = imgfiltr.GetOutput()
+        self._restoreSize(user_dims)
+        # vtk_to_numpy keeps a reference to the vtk array
+        return vcs2vtk.imageDataToNumpy(img)
 
     def cgm(self, file):
         if self.renWin is None:
@@ -1735,7 +2010,13 @@ x.geometry(1200,800)
         if "vtk_backend_grid" in vtkobjects:
             # Ok ths is where we update the input data
             vg = vtkobjects["vtk_backend_grid"]
-            vcs2vtk.setArray(vg, array1.filled(0).flat, "scalar",
+            # the grid holds the reduced data, the template strings below
+            # still describe the full array
+            reduced = array1
+            if "vtk_backend_lod" in vtkobjects:
+                factors, method = vtkobjects["vtk_backend_lod"]
+                reduced = vcs.utils.blockReduce2D(array1, factors, method)
+            vcs2vtk.setArray(vg, reduced.filled(0).flat, "scalar",
                              isCellData=vg.GetCellData().GetScalars(),
                              isScalars=True)
 
@@ -1745,7 +2026,7 @@ x.geometry(1200,800)
                 missingMapper, color, cellData = vtkobjects[
                     "vtk_backend_missing_mapper"]
                 missingMapper2 = vcs2vtk.putMaskOnVTKGrid(
-                    array1,
+                    reduced,
                     vg,
                     color,
                     cellData,
@@ -1756,6 +2037,11 @@ x.geometry(1200,800)
                 for c in vtkobjects["vtk_backend_contours"]:
                     c.Update()
                 ports = vtkobjects["vtk_backend_contours"]
+            elif "vtk_backend_bands" in vtkobjects:
+                # custom boxfill and meshfill, only the band of each cell
+                # changes, the pattern items follow their band
+                vtkobjects["vtk_backend_bands"].update()
+                ports = None
             elif "vtk_backend_geofilters" in vtkobjects:
                 ports = vtkobjects["vtk_backend_geofilters"]
             else:
@@ -1766,7 +2052,7 @@ x.geometry(1200,800)
                 vg.GetPointData().AddArray(w)
                 ports[0].SetInputData(vg)
 
-            if "vtk_backend_actors" in vtkobjects:
+            if "vtk_backend_actors" in vtkobjects and ports is not None:
                 i = 0
                 for a in vtkobjects["vtk_backend_actors"]:
                     beItem = a[0]
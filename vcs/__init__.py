@@ -48,12 +48,129 @@ model for defining a plot, that is decomposed into three parts:
 """
 import warnings
 import difflib
-import pkg_resources
-vcs_egg_path = pkg_resources.resource_filename(pkg_resources.Requirement.parse("vcs"), "share/vcs")
+import collections
+import contextlib
+try:
+    # much cheaper to import than pkg_resources
+    from importlib import metadata as _metadata
+    vcs_egg_path = str(_metadata.distribution("vcs").locate_file("share/vcs"))
+except Exception:
+    import pkg_resources
+    vcs_egg_path = pkg_resources.resource_filename(pkg_resources.Requirement.parse("vcs"), "share/vcs")
+
+
+# Stack of the attribute queues of the open deferred_validation() contexts
+_deferredAttributes = []
+
+
+class VCSValidationError(ValueError):
+    """Several attributes assigned together failed validation.
+
+    errors holds one (object, attribute, exception) tuple per failure.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super(VCSValidationError, self).__init__("\n".join(
+            "%s.%s: %s" % (getattr(obj, "name", obj.__class__.__name__), a, err) for obj, a, err in errors))
+
+
+def _sameValue(current, value):
+    """Whether value is current, same type and equal, so assigning it again
+    would not change the object"""
+    if type(current) is not type(value):
+        return False
+    try:
+        return bool(current == value)
+    except Exception:
+        # arrays and other values without a single truth value
+        return False
+
+
+def _applyAttributes(queued, changedOnly=False):
+    """Assigns the queued [(object, {attribute: value})] through the regular
+    validating setters, returns the [(object, attribute, exception)] failures.
+
+    With changedOnly the attributes that already hold their value are not
+    validated again."""
+    errors = []
+    for obj, attrs in queued:
+        for a, v in attrs.items():
+            try:
+                if changedOnly and _sameValue(getattr(obj, a), v):
+                    continue
+            except Exception:
+                # unknown attribute, the setter reports it
+                pass
+            try:
+                setattr(obj, a, v)
+            except Exception as err:
+                errors.append((obj, a, err))
+    return errors
+
+
+@contextlib.contextmanager
+def deferred_validation():
+    """Postpones the assignments made with setattributes() until the end of
+    the context, where each object's attributes are validated once, in the
+    order they were last given. Assigning an attribute directly inside the
+    context drops its queued value. Attributes that already hold the value they
+    are given are left alone: elements loaded from a script start as a copy
+    of their source, so most of their attributes are not validated again.
+
+    Failures do not stop the other assignments, they are all reported
+    together in a VCSValidationError raised when the context exits.
+
+    :Example:
+
+        .. doctest:: vcs_deferred_validation
+
+            >>> with vcs.deferred_validation():
+            ...     gm = vcs.createboxfill()
+            ...     gm.setattributes(boxfill_type="custom", levels=[0, 10, 20])
+            ...     gm.setattributes(levels=[0, 5, 10, 20]) # replaces the previous levels
+            >>> len(gm.levels)
+            4
+    """
+    queue = collections.OrderedDict()
+    _deferredAttributes.append(queue)
+    try:
+        yield
+    finally:
+        _deferredAttributes.remove(queue)
+    errors = _applyAttributes(list(queue.values()), changedOnly=True)
+    if errors:
+        raise VCSValidationError(errors)
 
 
 class bestMatch(object):
+    def setattributes(self, **attrs):
+        """Assigns several attributes at once.
+
+        Inside a deferred_validation() context the values are only validated
+        when the context exits, otherwise right away. All the attributes are
+        assigned even if some fail, a single failure is raised as is, several
+        as a VCSValidationError.
+        """
+        if _deferredAttributes:
+            queued = _deferredAttributes[-1].setdefault(id(self), (self, collections.OrderedDict()))[1]
+            for a, v in attrs.items():
+                # the last assignment comes last
+                queued.pop(a, None)
+                queued[a] = v
+            return
+        errors = _applyAttributes([(self, attrs)])
+        if len(errors) == 1:
+            raise errors[0][2]
+        elif errors:
+            raise VCSValidationError(errors)
+
     def __setattr__(self, a, v):
+        for queue in _deferredAttributes:
+            # a direct assignment replaces the value queued by setattributes
+            queued = queue.get(id(self))
+            if queued is not None and queued[0] is self:
+                queued[1].pop(a, None)
         try:
             prop = getattr(self.__class__, a)
             isprop = isinstance(prop, property)
@@ -111,7 +228,7 @@ from .queries import *  # noqa
 from . import install_vcs  # noqa
 import os  # noqa
 from .manageElements import *  # noqa
-import collections  # noqa
+from . import cache  # noqa
 
 _colorMap = "viridis"
 
@@ -131,36 +248,16 @@ install_vcs._files()
 #
 #
 
+# Every registry reports its additions and deletions to _elementsJournal, so
+# that plots can tell which objects they created (see Canvas.__plot)
+_elementsJournal = cache.RegistryJournal()
 elements = collections.OrderedDict()
-elements["list"] = {}
-elements["projection"] = {}
-elements["texttable"] = {}
-elements["textorientation"] = {}
-elements["textcombined"] = {}
-elements["line"] = {}
-elements["marker"] = {}
-elements["fillarea"] = {}
-elements["font"] = {}
-elements["fontNumber"] = {}
-elements["boxfill"] = {}
-elements["isofill"] = {}
-elements["isoline"] = {}
-elements["meshfill"] = {}
-elements["3d_scalar"] = {}
-elements["3d_dual_scalar"] = {}
-elements["3d_vector"] = {}
-elements["template"] = {}
-elements["taylordiagram"] = {}
-elements["1d"] = {}
-elements["vector"] = {}
-elements["streamline"] = {}
-elements["yxvsx"] = {}
-elements["xyvsy"] = {}
-elements["xvsy"] = {}
-elements["scatter"] = {}
-elements["colormap"] = {}
-elements["display"] = {}
-elements["format"] = {}
+for _typ in ["list", "projection", "texttable", "textorientation", "textcombined", "line", "marker",
+             "fillarea", "font", "fontNumber", "boxfill", "isofill", "isoline", "meshfill",
+             "3d_scalar", "3d_dual_scalar", "3d_vector", "template", "taylordiagram", "1d",
+             "vector", "streamline", "yxvsx", "xyvsy", "xvsy", "scatter", "colormap", "display",
+             "format"]:
+    elements[_typ] = cache.JournaledDict(name=_typ, journal=_elementsJournal)
 
 _protected_elements = {}
 for k in list(elements.keys()):
@@ -319,9 +416,12 @@ template.P("default")
 t = taylor.Gtd("default")
 
 
+# VCS_LAZY_DEFAULTS=1 only builds the elements of initial.attributes when
+# they are first used, which makes "import vcs" faster for short scripts
+_lazyDefaults = os.environ.get("VCS_LAZY_DEFAULTS", "0") not in ("", "0")
 pth = [vcs_egg_path, 'initial.attributes']
 try:
-    vcs.scriptrun(os.path.join(*pth))
+    vcs.scriptrun(os.path.join(*pth), lazy=_lazyDefaults)
 except BaseException:
     pass
 
@@ -1046,8 +1046,9 @@ class AnimationController(animate_obj_old):
                 os.path.dirname(
                     self.animation_files[0]),
                 "anim_%d.png")
-            self.vcs_self.ffmpeg(movie, files, bitrate, rate, options)
+            result = self.vcs_self.ffmpeg(movie, files, bitrate, rate, options)
             self.animation_files = []
+            return result
 
     def fps(self, value=None):
         """Animation desired number of frame per seconds (might not be
@@ -0,0 +1,449 @@
+"""
+Bounded LRU caches used to reuse expensive VTK objects between plots,
+the memory bounded frame store used by animations, and the journaled and
+lazy dictionaries backing the vcs.elements registries.
+"""
+import collections
+import contextlib
+import threading
+
+
+class LRUCache(object):
+
+    """Least recently used cache with a bounded number of entries.
+
+    Setting maxsize to 0 disables the cache. Hit and miss counters are
+    kept so that users can check how effective the cache is.
+
+    :Example:
+
+        .. doctest:: cache_LRUCache
+
+            >>> c = LRUCache(maxsize=2)
+            >>> c.put("a", 1)
+            >>> c.get("a")
+            1
+            >>> c.get("b") is None
+            True
+            >>> c.stats()["hits"], c.stats()["misses"]
+            (1, 1)
+    """
+
+    def __init__(self, maxsize=8):
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def _getmaxsize(self):
+        return self._maxsize
+
+    def _setmaxsize(self, value):
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("maxsize must be a positive integer or 0")
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+    maxsize = property(_getmaxsize, _setmaxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        """Returns the value stored for key (and marks it as the most
+        recently used) or default if key is not cached."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            value = self._entries.pop(key)
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Stores value for key, dropping the least recently used
+        entries if the cache is full."""
+        with self._lock:
+            if self._maxsize == 0:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            self._evict()
+
+    def remove(self, key):
+        """Removes key from the cache if it is there."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Removes all entries and resets the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns a dictionary with hits, misses, size and maxsize."""
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self._maxsize}
+
+
+class FrameStore(object):
+
+    """Keeps rendered frames (numpy images) in memory up to maxbytes.
+
+    Past the budget, the least recently used frames are handed to
+    write(key, frame) and dropped from memory; read(key) brings them back
+    when they are asked for again. Without write, frames past the budget
+    are forgotten. Frames already saved by someone else can be recorded
+    with add_spilled(key).
+
+    :Example:
+
+        .. doctest:: cache_FrameStore
+
+            >>> import numpy
+            >>> disk = {}
+            >>> s = FrameStore(maxbytes=4, write=disk.__setitem__, read=disk.__getitem__)
+            >>> s.put(0, numpy.zeros(4, dtype=numpy.uint8))
+            >>> s.put(1, numpy.ones(4, dtype=numpy.uint8))
+            >>> len(s), sorted(disk)
+            (2, [0])
+            >>> s.get(0)
+            array([0, 0, 0, 0], dtype=uint8)
+            >>> s.stats()["hits"], s.stats()["misses"], s.stats()["reads"]
+            (0, 1, 1)
+    """
+
+    def __init__(self, maxbytes=512 * 1024 * 1024, write=None, read=None):
+        self._frames = collections.OrderedDict()
+        self._spilled = set()
+        self._keys = set()
+        self._lock = threading.RLock()
+        self._maxbytes = maxbytes
+        self._write = write
+        self._read = read
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reads = 0
+        self.spills = 0
+
+    def _getmaxbytes(self):
+        return self._maxbytes
+
+    def _setmaxbytes(self, value):
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("maxbytes must be a positive integer or 0")
+        with self._lock:
+            self._maxbytes = value
+            self._evict()
+    maxbytes = property(_getmaxbytes, _setmaxbytes)
+
+    def __len__(self):
+        """Number of frames available, in memory or spilled."""
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def _evict(self):
+        while self.nbytes > self._maxbytes and self._frames:
+            key, frame = self._frames.popitem(last=False)
+            self.nbytes -= frame.nbytes
+            if key not in self._spilled and self._write is not None:
+                self._write(key, frame)
+                self._spilled.add(key)
+                self.spills += 1
+            elif key not in self._spilled:
+                self._keys.discard(key)
+
+    def get(self, key, default=None):
+        """Returns the frame stored for key, reading it back if it was
+        spilled, or default if it is unknown."""
+        with self._lock:
+            if key in self._frames:
+                frame = self._frames.pop(key)
+                self._frames[key] = frame
+                self.hits += 1
+                return frame
+            self.misses += 1
+            if key not in self._spilled or self._read is None:
+                return default
+            frame = self._read(key)
+            self.reads += 1
+            self._frames[key] = frame
+            self.nbytes += frame.nbytes
+            self._evict()
+            return frame
+
+    def put(self, key, frame):
+        """Stores frame for key, spilling the least recently used frames
+        if the memory budget is exceeded."""
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            # a new frame replaces the spilled one
+            self._spilled.discard(key)
+            self._frames[key] = frame
+            self._keys.add(key)
+            self.nbytes += frame.nbytes
+            self._evict()
+
+    def add_spilled(self, key):
+        """Records that the frame for key was written where read() finds it."""
+        with self._lock:
+            self._spilled.add(key)
+            self._keys.add(key)
+
+    def flush(self):
+        """Writes every frame only held in memory, frames stay in memory."""
+        with self._lock:
+            if self._write is None:
+                return
+            for key, frame in self._frames.items():
+                if key not in self._spilled:
+                    self._write(key, frame)
+                    self._spilled.add(key)
+                    self.spills += 1
+
+    def clear(self):
+        """Forgets all frames and resets the counters."""
+        with self._lock:
+            self._frames.clear()
+            self._spilled.clear()
+            self._keys.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.reads = 0
+            self.spills = 0
+
+    def stats(self):
+        """Returns a dictionary with hits, misses, reads (frames read back
+        after a spill), spills, frames, in_memory, nbytes and maxbytes."""
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "reads": self.reads,
+                "spills": self.spills,
+                "frames": len(self),
+                "in_memory": len(self._frames),
+                "nbytes": self.nbytes,
+                "maxbytes": self._maxbytes}
+
+
+class RegistryJournal(object):
+
+    """Change journal shared by the vcs.elements registries.
+
+    Scopes opened with open() collect the names added to any registry until
+    they are closed, minus the ones deleted meanwhile. This tells what a plot
+    created without comparing the registries before and after it. Names
+    starting with "__" (automatically generated objects) are tracked for the
+    whole session, so cleaning them up does not scan the registries.
+
+    :Example:
+
+        .. doctest:: cache_RegistryJournal
+
+            >>> journal = RegistryJournal()
+            >>> reg = JournaledDict(name="line", journal=journal)
+            >>> scope = journal.open()
+            >>> reg["__line_1"] = 1
+            >>> reg["solid"] = 2
+            >>> del reg["solid"]
+            >>> journal.close(scope)
+            {'line': ['__line_1']}
+            >>> journal.generated("line")
+            ['__line_1']
+    """
+
+    def __init__(self):
+        self._scopes = []
+        self._paused = 0
+        self._generated = collections.defaultdict(collections.OrderedDict)
+
+    def open(self):
+        """Starts recording added names, returns the scope to pass to close()"""
+        scope = collections.OrderedDict()
+        self._scopes.append(scope)
+        return scope
+
+    def close(self, scope):
+        """Stops recording in scope, returns {type: [names added]}"""
+        self._scopes = [s for s in self._scopes if s is not scope]
+        return self.created(scope)
+
+    def created(self, scope):
+        """Returns {type: [names added]} for a scope, open or closed"""
+        return dict((typ, list(names)) for typ, names in scope.items() if names)
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Names added in this context are not recorded by open scopes"""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def added(self, typ, key):
+        if not self._paused:
+            for scope in self._scopes:
+                scope.setdefault(typ, collections.OrderedDict())[key] = None
+        if isinstance(key, str) and key[:2] == "__":
+            self._generated[typ][key] = None
+
+    def removed(self, typ, key):
+        for scope in self._scopes:
+            if typ in scope:
+                scope[typ].pop(key, None)
+        if typ in self._generated:
+            self._generated[typ].pop(key, None)
+
+    def generated(self, typ):
+        """Returns the automatically generated names currently in registry typ"""
+        if typ not in self._generated:
+            return []
+        return list(self._generated[typ].keys())
+
+
+class JournaledDict(dict):
+
+    """Dictionary reporting the keys it gains and loses to a RegistryJournal,
+    under the registry 'name'."""
+
+    def __init__(self, *args, **kargs):
+        self._journal = kargs.pop("journal", None)
+        self._name = kargs.pop("name", None)
+        super(JournaledDict, self).__init__(*args, **kargs)
+
+    def __setitem__(self, key, value):
+        if self._journal is not None and key not in self:
+            self._journal.added(self._name, key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        if self._journal is not None:
+            self._journal.removed(self._name, key)
+
+    def pop(self, key, *args):
+        found = dict.__contains__(self, key)
+        value = dict.pop(self, key, *args)
+        if found and self._journal is not None:
+            self._journal.removed(self._name, key)
+        return value
+
+
+class LazyDict(JournaledDict):
+
+    """Dictionary whose entries can be registered with a loader that is only
+    called the first time one of them is looked up.
+
+    Names, membership and length account for pending entries without loading
+    them, values() and items() load everything. A loader stores its entries
+    in the dictionary itself, it may register several names at once.
+
+    :Example:
+
+        .. doctest:: cache_LazyDict
+
+            >>> d = LazyDict()
+            >>> d.defer(["a"], lambda: d.__setitem__("a", 1))
+            >>> "a" in d, len(d), d.pending()
+            (True, 1, ['a'])
+            >>> d["a"]
+            1
+            >>> d.pending()
+            []
+    """
+
+    def __init__(self, *args, **kargs):
+        super(LazyDict, self).__init__(*args, **kargs)
+        self._pending = collections.OrderedDict()
+
+    def defer(self, names, loader):
+        """Registers loader to create the entries 'names' on first lookup"""
+        for nm in names:
+            self._pending[nm] = loader
+
+    def pending(self):
+        """Returns the names of the entries that have not been loaded yet"""
+        return list(self._pending.keys())
+
+    def load(self, key):
+        """Loads key if it is pending, with all the names of its loader"""
+        loader = self._pending.get(key)
+        if loader is None:
+            return
+        # drop the names first, loaders look themselves up while loading
+        for nm in [nm for nm, ld in self._pending.items() if ld is loader]:
+            del self._pending[nm]
+        if self._journal is None:
+            loader()
+        else:
+            # loaded entries are defaults, not objects created by open scopes
+            with self._journal.paused():
+                loader()
+
+    def load_all(self):
+        while self._pending:
+            self.load(next(iter(self._pending)))
+
+    def __missing__(self, key):
+        if key in self._pending:
+            self.load(key)
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._pending or dict.__contains__(self, key)
+
+    def __len__(self):
+        return dict.__len__(self) + len([nm for nm in self._pending if not dict.__contains__(self, nm)])
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __delitem__(self, key):
+        if self._pending.pop(key, None) is None or dict.__contains__(self, key):
+            super(LazyDict, self).__delitem__(key)
+
+    def keys(self):
+        return list(dict.keys(self)) + [nm for nm in self._pending if not dict.__contains__(self, nm)]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *args):
+        self.load(key)
+        return super(LazyDict, self).pop(key, *args)
+
+    def values(self):
+        self.load_all()
+        return list(dict.values(self))
+
+    def items(self):
+        self.load_all()
+        return list(dict.items(self))
+
+    def copy(self):
+        self.load_all()
+        return dict.copy(self)
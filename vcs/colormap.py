@@ -39,6 +39,7 @@ except Exception:
     from UserDict import UserDict
 import vcs
 import copy
+import numpy
 from . import xmldocs
 
 
@@ -50,14 +51,51 @@ def process_src(nm, code):
         if val != ():
             d[i] = list(val) + [100]
     cp = Cp(nm)
-    cp.index.data.update(d)
+    cp.index.load(d)
+
+
+class RGB_Cells(dict):
+    """{index: [r, g, b, a]} copy of the cells of an RGB_Table, as returned by
+    its data attribute. Setting a cell sets it in the table too, cells cannot
+    be removed."""
+
+    def __init__(self, table, cells):
+        super(RGB_Cells, self).__init__(cells)
+        self._table = table
+
+    def __setitem__(self, key, value):
+        self._table[key] = value
+        super(RGB_Cells, self).__setitem__(key, self._table[key])
+
+    def update(self, *args, **kargs):
+        for key, value in dict(*args, **kargs).items():
+            self[key] = value
+
+    def setdefault(self, key, value=None):
+        if key not in self:
+            self[key] = value
+        return self[key]
+
+    def _readOnly(self, *args, **kargs):
+        raise TypeError("A colormap always has 256 cells, they cannot be removed")
+    __delitem__ = pop = popitem = clear = _readOnly
+
+    def __reduce__(self):
+        # copies are plain dicts, detached from the table
+        return (dict, (dict(self),))
 
 
 class RGB_Table(UserDict):
-    __slots__ = ["data", ]
+    """Colormap cells, stored as one contiguous (256, 4) array of R,G,B,A
+    values from 0 to 100 behind the usual index[cell] access.
+
+    version() is incremented at every change, so that tables derived from the
+    cells (see uint8()) can be cached.
+    """
+    __slots__ = ["_array", "_version", "_uint8"]
 
     def __init__(self, name, dict=None):
-        self.data = {
+        data = {
                 0: [26, 0, 32, 100], 1: [26, 0, 33, 100], 2: [26, 1, 34, 100],
                 3: [27, 1, 34, 100], 4: [27, 2, 35, 100], 5: [27, 3, 35, 100],
                 6: [27, 3, 36, 100], 7: [27, 4, 37, 100], 8: [27, 5, 37, 100],
@@ -145,14 +183,89 @@ class RGB_Table(UserDict):
                 252: [96, 90, 12, 100], 253: [97, 90, 13, 100], 254: [98, 90, 13, 100],
                 255: [99, 90, 14, 100]}
 
+        self._array = numpy.array([data[i] for i in range(256)], dtype=numpy.float64)
+        self._version = 0
+        self._uint8 = None
         self.name = name
         if dict is not None:
             self.update(dict)
 
+    def _getdata(self):
+        # whole values come back as int, like the lists the table used to hold
+        return RGB_Cells(self, ((i, [int(v) if v.is_integer() else v for v in row])
+                                for i, row in enumerate(self._array.tolist())))
+    # copy of the cells as {index: [r, g, b, a]}, used to save colormaps,
+    # cells set in it are set in the table
+    data = property(_getdata)
+
+    def __copy__(self):
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new._array = self._array.copy()
+        new._version = self._version
+        new._uint8 = None
+        return new
+
+    def copy(self):
+        """Returns a copy of the table, with its own cells"""
+        return self.__copy__()
+
+    def version(self):
+        """Returns the change counter of the cells"""
+        return self._version
+
+    def load(self, cells):
+        """Sets many {index: [r, g, b(, a)]} cells at once, without the checks
+        of index[cell] = value (used to load colormaps from files)"""
+        for key, value in cells.items():
+            value = list(value)
+            if len(value) == 3:
+                value.append(100.)
+            self._array[int(key)] = value
+        self._version += 1
+
+    def rgba(self):
+        """Returns the (256, 4) float array of R,G,B,A values (0 to 100), to be
+        read only: change cells through index[cell] = value"""
+        return self._array
+
+    def uint8(self):
+        """Returns the (256, 4) RGBA table as unsigned chars (0 to 255), rounded
+        as vtkLookupTable.SetTableValue does: floor(v / 100. * 255. + .5).
+        Computed once per version"""
+        if self._uint8 is None or self._uint8[0] != self._version:
+            table = numpy.floor(self._array / 100. * 255. + .5).astype(numpy.uint8)
+            self._uint8 = (self._version, table)
+        return self._uint8[1]
+
+    def match(self, colors):
+        """Returns the indices of the cells nearest to colors, a single
+        [r, g, b] or an (n, 3) array of R,G,B values from 0 to 100. Alpha is
+        ignored, the first of equally near cells wins"""
+        colors = numpy.asarray(colors, dtype=numpy.float64)
+        queries = colors.reshape((-1, colors.shape[-1]))[:, :3]
+        distances = ((self._array[numpy.newaxis, :, :3] - queries[:, numpy.newaxis, :]) ** 2).sum(axis=-1)
+        matches = distances.argmin(axis=1)
+        if colors.ndim == 1:
+            return int(matches[0])
+        return matches
+
+    def keys(self):
+        return list(range(256))
+
+    def __len__(self):
+        return 256
+
+    def __iter__(self):
+        return iter(range(256))
+
+    def __contains__(self, key):
+        return key in range(0, 256)
+
     def __setitem__(self, key, value):
         if (self.name == 'default'):
             raise ValueError('You cannot modify the default colormap.')
-        if (key not in list(range(0, 256))):
+        if (key not in range(0, 256)):
             raise ValueError('Cell index must be in the range 0 to 255.')
         if isinstance(value, (list, tuple)):
             value = list(value)
@@ -167,12 +280,13 @@ class RGB_Table(UserDict):
         else:
             raise ValueError(
                 'Must be either a list object, tuple object, or integer value.')
-        self.data[key] = value
+        self._array[int(key)] = value
+        self._version += 1
 
     def __getitem__(self, key):
-        if (key not in list(range(0, 256))):
+        if (key not in range(0, 256)):
             raise ValueError('Cell index must be in the range 0 to 255.')
-        return self.data[key]
+        return [int(v) if v.is_integer() else v for v in self._array[int(key)].tolist()]
 #
 #
 #############################################################################
@@ -271,13 +385,8 @@ class Cp(vcs.bestMatch):
         if not(isinstance(value, dict) and list(value.keys()) == ['data', ]):
             raise Exception("invalid")
         else:
-            d2 = {}
-            d = value['data']
-            for k in list(d.keys()):
-                if len(d[k]) == 3:  # Old style only r,g,b no a
-                    d[k] += [100.]
-                d2[int(k)] = d[k]
-            self.index.data.update(d2)
+            # old style only r,g,b no a is handled by load
+            self.index.load(value['data'])
     index = property(getindex, setindex)
     ##########################################################################
     #                                                                           #
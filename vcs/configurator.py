@@ -672,8 +672,7 @@ class Configurator(object):
         if self.save_timer is None or self.save_listener is None:
             return
 
-        if self.canvas.animate.number_of_frames() == len(
-                self.canvas.animate.animation_files):
+        if self.canvas.animate.number_of_frames() == self.canvas.animate.frames_rendered():
             self.save_animation()
             if self.save_timer:
                 self.interactor.DestroyTimer(self.save_timer)
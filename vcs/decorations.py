@@ -0,0 +1,152 @@
+"""
+Template decorations (tick marks, labels, boxes, legends...) drawn without
+going through Canvas.plot.
+
+The primitives are unregistered copies of their sources, they never enter
+vcs.elements. They are collected by a Decorations object and handed to the
+backend in one call, in the order they were added.
+"""
+import copy
+import vcs
+from .projection import no_deformation_projections
+from .textcombined import Tc
+
+
+def createtext(Tt_source='default', To_source='default'):
+    """Returns a textcombined object copied from the Tt_source texttable and
+    To_source textorientation, not stored in vcs.elements"""
+    if isinstance(Tt_source, str):
+        Tt_source = vcs.elements["texttable"][Tt_source]
+    if isinstance(To_source, str):
+        To_source = vcs.elements["textorientation"][To_source]
+    text = Tc.__new__(Tc)
+    text.Tt = copy.copy(Tt_source)
+    text.To = copy.copy(To_source)
+    text.name = "%s:::%s" % (text.Tt.name, text.To.name)
+    text.s_name = "Tc"
+    return text
+
+
+def createline(source='default'):
+    """Returns a copy of the source line, not stored in vcs.elements"""
+    if isinstance(source, str):
+        source = vcs.elements["line"][source]
+    return copy.copy(source)
+
+
+def createmarker(source='default'):
+    """Returns a copy of the source marker, not stored in vcs.elements"""
+    if isinstance(source, str):
+        source = vcs.elements["marker"][source]
+    return copy.copy(source)
+
+
+def createfillarea(source='default'):
+    """Returns a copy of the source fillarea, not stored in vcs.elements"""
+    if isinstance(source, str):
+        source = vcs.elements["fillarea"][source]
+    return copy.copy(source)
+
+
+_element_types = {"Tl": "line", "Tm": "marker", "Tf": "fillarea"}
+
+
+class Decorations(object):
+
+    """Collects the primitives drawn for one plot.
+
+    plot() queues a primitive, draw() sends the queued primitives to the
+    backend. Primitives whose aspect ratio Canvas.plot would change are
+    plotted through Canvas.plot instead, after the queue is drawn so that
+    they stack in the same order.
+
+    :param canvas: canvas the primitives are drawn on
+    :type canvas: vcs.Canvas.Canvas
+
+    :param bg: background mode
+    :type bg: bool
+
+    :param kargs: plot keywords of the display these decorations belong to
+    """
+
+    def __init__(self, canvas, bg=False, **kargs):
+        self.canvas = canvas
+        self.bg = bg
+        self.kargs = kargs
+        self.queue = []
+
+    # same sources as the Canvas create functions
+    def createtext(self, Tt_source='default', To_source='default'):
+        return createtext(Tt_source, To_source)
+
+    def createline(self, source='default'):
+        return createline(source)
+
+    def createmarker(self, source='default'):
+        return createmarker(source)
+
+    def createfillarea(self, source='default'):
+        return createfillarea(source)
+
+    def _keepsRatio(self, primitive, ratio):
+        # same tests as Canvas.plot, True if it would not touch the viewport
+        if ratio is None:
+            ratio = self.kargs.get("ratio", self.canvas.ratio)
+        doratio = str(ratio).strip().lower()
+        if doratio[-1] == 't' and doratio[0] == '0':
+            if float(doratio[:-1]) == 0.:
+                doratio = '0'
+        proj = vcs.elements["projection"][primitive.projection]
+        if proj.type in no_deformation_projections and (
+                doratio == "0" or doratio[:4] == "auto"):
+            doratio = "1t"
+        if proj.type == 'linear' and doratio[:4] == 'auto':
+            return False
+        return doratio in ['0', 'off', 'none', 'auto', 'autot']
+
+    def plot(self, primitive, ratio=None):
+        """Queues primitive, or plots it right away through Canvas.plot
+        if the aspect ratio would change it"""
+        if primitive.priority == 0:
+            # Canvas.plot does not draw these either
+            return
+        if self._keepsRatio(primitive, ratio):
+            self.queue.append(primitive)
+            return
+        self.draw()
+        kargs = dict(self.kargs)
+        if ratio is not None:
+            kargs["ratio"] = ratio
+        kargs["donotstoredisplay"] = True
+        if primitive.s_name == "Tc":
+            tt = vcs.check_name_source(None, "default", "texttable")[0]
+            to = vcs.check_name_source(None, "default", "textorientation")[0]
+            primitive.Tt._name = tt
+            primitive.To._name = to
+            primitive.name = "%s:::%s" % (tt, to)
+            vcs.elements["texttable"][tt] = primitive.Tt
+            vcs.elements["textorientation"][to] = primitive.To
+            vcs.elements["textcombined"][primitive.name] = primitive
+            try:
+                self.canvas.plot(primitive, bg=self.bg, **kargs)
+            finally:
+                del vcs.elements["texttable"][tt]
+                del vcs.elements["textorientation"][to]
+                del vcs.elements["textcombined"][primitive.name]
+        else:
+            typ = _element_types[primitive.s_name]
+            nm = vcs.check_name_source(None, "default", typ)[0]
+            primitive._name = nm
+            vcs.elements[typ][nm] = primitive
+            try:
+                self.canvas.plot(primitive, bg=self.bg, **kargs)
+            finally:
+                del vcs.elements[typ][nm]
+
+    def draw(self):
+        """Draws the queued primitives"""
+        if self.queue:
+            queue, self.queue = self.queue, []
+            kargs = dict(self.kargs)
+            kargs.pop("bg", None)
+            self.canvas.backend.plotDecorations(queue, self.bg, **kargs)
@@ -25,9 +25,9 @@
 #
 from . import VCS_validation_functions
 import vcs
-import tempfile
 from .xmldocs import listdoc  # noqa
 from functools import partial
+import numpy
 
 
 # Will attempt to import module, returns module and true if successful
@@ -74,6 +74,26 @@ def get_update_array_kw(disp, array, widgets, debug_target=None):
     return kw
 
 
+def _sameGrid(plotted, array):
+    """Tells if the horizontal coordinates of 'array' match the ones of the
+    plotted array. Arrays without axes only need matching shapes."""
+    if not hasattr(plotted, "getGrid") or not hasattr(array, "getGrid"):
+        return True
+    pairs = [(plotted.getAxis(i), array.getAxis(i)) for i in (-2, -1)]
+    grid1 = plotted.getGrid()
+    grid2 = array.getGrid()
+    if grid1 is not None and grid2 is not None:
+        # curvilinear and generic grids have their coordinates off the axes
+        pairs += [(grid1.getLatitude(), grid2.getLatitude()),
+                  (grid1.getLongitude(), grid2.getLongitude())]
+    for coords1, coords2 in pairs:
+        coords1 = numpy.ma.filled(coords1[:], 0.)
+        coords2 = numpy.ma.filled(coords2[:], 0.)
+        if coords1.shape != coords2.shape or not numpy.allclose(coords1, coords2):
+            return False
+    return True
+
+
 class Dp(vcs.bestMatch):
 
     """
@@ -247,11 +267,7 @@ class Dp(vcs.bestMatch):
         if debug:
             with self._parent._display_target_out:
                 print("Ok about to dump png")
-        tmp = tempfile.mktemp() + ".png"
-        self._parent.png(tmp)
-        f = open(tmp, "rb")
-        st = f.read()
-        f.close()
+        st = self._parent.png()
         if debug:
             IPython.display.display(self._parent._display_target_out)
         IPython.display.display(*widgets)
@@ -341,19 +357,10 @@ class Dp(vcs.bestMatch):
                     IPython.display.display(vbox)
             else:
                 IPython.display.clear_output()
-            tmp = tempfile.mktemp() + ".png"
-            self._parent.png(tmp)
-            f = open(tmp, "rb")
-            st = f.read()
-            f.close()
+            st = self._parent.png()
             self._parent._display_target_image.value = st
             return None
-        tmp = tempfile.mktemp() + ".png"
-        self._parent.png(tmp)
-        f = open(tmp, "rb")
-        st = f.read()
-        f.close()
-        return st
+        return self._parent.png()
 # TODO: html,json,jpeg,png,svg,latex
 
     def _getname(self):
@@ -532,6 +539,87 @@ class Dp(vcs.bestMatch):
             self.ratio = src.ratio
 
         vcs.elements["display"][self._name] = self
+
+    def update(self, array1, array2=None, render=True):
+        """Replaces the data shown by this display with a new slab on the same grid.
+
+        Only the data values are pushed into the existing VTK pipeline, the grid,
+        graphics method and template are reused, which makes this much faster
+        than clearing and plotting again. Template Min/Max/Mean and date/time
+        strings are refreshed as well.
+
+            :Example:
+
+                .. doctest:: displayplot_update
+
+                    >>> a=vcs.init(bg=True)
+                    >>> f=cdms2.open(vcs.sample_data+"/clt.nc")
+                    >>> clt=f("clt")
+                    >>> dsp=a.plot(clt[0])
+                    >>> dsp.update(clt[1])
+
+        :param array1: New data, must be on the same grid as the plotted data
+        :type array1: cdms2.tvariable.TransientVariable
+
+        :param array2: New second array, for vector plots
+        :type array2: cdms2.tvariable.TransientVariable
+
+        :param render: Render the canvas once the data is updated
+        :type render: bool
+        """
+        if (self.name == '__removed_from_VCS__'):
+            raise ValueError('This instance has been removed from VCS.')
+        if not isinstance(self.backend, dict) or "vtk_backend_grid" not in self.backend:
+            raise ValueError("Display %s does not have data that can be updated" % self.name)
+        plotted = self.array[0]
+        if plotted is not None and plotted.shape[-2:] != array1.shape[-2:]:
+            raise ValueError("New data shape %s does not match plotted data shape %s" %
+                             (array1.shape[-2:], plotted.shape[-2:]))
+        if plotted is not None and not _sameGrid(plotted, array1):
+            raise ValueError("New data is not on the grid of the plotted data")
+        self._parent.backend.update_input(self.backend, array1, array2, update=render)
+        self._array = [array1, array2]
+
+    def probe(self, lon, lat):
+        """Returns the plotted values at some data coordinates.
+
+        The cells are found with a locator kept with the display, so only the
+        first call pays for building it, even after update().
+
+            :Example:
+
+                .. doctest:: displayplot_probe
+
+                    >>> a=vcs.init(bg=True)
+                    >>> f=cdms2.open(vcs.sample_data+"/clt.nc")
+                    >>> dsp=a.plot(f("clt", time=slice(0, 1), squeeze=1))
+                    >>> v=dsp.probe(2., 48.)
+                    >>> values=dsp.probe([0., 90., 180.], [0., 45., -45.])
+
+        :param lon: Longitude(s) (x axis values) of the points
+        :type lon: float or list
+
+        :param lat: Latitude(s) (y axis values) of the points
+        :type lat: float or list
+
+        :return: The value(s) at the points, masked outside the grid or where
+            data is missing. For vectors, the two components.
+        :rtype: float or numpy.ma.MaskedArray
+        """
+        if (self.name == '__removed_from_VCS__'):
+            raise ValueError('This instance has been removed from VCS.')
+        if not isinstance(self.backend, dict) or "vtk_backend_grid" not in self.backend:
+            raise ValueError("Display %s does not have data that can be probed" % self.name)
+        scalar = numpy.ndim(lon) == 0
+        lon = numpy.ravel(lon)
+        lat = numpy.ravel(lat)
+        if len(lon) != len(lat):
+            raise ValueError("lon and lat must have the same number of points")
+        values = self._parent.backend.probe(self.backend, lon, lat)
+        if scalar:
+            return values[0]
+        return values
+
     ##########################################################################
     #                                                                        #
     # List out display plot members (attributes).                            #
@@ -50,6 +50,7 @@ import inspect
 import cdutil
 from .projection import round_projections
 from .projection import elliptical_projections
+from .decorations import Decorations
 from .xmldocs import scriptdocs, listdoc
 import warnings
 
@@ -1053,16 +1054,21 @@ class P(vcs.bestMatch):
     # Adding the drawing functionnality to plot all these attributes on the
     # Canvas
     def drawTicks(self, slab, gm, x, axis, number,
-                  vp, wc, bg=False, X=None, Y=None, mintic=False, **kargs):
+                  vp, wc, bg=False, X=None, Y=None, mintic=False, decorations=None, **kargs):
         """Draws the ticks for the axis x number number
         using the label passed by the graphic  method
         vp and wc are from the actual canvas, they have
         been reset when they get here...
+        The ticks and labels are added to decorations if given,
+        drawn right away otherwise.
 
         .. pragma: skip-doctest TODO add example/doctest
         """
 
         kargs["donotstoredisplay"] = True
+        draw = decorations is None
+        if draw:
+            decorations = Decorations(x, bg=bg, **kargs)
         if X is None:
             X = slab.getAxis(-1)
         if Y is None:
@@ -1115,13 +1121,13 @@ class P(vcs.bestMatch):
             obj = getattr(self, axis + 'mintic' + number)
         # the following to make sure we have a unique name,
         # i put them together assuming it would be faster
-        ticks = x.createline(source=obj.line)
+        ticks = decorations.createline(source=obj.line)
         ticks.projection = gm.projection
         ticks.priority = obj.priority
         if mintic is False:
             # the labels
             objlabl = getattr(self, axis + 'label' + number)
-            tt = x.createtext(
+            tt = decorations.createtext(
                 Tt_source=objlabl.texttable,
                 To_source=objlabl.textorientation)
             tt.projection = gm.projection
@@ -1238,18 +1244,14 @@ class P(vcs.bestMatch):
             tt.string = tstring
             tt.x = txs
             tt.y = tys
-            displays.append(x.text(tt, bg=bg, ratio="none", **kargs))
+            decorations.plot(tt, ratio="none")
         if xs != []:
             ticks._x = xs
             ticks._y = ys
-            displays.append(x.line(ticks, bg=bg, **kargs))
+            decorations.plot(ticks)
 
-        del(vcs.elements["line"][ticks.name])
-        if mintic is False:
-            sp = tt.name.split(":::")
-            del(vcs.elements["texttable"][sp[0]])
-            del(vcs.elements["textorientation"][sp[1]])
-            del(vcs.elements["textcombined"][tt.name])
+        if draw:
+            decorations.draw()
         return displays
 
     def blank(self, attribute=None):
@@ -1750,6 +1752,8 @@ class P(vcs.bestMatch):
         displays += self.drawAttributes(x, slab, gm, bg=bg, **kargs)
 
         kargs["donotstoredisplay"] = True
+        # axes names, ticks, boxes and lines are drawn together at the end
+        decorations = Decorations(x, bg=bg, **kargs)
         if not isinstance(gm, vcs.taylor.Gtd):
             nms = ["x", "y", "z", "t"]
             for i, ax in enumerate(slab.getAxisList()[-2:][::-1] +
@@ -1761,10 +1765,8 @@ class P(vcs.bestMatch):
                 for att in ["name", "units", "value"]:
                     nm = nms[i] + att
                     sub = getattr(self, nm)
-                    tt = x.createtext(
-                        None,
+                    tt = decorations.createtext(
                         sub.texttable,
-                        None,
                         sub.textorientation)
                     if att == "name":
                         if i == 0 and gm.g_name == "G1d":
@@ -1786,11 +1788,7 @@ class P(vcs.bestMatch):
                     tt.priority = sub._priority
                     # This is the name of the axis. It should be transformed
                     # through geographic projection but it is not at the moment
-                    displays.append(x.text(tt, bg=bg, **kargs))
-                    sp = tt.name.split(":::")
-                    del(vcs.elements["texttable"][sp[0]])
-                    del(vcs.elements["textorientation"][sp[1]])
-                    del(vcs.elements["textcombined"][tt.name])
+                    decorations.plot(tt)
 
         if X is None:
             X = slab.getAxis(-1)
@@ -1817,6 +1815,7 @@ class P(vcs.bestMatch):
                                                    X=X,
                                                    Y=Y,
                                                    mintic=mintic,
+                                                   decorations=decorations,
                                                    **kargs)
 
         if X is None:
@@ -1832,7 +1831,7 @@ class P(vcs.bestMatch):
             for num in ["1", "2"]:
                 e = getattr(self, tp + num)
                 if e.priority != 0:
-                    ln_tmp = x.createline(source=e.line)
+                    ln_tmp = decorations.createline(source=e.line)
                     if hasattr(gm, "projection"):
                         ln_tmp.projection = gm.projection
                     if vcs.elements["projection"][
@@ -1866,8 +1865,8 @@ class P(vcs.bestMatch):
                         ln_tmp._x = [e._x1, e._x2, e._x2, e._x1, e._x1]
                         ln_tmp._y = [e._y1, e._y1, e._y2, e._y2, e._y1]
                     ln_tmp._priority = e._priority
-                    displays.append(x.plot(ln_tmp, bg=bg, ratio="none", **kargs))
-                    del(vcs.elements["line"][ln_tmp.name])
+                    decorations.plot(ln_tmp, ratio="none")
+        decorations.draw()
 
         # x.mode=m
         # I think i have to use dict here because it's a valid value
@@ -1912,6 +1911,7 @@ class P(vcs.bestMatch):
 
         kargs["donotstoredisplay"] = True
         displays = []
+        decorations = Decorations(x, bg=bg, **kargs)
         #
         # Create legend
         #
@@ -2032,7 +2032,7 @@ class P(vcs.bestMatch):
                           startThick + thick,
                           startThick + thick])
 
-        fa = x.createfillarea()
+        fa = decorations.createfillarea()
         fa.color = colors
         fa.style = style
         fa.index = index
@@ -2053,8 +2053,7 @@ class P(vcs.bestMatch):
         else:
             fa._x = T
             fa._y = L
-        displays.append(x.plot(fa, bg=bg, **kargs))
-        del(vcs.elements["fillarea"][fa.name])
+        decorations.plot(fa)
         # Now draws the box around the legend
         # First of all make sure we draw the arrows
         Tl = []  # Thickness labels location
@@ -2143,8 +2142,8 @@ class P(vcs.bestMatch):
                             St.append(legend[l])
                             break
         # ok now creates the line object and text object
-        ln = x.createline(source=self.legend.line)
-        txt = x.createtext(
+        ln = decorations.createline(source=self.legend.line)
+        txt = decorations.createtext(
             To_source=self.legend.textorientation,
             Tt_source=self.legend.texttable)
         txt.string = St
@@ -2165,13 +2164,9 @@ class P(vcs.bestMatch):
             txt.y = Lt
 
         # Now reset the viewport and worldcoordiantes
-        displays.append(x.plot(ln, bg=bg, **kargs))
-        displays.append(x.plot(txt, bg=bg, **kargs))
-        del(vcs.elements["line"][ln.name])
-        sp = txt.name.split(":::")
-        del(vcs.elements["texttable"][sp[0]])
-        del(vcs.elements["textorientation"][sp[1]])
-        del(vcs.elements["textcombined"][txt.name])
+        decorations.plot(ln)
+        decorations.plot(txt)
+        decorations.draw()
         x._viewport = vp
         x._worldcoordinate = wc
         return displays
@@ -42,6 +42,7 @@ try:
 except Exception:
     HAS_VTK = False
 import struct
+from .cache import LazyDict
 from .clickMap import mapPng, getPngDimensions, meshToPngCoords, vcsToHtml, axisToPngCoords  # noqa
 try:
     import vcsaddons
@@ -1003,7 +1004,12 @@ def saveinitialfile():
 #
 
 
-def scriptrun(script):
+def scriptrun(script, lazy=False):
+    """Loads the vcs elements stored in a script (.scr, .py or json file).
+
+    With lazy=True elements from a json file that do not exist yet are only
+    built the first time they are looked up in vcs.elements.
+    """
     if script.split(".")[-1] == "scr":
         scriptrun_scr(script)
     elif script.split(".")[-1] == "py":
@@ -1043,18 +1049,15 @@ def scriptrun(script):
             for k in list(jsn.keys()):
                 if k not in keys:
                     keys.append(k)
-            for typ in keys:
-                for nm, v in jsn[typ].items():
-                    if typ == "P":
-                        try:
-                            loadTemplate(str(nm), v)
-                        except Exception as err:
-                            print("could not load tmpl:", nm, err)
-                    else:
-                        try:
-                            loadVCSItem(loader[typ], nm, v)
-                        except Exception as err:
-                            print("failed", typ, nm, err)
+            try:
+                # attributes are validated once all the elements exist
+                with vcs.deferred_validation():
+                    for typ in keys:
+                        for nm, v in jsn[typ].items():
+                            _loadScriptItem(typ, loader[typ], nm, v, lazy)
+            except vcs.VCSValidationError as err:
+                for obj, a, e in err.errors:
+                    print("failed", obj.__class__.__name__, getattr(obj, "name", ""), a, e)
         # ok could not read json file maybe it is an old initial.attributes
         except Exception as err:
             if os.path.split(script)[-1] == "initial.attributes":
@@ -1065,6 +1068,23 @@ def scriptrun(script):
     return
 
 
+def _loadScriptItem(key, typ, nm, vals, lazy):
+    """Loads element nm of vcs type typ, stored under key in a json script.
+    Failures are printed, not raised."""
+    if lazy and typ != "L" and deferVCSItem(typ, str(nm), vals):
+        return
+    if key == "P":
+        try:
+            loadTemplate(str(nm), vals)
+        except Exception as err:
+            print("could not load tmpl:", nm, err)
+    else:
+        try:
+            loadVCSItem(typ, nm, vals)
+        except Exception as err:
+            print("failed", key, nm, err)
+
+
 def loadTemplate(nm, vals):
     try:
         t = vcs.gettemplate(nm)
@@ -1072,13 +1092,15 @@ def loadTemplate(nm, vals):
         t = vcs.createtemplate(nm)
     for k, v in vals.items():
         A = getattr(t, k)
-        try:
-            for a, v in v.items():
-                if isinstance(v, basestring):
-                    v = str(v)
-                setattr(A, a, v)
-        except Exception:
-            setattr(t, k, v)
+        if isinstance(v, dict):
+            attrs = {}
+            for a, val in v.items():
+                if isinstance(val, basestring):
+                    val = str(val)
+                attrs[str(a)] = val
+            A.setattributes(**attrs)
+        else:
+            t.setattributes(**{str(k): v})
 
 
 def loadVCSItem(typ, nm, json_dict={}):
@@ -1103,19 +1125,15 @@ def loadVCSItem(typ, nm, json_dict={}):
                       "default_xyvsy_", "default_yxvsx_"]:
             gm = vcs.elements[tp][nm]
     else:
-        cmd = "gm = vcs.create%s('%s')" % (typ, nm)
-        loc = locals()
-        exec(cmd)
-        gm = loc["gm"]
+        gm = getattr(vcs, "create%s" % typ)(nm)
+    attrs = {}
     for a, v in json_dict.items():
         if isinstance(v, dict):
             if a == "Marker" and tp == "taylordiagram":
                 gm.addMarker()
                 for k in list(v.keys()):
-                    cmd = "gm.Marker.%s = %s" % (k, repr(v[k]))
-                    loc = locals()
-                    exec(cmd)
-                    gm = loc["gm"]
+                    setattr(gm.Marker, k, v[k])
+                continue
             else:
                 for k in list(v.keys()):
                     try:
@@ -1125,20 +1143,52 @@ def loadVCSItem(typ, nm, json_dict={}):
                         pass
         elif isinstance(v, basestring):
             v = str(v)
-        if not(a == "Marker" and tp == "taylordiagram"):
-            setattr(gm, a, v)
+        attrs[str(a)] = v
+    gm.setattributes(**attrs)
 
-            if nm in vcs_deprecated_colormap_names:
-                cmd = "gm = vcs.create%s('%s')" % (
-                    typ, vcs_deprecated_colormap_names[nm])
-                loc = locals()
-                exec(cmd)
-                gm = loc["gm"]
-                setattr(gm, a, v)
+    if nm in vcs_deprecated_colormap_names:
+        gm = getattr(vcs, "create%s" % typ)(vcs_deprecated_colormap_names[nm])
+        gm.setattributes(**attrs)
 
     return gm
 
 
+def deferVCSItem(typ, nm, json_dict):
+    """Registers the json description of a new element so that it is only
+    built when first looked up in vcs.elements[typ].
+
+    Returns False when the element must be loaded now: it exists already
+    (e.g. a default modified by initial.attributes) or it is protected.
+    """
+    elts = vcs.elements[typ]
+    if nm in elts or nm in vcs._protected_elements.get(typ, ()):
+        return False
+    if not isinstance(elts, LazyDict):
+        elts = vcs.elements[typ] = LazyDict(elts, name=typ, journal=vcs._elementsJournal)
+    names = [nm]
+    if typ == "colormap" and nm in vcs_deprecated_colormap_names:
+        names.append(vcs_deprecated_colormap_names[nm])
+    elts.defer(names, lambda: loadDeferredVCSItem(typ, nm, json_dict))
+    return True
+
+
+def loadDeferredVCSItem(typ, nm, json_dict):
+    """Builds an element registered by deferVCSItem, as scriptrun would have"""
+    doValidation = vcs._doValidation
+    vcs._doValidation = False
+    try:
+        # its own context, the element must be complete when returned
+        with vcs.deferred_validation():
+            if typ == "template":
+                loadTemplate(nm, json_dict)
+            else:
+                loadVCSItem(typ, nm, json_dict)
+    except Exception as err:
+        print("failed", typ, nm, err)
+    finally:
+        vcs._doValidation = doValidation
+
+
 def return_display_names():
     return [""], [""]
 
@@ -2197,19 +2247,8 @@ def match_color(color, colormap=None):
         colormap = 'default'
     cmap = vcs.getcolormap(colormap)
 
-    # Now tries determines the min rms diff
-    rmsmin = 2.E40
-    match = None
-    for i in list(cmap.index.keys()):
-        col = cmap.index[i]
-        rms = numpy.sqrt((vals[0] - col[0]) ** 2 +
-                         (vals[1] - col[1]) ** 2 +
-                         (vals[2] - col[2]) ** 2
-                         )
-        if rms < rmsmin:
-            rmsmin = rms
-            match = i
-    return match
+    # Now finds the nearest cell
+    return cmap.index.match(vals[:3])
 
 
 def monotonic(x):
@@ -3060,3 +3099,180 @@ def trimData2D(data, frame=0):
     if not cdms2.isVariable(data):
         data = cdms2.MV2.array(data)
     return pickFrame(data, dimensions_on_plot=2, frame=frame)
+
+
+def lodFactors(shape, pixels):
+    """Returns the (y, x) block sizes bringing the last two dimensions of
+    'shape' down to about 'pixels' (height, width) cells, 1 leaves the axis alone
+    """
+    return tuple(max(1, int(n) // max(1, int(p))) for n, p in zip(shape[-2:], pixels))
+
+
+def lodMethod(lod, methods, default):
+    """Returns the method to use for the 'lod' plot keyword, None if it is
+    off. True and the methods of the other kind of plot (1D or 2D) give
+    'default', the plot's own 'methods' are used as they are, anything else
+    raises a ValueError.
+    """
+    if lod is None or lod is False:
+        return None
+    if lod is True:
+        return default
+    known = ("minmax", "lttb", "mean", "max", "nearest")
+    if not isinstance(lod, basestring) or lod not in known:
+        raise ValueError("lod must be True, False or one of %s, not %s" % (", ".join(known), repr(lod)))
+    if lod in methods:
+        return lod
+    return default
+
+
+def lodAxis(axis, factor):
+    """Returns the axis of blocks of 'factor' consecutive cells of 'axis',
+    the last block may be shorter. Blocks span the bounds of their cells
+    """
+    bounds = axis.getExplicitBounds()
+    if bounds is None:
+        blockBounds = axis.genGenericBounds()
+    else:
+        blockBounds = bounds
+    starts = numpy.arange(0, len(axis), factor)
+    ends = numpy.minimum(starts + factor, len(axis)) - 1
+    blockBounds = numpy.array([blockBounds[starts, 0], blockBounds[ends, 1]]).T
+    newAxis = cdms2.createAxis(blockBounds.mean(axis=1), id=axis.id)
+    if bounds is not None:
+        newAxis.setBounds(blockBounds)
+    if hasattr(axis, "units"):
+        newAxis.units = axis.units
+    return newAxis
+
+
+def blockReduce2D(data, factors, method="mean"):
+    """Aggregates the last two dimensions of 'data' in blocks of 'factors'
+    (y, x) cells.
+
+    'method' is "mean" or "max" of the valid cells of a block, a block with
+    no valid cell is masked, or "nearest" which keeps the center cell of each
+    block as it is. Variables come back as variables on the block axes.
+    """
+    if method not in ("mean", "max", "nearest"):
+        raise ValueError("Level of detail method must be 'mean', 'max' or 'nearest', not %s" % repr(method))
+    fy, fx = factors
+    if fy == 1 and fx == 1:
+        return data
+    values = numpy.ma.masked_invalid(numpy.ma.asarray(data))
+    ny, nx = values.shape[-2:]
+    by = (ny + fy - 1) // fy
+    bx = (nx + fx - 1) // fx
+    if method == "nearest":
+        iy = numpy.minimum(numpy.arange(by) * fy + fy // 2, ny - 1)
+        ix = numpy.minimum(numpy.arange(bx) * fx + fx // 2, nx - 1)
+        reduced = values[..., iy, :][..., ix]
+    else:
+        # pad with masked cells so the last blocks can be shorter
+        lead = values.shape[:-2]
+        padded = numpy.ma.masked_all(lead + (by * fy, bx * fx), dtype=values.dtype)
+        padded[..., :ny, :nx] = values
+        blocks = padded.reshape(lead + (by, fy, bx, fx)).swapaxes(-3, -2)
+        blocks = blocks.reshape(lead + (by, bx, fy * fx))
+        if method == "mean":
+            reduced = blocks.mean(axis=-1)
+        else:
+            reduced = blocks.max(axis=-1)
+    if not cdms2.isVariable(data):
+        return reduced
+    axes = data.getAxisList()
+    axes[-2] = lodAxis(axes[-2], fy)
+    axes[-1] = lodAxis(axes[-1], fx)
+    return cdms2.createVariable(reduced, axes=axes, id=data.id, attributes=data.attributes)
+
+
+def lineRuns(x, y):
+    """Splits the points of the 1D 'x' and 'y' into the runs of consecutive
+    points where neither is masked.
+    Returns the list of x runs and the list of y runs, as numpy arrays
+    """
+    x = numpy.ma.asarray(x).ravel()
+    y = numpy.ma.asarray(y).ravel()
+    valid = ~(numpy.ma.getmaskarray(x) | numpy.ma.getmaskarray(y))
+    # 1 where a run starts, -1 right after it ends
+    edges = numpy.diff(numpy.concatenate(([0], valid.astype(numpy.int8), [0])))
+    starts = numpy.nonzero(edges == 1)[0]
+    ends = numpy.nonzero(edges == -1)[0]
+    x = numpy.ma.getdata(x)
+    y = numpy.ma.getdata(y)
+    return [x[s:e] for s, e in zip(starts, ends)], [y[s:e] for s, e in zip(starts, ends)]
+
+
+def lineColumns(values, wc1, wc2, pixels):
+    """Returns the pixel column of each of 'values' when the world
+    coordinates wc1 to wc2 span 'pixels' columns
+    """
+    scale = pixels / float(wc2 - wc1)
+    return numpy.floor((numpy.asarray(values, dtype=numpy.float64) - wc1) * scale).astype(numpy.int64)
+
+
+def decimateMinMax(x, y, columns):
+    """Keeps the first, last, lowest and highest point of each pixel column
+    of the line x, y. 'columns' holds the sorted pixel column of each point,
+    kept points come back in their original order
+    """
+    starts = numpy.flatnonzero(numpy.concatenate(([True], columns[1:] != columns[:-1])))
+    ends = numpy.concatenate((starts[1:], [len(columns)])) - 1
+    # sorted by column then y the first point of a column is its lowest
+    order = numpy.lexsort((y, columns))
+    keep = numpy.unique(numpy.concatenate((starts, ends, order[starts], order[ends])))
+    return x[keep], y[keep]
+
+
+def decimateLTTB(x, y, columns):
+    """Largest triangle three buckets downsampling of the line x, y to two
+    points per pixel column it spans. 'columns' holds the sorted pixel
+    column of each point
+    """
+    n = len(x)
+    threshold = 2 * int(columns[-1] - columns[0] + 1)
+    if threshold >= n or threshold < 3:
+        return x, y
+    # first and last points are kept, the others are split in buckets
+    edges = numpy.linspace(1, n - 1, threshold - 1).astype(numpy.intp)
+    keep = numpy.empty(threshold, dtype=numpy.intp)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # the point of the bucket making the largest triangle with the last
+        # kept point and the average of the next bucket
+        if b < threshold - 3:
+            cx = x[hi:edges[b + 2]].mean()
+            cy = y[hi:edges[b + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = numpy.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(numpy.argmax(area))
+        keep[b + 1] = a
+    return x[keep], y[keep]
+
+
+def decimate1D(x, y, columns, method="minmax"):
+    """Decimates the line x, y down to a few points per pixel column.
+
+    'columns' is the pixel column of each point, see lineColumns. 'method'
+    is "minmax", which keeps the extremes of each column, or "lttb". Lines
+    not crossing the columns in one direction come back as they are.
+    """
+    if method not in ("minmax", "lttb"):
+        raise ValueError("Line decimation method must be 'minmax' or 'lttb', not %s" % repr(method))
+    if len(x) < 3:
+        return x, y
+    steps = numpy.diff(columns)
+    if numpy.all(steps <= 0):
+        columns = -columns
+    elif not numpy.all(steps >= 0):
+        return x, y
+    if method == "lttb":
+        return decimateLTTB(x, y, columns)
+    # minmax keeps up to 4 points per column
+    if len(x) <= 4 * (columns[-1] - columns[0] + 1):
+        return x, y
+    return decimateMinMax(x, y, columns)
@@ -14,6 +14,8 @@ from .projection import round_projections, no_over_proj4_parameter_projections
 from .vcsvtk import fillareautils
 import sys
 import numbers
+import hashlib
+from .cache import LRUCache
 
 
 DEBUG_MODE = False
@@ -151,6 +153,17 @@ def configureContextArea(area, dataBounds, screenGeom):
     axisTop.SetMargins(0, 0)
 
 
+def geometryMTime(dataset):
+    """Returns a key that changes when the points or cells of dataset change.
+    Unlike dataset.GetMTime() it is not affected by new data arrays."""
+    points = dataset.GetPoints() if hasattr(dataset, "GetPoints") else None
+    cells = dataset.GetCells() if hasattr(dataset, "GetCells") else None
+    return (points.GetMTime() if points is not None else None,
+            cells.GetMTime() if cells is not None else None,
+            dataset.GetNumberOfPoints(),
+            dataset.GetNumberOfCells())
+
+
 def growBounds(previousBounds, newBounds):
     nextBounds = [i for i in previousBounds]
 
@@ -190,6 +203,137 @@ def generateSolidColorArray(numTuples, color):
                            array_type=vtk.VTK_UNSIGNED_CHAR)
 
 
+def classifyBands(values, lows, highs, closed=False):
+    """Returns the index of the band [lows[i], highs[i]) each value falls in,
+    -1 if it is in none, so values in the gap between two bands are left out.
+    With closed the upper edges are in their band too. When bands share an
+    edge the last one wins, as it did when each band was thresholded and
+    drawn in turn."""
+    values = numpy.asarray(values)
+    lows = numpy.asarray(lows, dtype=numpy.float64)
+    highs = numpy.asarray(highs, dtype=numpy.float64)
+    if len(lows) == 0:
+        return numpy.full(values.shape, -1, dtype=numpy.int32)
+    below = numpy.less_equal if closed else numpy.less
+    if numpy.all(lows[1:] >= highs[:-1]) and numpy.all(highs >= lows):
+        # sorted bands that do not overlap, one search over the lower edges
+        band = numpy.searchsorted(lows, values, side="right").astype(numpy.int32) - 1
+        inside = band >= 0
+        inside[inside] = below(values[inside], highs[band[inside]])
+        band[~inside] = -1
+        return band
+    band = numpy.full(values.shape, -1, dtype=numpy.int32)
+    for i in range(len(lows)):
+        band[(values >= lows[i]) & below(values, highs[i])] = i
+    return band
+
+
+class BandedFill(object):
+
+    """Colors the cells of a polydata by the band their scalar falls in.
+
+    This replaces a vtkThreshold, a surface filter and a mapper per band with
+    one pass over the cell scalars and one lookup table holding a color per
+    band. Cells outside all bands, or hidden by the mask, are transparent.
+
+    :param polyFilter: filter whose output polydata is colored, the
+        vtk_backend_filter of the pipeline
+    :param lows: lower edge of each band
+    :param highs: upper edge of each band
+    :param colors: rgba (0-1) of each band
+    :param closed: whether the upper edge of a band is in it, see
+        classifyBands
+    """
+
+    def __init__(self, polyFilter, lows, highs, colors, closed=False):
+        self.filter = polyFilter
+        self.lows = lows
+        self.highs = highs
+        self.closed = closed
+        self.lut = vtk.vtkLookupTable()
+        self.lut.SetNumberOfTableValues(max(len(colors), 1))
+        for i, color in enumerate(colors):
+            self.lut.SetTableValue(i, *color)
+        # band i maps to table value i, -1 is below the range
+        self.lut.SetRange(-.5, len(colors) - .5)
+        self.lut.SetBelowRangeColor(0., 0., 0., 0.)
+        self.lut.UseBelowRangeColorOn()
+        self.item = vtk.vtkPolyDataItem()
+        self.item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
+        self.patterns = []
+        self.update()
+
+    def update(self):
+        """Recomputes the band of each cell, after the scalars changed."""
+        self.filter.Update()
+        poly = self.filter.GetOutput()
+        cellData = poly.GetCellData()
+        scalars = cellData.GetScalars()
+        if scalars is None:
+            band = numpy.full(poly.GetNumberOfCells(), -1, dtype=numpy.int32)
+        else:
+            band = classifyBands(VN.vtk_to_numpy(scalars), self.lows, self.highs, self.closed)
+        ghost = cellData.GetArray(vtk.vtkDataSetAttributes.GhostArrayName())
+        if ghost is not None:
+            band[(VN.vtk_to_numpy(ghost) & vtk.vtkDataSetAttributes.HIDDENCELL) != 0] = -1
+        self.band = band
+        bandArray = numpy_to_vtk_wrapper(band, deep=False)
+        bandArray.SetName("BandIndex")
+        cellData.AddArray(bandArray)
+        mappedColors = self.lut.MapScalars(bandArray, vtk.VTK_COLOR_MODE_MAP_SCALARS, -1)
+        mappedColors.SetName('Colors')
+        self.item.SetPolyData(poly)
+        self.item.SetMappedColors(mappedColors)
+        mappedColors.FastDelete()
+        for item, first, last, patternArgs in self.patterns:
+            self._updatePattern(item, first, last, patternArgs)
+
+    def patternItem(self, first, last=None, **patternArgs):
+        """Returns an item drawing the pattern of bands first to last (just
+        first by default), made by
+        fillareautils.make_patterned_polydata(**patternArgs). The item follows
+        the cells of the bands on update."""
+        item = vtk.vtkPolyDataItem()
+        item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
+        self.patterns.append((item, first, last, patternArgs))
+        self._updatePattern(item, first, last, patternArgs)
+        return item
+
+    def _updatePattern(self, item, first, last, patternArgs):
+        patact = None
+        poly = self.bandPolyData(first, last)
+        if poly is not None:
+            patact = fillareautils.make_patterned_polydata(poly, **patternArgs)
+        if patact is None:
+            # the band is empty, keep the item but draw nothing
+            patPoly = vtk.vtkPolyData()
+            colorArray = vtk.vtkUnsignedCharArray()
+            colorArray.SetNumberOfComponents(4)
+        else:
+            patMapper = patact.GetMapper()
+            patMapper.Update()
+            patPoly = patMapper.GetInput()
+            colorArray = patPoly.GetCellData().GetArray('Colors')
+        item.SetPolyData(patPoly)
+        item.SetMappedColors(colorArray)
+
+    def bandPolyData(self, first, last=None):
+        """Returns the cells of bands first to last (just first by default)
+        as polydata, None if there are none."""
+        if last is None:
+            last = first
+        if not numpy.any((self.band >= first) & (self.band <= last)):
+            return None
+        th = vtk.vtkThreshold()
+        th.SetInputData(self.filter.GetOutput())
+        th.SetInputArrayToProcess(0, 0, 0, vtk.vtkDataObject.FIELD_ASSOCIATION_CELLS, "BandIndex")
+        th.ThresholdBetween(first, last)
+        geoFilter = vtk.vtkDataSetSurfaceFilter()
+        geoFilter.SetInputConnection(th.GetOutputPort())
+        geoFilter.Update()
+        return geoFilter.GetOutput()
+
+
 def applyAttributesFromVCStmpl(tmpl, tmplattribute, txtobj=None):
     tatt = getattr(tmpl, tmplattribute)
     if txtobj is None:
@@ -209,6 +353,90 @@ def numpy_to_vtk_wrapper(numpyArray, deep=False, array_type=None):
     return result
 
 
+def colorsToUint8(cmap, colors):
+    """Returns the (len(colors), 4) unsigned char RGBA table of colors,
+    rounded as RGB_Table.uint8. Colormap indices are gathered at once from the
+    cached table of the colormap, names and rgba tuples go through
+    vcs.utils.rgba_color."""
+    colors = list(colors)
+    if all(isinstance(c, (int, numpy.integer)) and not isinstance(c, bool) and 0 <= c < 256
+           for c in colors):
+        return cmap.index.uint8()[numpy.array(colors, dtype=numpy.intp)]
+    rgba = numpy.array([vcs.utils.rgba_color(c, cmap) for c in colors], dtype=numpy.float64)
+    return numpy.floor(rgba.reshape((-1, 4)) / 100. * 255. + .5).astype(numpy.uint8)
+
+
+def colorsLookupTable(cmap, colors):
+    """Returns a new vtkLookupTable with one entry per color of colors"""
+    table = colorsToUint8(cmap, colors)
+    lut = vtk.vtkLookupTable()
+    lut.SetNumberOfTableValues(len(table))
+    lut.SetTable(numpy_to_vtk_wrapper(numpy.ascontiguousarray(table), deep=True))
+    return lut
+
+
+def imageDataToNumpy(imageData):
+    """Returns a (height, width, components) view on the scalars of a 2D
+    vtkImageData, first row at the top."""
+    w, h, _ = imageData.GetDimensions()
+    pixels = VN.vtk_to_numpy(imageData.GetPointData().GetScalars())
+    return pixels.reshape((h, w, -1))[::-1]
+
+
+def numpyToImageData(pixels):
+    """Builds a vtkImageData from a (height, width, components) uint8 array
+    with the first row at the top, as returned by imageDataToNumpy."""
+    h, w, c = pixels.shape
+    # vtk images start with the bottom row
+    flat = numpy.ascontiguousarray(pixels[::-1], dtype=numpy.uint8).reshape((h * w, c))
+    imageData = vtk.vtkImageData()
+    imageData.SetDimensions(w, h, 1)
+    imageData.GetPointData().SetScalars(numpy_to_vtk_wrapper(flat, deep=False))
+    return imageData
+
+
+def numpyToCellArray(offsets, connectivity):
+    """Builds a vtkCellArray from numpy 'offsets' and 'connectivity' arrays.
+    Cell i uses the point ids connectivity[offsets[i]:offsets[i + 1]], so
+    'offsets' has one more element than there are cells.
+    The arrays are shared with VTK, not copied, whenever the VTK version
+    allows it.
+    """
+    offsets = numpy.ascontiguousarray(offsets, dtype=VN.ID_TYPE_CODE)
+    connectivity = numpy.ascontiguousarray(connectivity, dtype=VN.ID_TYPE_CODE)
+    cells = vtk.vtkCellArray()
+    if hasattr(cells, "SetData"):
+        # VTK >= 9 stores offsets and connectivity separately
+        cells.SetData(
+            numpy_to_vtk_wrapper(offsets, deep=False, array_type=vtk.VTK_ID_TYPE),
+            numpy_to_vtk_wrapper(connectivity, deep=False, array_type=vtk.VTK_ID_TYPE))
+    else:
+        # Legacy layout: npts, id_0, ..., id_npts-1 for each cell
+        numberOfCells = len(offsets) - 1
+        legacy = numpy.empty(numberOfCells + len(connectivity), dtype=VN.ID_TYPE_CODE)
+        countsIndex = offsets[:-1] + numpy.arange(numberOfCells)
+        isId = numpy.ones(len(legacy), dtype=bool)
+        isId[countsIndex] = False
+        legacy[countsIndex] = numpy.diff(offsets)
+        legacy[isId] = connectivity
+        cells.SetCells(numberOfCells,
+                       numpy_to_vtk_wrapper(legacy, deep=False, array_type=vtk.VTK_ID_TYPE))
+    return cells
+
+
+def genMeshCells(vertices, numberOfCells, nVertices):
+    """Generates the polygons of a mesh as a vtkCellArray.
+    'vertices' holds the nVertices vertices of each cell one after the
+    other (numberOfCells * nVertices rows of x, y, z). Vertices with a
+    missing (NaN) x are skipped, so cells can have fewer vertices.
+    """
+    valid = ~numpy.isnan(vertices[:, 0]).reshape((numberOfCells, nVertices))
+    connectivity = numpy.flatnonzero(valid)
+    offsets = numpy.zeros(numberOfCells + 1, dtype=VN.ID_TYPE_CODE)
+    numpy.cumsum(valid.sum(axis=1), out=offsets[1:])
+    return numpyToCellArray(offsets, connectivity)
+
+
 # Adds 'array' to 'grid' as cell or point attribute based on 'isCellData'
 # It also sets it as the active scalar if 'isScalars'.
 # If the grid has pedigree ids (it was wrapped) we use them to set the array.
@@ -218,8 +446,8 @@ def setArray(grid, array, arrayName, isCellData, isScalars):
     if (pedigreeId):
         vtkarray = attributes.GetArray(arrayName)
         if vtkarray is not None:
-            for i in range(0, vtkarray.GetNumberOfTuples()):
-                vtkarray.SetValue(i, array[pedigreeId.GetValue(i)])
+            VN.vtk_to_numpy(vtkarray)[:] = numpy.asarray(array)[VN.vtk_to_numpy(pedigreeId)]
+            vtkarray.Modified()
     else:
         vtkarray = numpy_to_vtk_wrapper(array, deep=False)
         vtkarray.SetName(arrayName)
@@ -233,7 +461,7 @@ def putMaskOnVTKGrid(data, grid, actorColor=None, cellData=True, deep=True):
     mapper = None
     if msk is not numpy.ma.nomask and not numpy.allclose(msk, False):
         if actorColor is not None:
-            flatIMask = msk.astype(numpy.double).flat
+            flatIMask = numpy.ravel(msk).astype(numpy.double)
             grid2 = grid.NewInstance()
             if grid.IsA("vtkStructuredGrid"):
                 vtkmask = numpy_to_vtk_wrapper(flatIMask, deep=deep, array_type=vtk.VTK_DOUBLE)
@@ -247,11 +475,8 @@ def putMaskOnVTKGrid(data, grid, actorColor=None, cellData=True, deep=True):
                     attributes = grid.GetPointData()
                 if (attributes.GetPedigreeIds()):
                     attributes2.SetPedigreeIds(attributes.GetPedigreeIds())
-                    pedigreeId = attributes2.GetPedigreeIds()
-                    vtkmask = vtk.vtkDoubleArray()
-                    vtkmask.SetNumberOfTuples(attributes2.GetPedigreeIds().GetNumberOfTuples())
-                    for i in range(0, vtkmask.GetNumberOfTuples()):
-                        vtkmask.SetValue(i, flatIMask[pedigreeId.GetValue(i)])
+                    pedigreeId = VN.vtk_to_numpy(attributes2.GetPedigreeIds())
+                    vtkmask = numpy_to_vtk_wrapper(flatIMask[pedigreeId], deep=False)
                 else:
                     # the unstructured grid is not wrapped
                     vtkmask = numpy_to_vtk_wrapper(flatIMask, deep=deep, array_type=vtk.VTK_DOUBLE)
@@ -286,23 +511,17 @@ def putMaskOnVTKGrid(data, grid, actorColor=None, cellData=True, deep=True):
         # The ghost array now stores information about hidden (blanked)
         # points/cells. Setting an array entry to the bitwise value
         # `vtkDataSetAttributes.HIDDEN(CELL|POINT)` will blank the cell/point.
-        flatMask = msk.flat
-        ghost = numpy.zeros(len(flatMask), dtype=numpy.uint8)
         invalidMaskValue = vtk.vtkDataSetAttributes.HIDDENCELL if cellData else \
             vtk.vtkDataSetAttributes.HIDDENPOINT
-        for i, isInvalid in enumerate(flatMask):
-            if isInvalid:
-                ghost[i] = invalidMaskValue
+        ghost = numpy.ravel(msk).astype(numpy.uint8) * numpy.uint8(invalidMaskValue)
         attributes = grid.GetCellData() if cellData else grid.GetPointData()
         pedigreeIds = attributes.GetPedigreeIds()
         if (pedigreeIds):
-            # we need to create the ghost array because setArray does not create it in this case
-            vtkghost = vtk.vtkUnsignedCharArray()
-            vtkghost.SetNumberOfTuples(pedigreeIds.GetNumberOfTuples())
-            vtkghost.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
-            attributes.AddArray(vtkghost)
-        setArray(grid, ghost, vtk.vtkDataSetAttributes.GhostArrayName(),
-                 cellData, isScalars=False)
+            # the grid was wrapped, each cell/point takes the mask of its original
+            ghost = ghost[VN.vtk_to_numpy(pedigreeIds)]
+        vtkghost = numpy_to_vtk_wrapper(ghost, deep=False)
+        vtkghost.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
+        attributes.AddArray(vtkghost)
         if (grid.GetExtentType() == vtk.VTK_PIECES_EXTENT):
             removeHiddenPointsOrCells(grid, celldata=cellData)
 
@@ -355,27 +574,25 @@ def setInfToValid(geoPoints, ghost=None):
     We also hide infinity points in the ghost array.
     We return true if any points are infinity
     '''
-    anyInfinity = False
-    validPoint = [0, 0, 0]
-    for i in range(geoPoints.GetNumberOfPoints()):
-        point = geoPoints.GetPoint(i)
-        if (not math.isinf(point[0]) and not math.isinf(point[1])):
-            validPoint[0] = point[0]
-            validPoint[1] = point[1]
-            break
-    for i in range(geoPoints.GetNumberOfPoints()):
-        point = geoPoints.GetPoint(i)
-        if (math.isinf(point[0]) or math.isinf(point[1])):
-            anyInfinity = True
-            newPoint = list(point)
-            if (math.isinf(point[0])):
-                newPoint[0] = validPoint[0]
-            if (math.isinf(point[1])):
-                newPoint[1] = validPoint[1]
-            geoPoints.SetPoint(i, newPoint)
-            if (ghost):
-                ghost.SetValue(i, vtk.vtkDataSetAttributes.HIDDENPOINT)
-    return anyInfinity
+    if geoPoints.GetNumberOfPoints() == 0:
+        return False
+    xy = VN.vtk_to_numpy(geoPoints.GetData())[:, :2]
+    isInf = numpy.isinf(xy)
+    infPoints = isInf.any(axis=1)
+    if not infPoints.any():
+        return False
+    validPoint = [0., 0.]
+    valid = numpy.flatnonzero(~infPoints)
+    if len(valid):
+        validPoint = xy[valid[0]].copy()
+    for i in range(2):
+        xy[isInf[:, i], i] = validPoint[i]
+    geoPoints.GetData().Modified()
+    geoPoints.Modified()
+    if (ghost):
+        VN.vtk_to_numpy(ghost)[infPoints] = vtk.vtkDataSetAttributes.HIDDENPOINT
+        ghost.Modified()
+    return True
 
 
 def removeHiddenPointsOrCells(grid, celldata=False):
@@ -397,56 +614,38 @@ def removeHiddenPointsOrCells(grid, celldata=False):
     ghost = grid.GetCellGhostArray() if celldata else grid.GetPointGhostArray()
     if (not ghost):
         return
-    minScalar = sys.float_info.max
-    minVector = [0, 0, 0]
-    minVectorNorm = sys.float_info.max
     num = grid.GetNumberOfCells() if celldata else grid.GetNumberOfPoints()
     hidden = vtk.vtkDataSetAttributes.HIDDENCELL if celldata else vtk.vtkDataSetAttributes.HIDDENPOINT
-    if not celldata:
+    isHidden = (VN.vtk_to_numpy(ghost)[:num] & hidden) != 0
+    hiddenIds = numpy.flatnonzero(isHidden)
+    if celldata:
+        for i in hiddenIds.tolist():
+            grid.DeleteCell(i)
+    elif len(hiddenIds) > 0:
+        cells = vtk.vtkIdList()
+        for i in hiddenIds.tolist():
+            # point hidden, remove all cells used by this point
+            grid.GetPointCells(i, cells)
+            for j in range(cells.GetNumberOfIds()):
+                grid.DeleteCell(cells.GetId(j))
+        # hidden points are not removed. This causes problems
+        # because it changes the scalar range, so we give them
+        # the smallest visible value.
+        visible = ~isHidden
         scalars = grid.GetPointData().GetScalars()
         vectors = grid.GetPointData().GetVectors()
-    else:
-        scalars = grid.GetCellData().GetScalars()
-        vectors = grid.GetCellData().GetVectors()
-    if (scalars or vectors):
-        vector = [0, 0, 0]
-        for i in range(num):
-            if (not (ghost.GetValue(i) & hidden)):
-                if (scalars):
-                    scalar = scalars.GetValue(i)
-                    if (scalar < minScalar):
-                        minScalar = scalar
-                if (vectors):
-                    vectors.GetTypedTuple(i, vector)
-                    vectorNorm = numpy.linalg.norm(vector)
-                    if (vectorNorm < minVectorNorm):
-                        minVector = vector
-                        minVectorNorm = vectorNorm
-    hiddenScalars = False
-    hiddenVectors = False
-    for i in range(num):
-        if (ghost.GetValue(i) & hidden):
-            if not celldata:
-                cells = vtk.vtkIdList()
-                # point hidden, remove all cells used by this point
-                grid.GetPointCells(i, cells)
-                for j in range(cells.GetNumberOfIds()):
-                    grid.DeleteCell(cells.GetId(j))
-                # hidden points are not removed. This causes problems
-                # because it changes the scalar range.
-                if(scalars):
-                    hiddenScalars = True
-                    scalars.SetValue(i, minScalar)
-                if(vectors):
-                    hiddenVectors = True
-                    vectors.SetTypedTuple(i, minVector)
-            else:
-                grid.DeleteCell(i)
-    # SetValue does not call modified - we'll have to call it after all calls.
-    if (hiddenScalars):
-        scalars.Modified()
-    if (hiddenVectors):
-        vectors.Modified()
+        if (scalars):
+            values = VN.vtk_to_numpy(scalars)
+            values[hiddenIds] = values[:num][visible].min() if visible.any() else sys.float_info.max
+            scalars.Modified()
+        if (vectors):
+            values = VN.vtk_to_numpy(vectors)
+            minVector = [0, 0, 0]
+            if visible.any():
+                visibleValues = values[:num][visible]
+                minVector = visibleValues[numpy.argmin(numpy.linalg.norm(visibleValues, axis=1))]
+            values[hiddenIds] = minVector
+            vectors.Modified()
     # ensure that GLOBALIDS are copied
     attributes = grid.GetCellData()
     attributes.SetActiveAttribute(-1, attributes.GLOBALIDS)
@@ -463,6 +662,8 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
     continents = False
     wrap = None
     m3 = None
+    # what the points are made from, see gridCacheKey
+    coordinates = None
     g = None
     cellData = True
     xm, xM, ym, yM = None, None, None, None
@@ -475,6 +676,7 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
             continents = True
             wrap = [0., 360.]
             if grid is None:
+                coordinates = g
                 m = g.getMesh()
                 xm = m[:, 1].min()
                 xM = m[:, 1].max()
@@ -483,6 +685,7 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
                 numberOfCells = m.shape[0]
                 # For vtk we need to reorder things
                 m2 = numpy.ascontiguousarray(numpy.transpose(m, (0, 2, 1)))
+                nVertices = m2.shape[-2]
                 m2.resize((m2.shape[0] * m2.shape[1], m2.shape[2]))
                 m2 = m2[..., ::-1]
                 # here we add dummy levels, might want to reconsider converting
@@ -497,6 +700,7 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
             if gm.wrap[1] == 360.:
                 continents = True
             if grid is None:
+                coordinates = data2
                 xm = data2[:, 1].min()
                 xM = data2[:, 1].max()
                 ym = data2[:, 0].min()
@@ -517,15 +721,8 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
     if m3 is not None:
         # Create unstructured grid points
         vg = vtk.vtkUnstructuredGrid()
-        for i in range(numberOfCells):
-            pt_ids = []
-            for j in range(nVertices):
-                indx = i * nVertices + j
-                if not numpy.isnan(m3[indx][0]):  # missing value means skip vertex
-                    pt_ids.append(indx)
-            vg.InsertNextCell(vtk.VTK_POLYGON,
-                              len(pt_ids),
-                              pt_ids)
+        vg.SetCells(vtk.VTK_POLYGON,
+                    genMeshCells(m3, numberOfCells, nVertices))
     else:
         # Ok a simple structured grid is enough
         if grid is None:
@@ -536,6 +733,7 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
             continents = True
             wrap = [0., 360.]
             if grid is None:
+                coordinates = g
                 lat = g.getLatitude()
                 lon = g.getLongitude()
             if isinstance(g, cdms2.hgrid.AbstractCurveGrid):
@@ -558,6 +756,7 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
                     lon3 = lon
                     lat3 = lat
                     cellData = False
+                coordinates = (lon3, lat3)
                 # Note that m,M is min,max for an increasing list
                 # and max,min for a decreasing list
                 xm = lon3[0]
@@ -582,6 +781,7 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
                 lon3 = lon
                 lat3 = lat
                 cellData = False
+            coordinates = (lon3, lat3)
             # Note that m,M is min,max for an increasing list
             # and max,min for a decreasing list
             xm = lon3[0]
@@ -623,25 +823,9 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
         attribute = numpy_to_vtk_wrapper(data1.filled(0.).flat,
                                          deep=False)
         attribute.SetName("scalar")
-    if cellData:
-        attributes = gridForAttribute.GetCellData()
-    else:
-        attributes = gridForAttribute.GetPointData()
-    if genVectors:
-        attributes.SetVectors(attribute)
-    else:
-        attributes.SetScalars(attribute)
 
+    cached = None
     if grid is None:
-        # First create the points/vertices (in vcs terms)
-        pts = vtk.vtkPoints()
-        # Convert nupmy array to vtk ones
-        ppV = numpy_to_vtk_wrapper(m3, deep=deep)
-        pts.SetData(ppV)
-        ptsBounds = pts.GetBounds()
-        xRange = ptsBounds[1] - ptsBounds[0]
-        xm, xM, ym, yM, tmp, tmp2 = pts.GetBounds()
-
         # We use the zooming feature for linear and polar projections
         # We use plotting coordinates for doing the projection
         # such that parameters such that central meridian are set correctly
@@ -652,6 +836,34 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
             wc = vcs.utils.getworldcoordinates(gm,
                                                data1.getAxis(-1),
                                                data1.getAxis(-2))
+        isCurveGrid = isinstance(g, cdms2.hgrid.TransientCurveGrid)
+        # Same geometry, projection and wrapping as a previous plot?
+        if coordinates is None:
+            coordinates = (m3,)
+        cacheKey = gridCacheKey(coordinates, m3, vg, cellData, wc, wrap, projection, isCurveGrid)
+        cached = gridCache.get(cacheKey)
+
+    if cached is None:
+        if cellData:
+            attributes = gridForAttribute.GetCellData()
+        else:
+            attributes = gridForAttribute.GetPointData()
+        if genVectors:
+            attributes.SetVectors(attribute)
+        else:
+            attributes.SetScalars(attribute)
+
+    if cached is not None:
+        vg, xm, xM, ym, yM, geo = restoreCachedGrid(cached, attribute, cellData, genVectors)
+    elif grid is None:
+        # First create the points/vertices (in vcs terms)
+        pts = vtk.vtkPoints()
+        # Convert nupmy array to vtk ones
+        ppV = numpy_to_vtk_wrapper(m3, deep=deep)
+        pts.SetData(ppV)
+        ptsBounds = pts.GetBounds()
+        xRange = ptsBounds[1] - ptsBounds[0]
+        xm, xM, ym, yM, tmp, tmp2 = pts.GetBounds()
 
         vg.SetPoints(pts)
         # index into the scalar array. Used for upgrading
@@ -659,11 +871,9 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
         # correctly only for cell data. For point data
         # the indexes for points on the border will be incorrect after
         # wrapping
-        pedigreeId = vtk.vtkIntArray()
+        pedigreeId = numpy_to_vtk_wrapper(
+            numpy.arange(attribute.GetNumberOfTuples(), dtype=numpy.int32), deep=False)
         pedigreeId.SetName("PedigreeIds")
-        pedigreeId.SetNumberOfTuples(attribute.GetNumberOfTuples())
-        for i in range(0, attribute.GetNumberOfTuples()):
-            pedigreeId.SetValue(i, i)
         if cellData:
             vg.GetCellData().SetPedigreeIds(pedigreeId)
         else:
@@ -687,30 +897,36 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
         # proj4 returns inf for points that are not visible. Set those to a valid point
         # and hide them.
         ghost = vg.AllocatePointGhostArray()
+        hasHiddenPoints = False
         if (setInfToValid(geopts, ghost)):
             # if there are hidden points, we recompute the bounds
-            xm = ym = sys.float_info.max
-            xM = yM = - sys.float_info.max
-            for i in range(pts.GetNumberOfPoints()):
-                if (ghost.GetValue(i) & vtk.vtkDataSetAttributes.HIDDENPOINT == 0):
-                    # point not hidden
-                    p = pts.GetPoint(i)
-                    if (p[0] < xm):
-                        xm = p[0]
-                    if (p[0] > xM):
-                        xM = p[0]
-                    if (p[1] < ym):
-                        ym = p[1]
-                    if (p[1] > yM):
-                        yM = p[1]
+            visible = (VN.vtk_to_numpy(ghost) & vtk.vtkDataSetAttributes.HIDDENPOINT) == 0
+            if visible.any():
+                visiblePts = VN.vtk_to_numpy(pts.GetData())[visible]
+                xm, ym = visiblePts[:, 0].min(), visiblePts[:, 1].min()
+                xM, yM = visiblePts[:, 0].max(), visiblePts[:, 1].max()
+            else:
+                xm = ym = sys.float_info.max
+                xM = yM = - sys.float_info.max
             debugMsg('bounds after removing infs = [xm, xM, ym, yM] = [{0}, {1}, {2}, {3}]'.format(xm, xM, ym, yM))
             # hidden point don't work for polys or unstructured grids.
             # We remove the cells in this case.
             if (vg.GetExtentType() == vtk.VTK_PIECES_EXTENT):
+                hasHiddenPoints = True
                 removeHiddenPointsOrCells(vg, celldata=False)
 
         # Sets the vertics into the grid
         vg.SetPoints(geopts)
+        if vg.GetExtentType() != vtk.VTK_PIECES_EXTENT or cacheKey in gridSeen:
+            # the coordinates are kept with the grid so that their id, part
+            # of the key, is not reused
+            gridCache.put(cacheKey, (cacheableGrid(vg, attribute.GetName()),
+                                     xm, xM, ym, yM, geo, hasHiddenPoints, coordinates))
+            gridSeen.remove(cacheKey)
+        else:
+            # unstructured grids need a deep copy, only pay for it once
+            # the same grid comes back
+            gridSeen.put(cacheKey, None)
     else:
         xm, xM, ym, yM, tmp, tmp2 = grid.GetPoints().GetBounds()
         vg = grid
@@ -734,62 +950,246 @@ def genGrid(data1, data2, gm, deep=True, grid=None, geo=None, genVectors=False,
     return out
 
 
+# Projected grids are kept here so that plotting other variables on the
+# same grid, projection and world coordinates only attaches a new array.
+# Use gridCache.stats() to check hits/misses and gridCache.clear() to empty it.
+gridCache = LRUCache(maxsize=8)
+# Keys of the unstructured grids plotted once, cached when they come back
+gridSeen = LRUCache(maxsize=8)
+
+
+def projectionCacheKey(projection):
+    """Returns a hashable key describing the projection type and parameters"""
+    if isinstance(projection, str):
+        projection = vcs.elements["projection"][projection]
+    parameters = projection.parameters
+    if isinstance(parameters, dict):
+        parameters = tuple(sorted(parameters.items()))
+    else:
+        parameters = tuple(parameters)
+    return (projection._type, parameters)
+
+
+def gridCacheKey(coordinates, points, grid, cellData, wc, wrap, projection, isCurveGrid):
+    """Returns the gridCache key for a grid with 'points' coordinates
+    plotted with the world coordinates 'wc', 'wrap' and 'projection'.
+
+    'coordinates' is what the points are made from: a tuple of the 1D axes
+    (or bounds) of a rectilinear grid, which are hashed, or a cdms grid or
+    mesh, keyed on its identity. The shape and end points of 'points' catch
+    coordinates modified in place, without going over all of them."""
+    if isinstance(coordinates, tuple):
+        digest = hashlib.sha1()
+        for c in coordinates:
+            digest.update(numpy.ascontiguousarray(numpy.ma.getdata(c[:]), dtype=numpy.float64).view(numpy.uint8))
+        source = digest.hexdigest()
+    else:
+        source = id(coordinates)
+    points = numpy.ma.getdata(points)
+    ends = tuple(points[0].tolist() + points[-1].tolist()) if len(points) else ()
+    return (source, points.shape, str(points.dtype), ends,
+            grid.GetClassName(), grid.GetNumberOfCells(), cellData,
+            tuple(wc), None if wrap is None else tuple(wrap),
+            projectionCacheKey(projection), isCurveGrid)
+
+
+def cacheableGrid(grid, arrayName):
+    """Copy of the geometry of 'grid', without the 'arrayName' data array.
+    Structured grids share their points with 'grid'. Cells of unstructured
+    grids are deleted in place for missing values, those are deep copied."""
+    geometry = grid.NewInstance()
+    if grid.GetExtentType() == vtk.VTK_PIECES_EXTENT:
+        geometry.DeepCopy(grid)
+    else:
+        geometry.ShallowCopy(grid)
+    geometry.GetCellData().RemoveArray(arrayName)
+    geometry.GetPointData().RemoveArray(arrayName)
+    return geometry
+
+
+def restoreCachedGrid(cached, attribute, cellData, genVectors):
+    """Builds a grid from a gridCache entry and sets 'attribute' on it.
+    Returns the grid, its bounds and the vtkGeoTransform used."""
+    geometry, xm, xM, ym, yM, geo, hasHiddenPoints, coordinates = cached
+    vg = geometry.NewInstance()
+    if geometry.GetExtentType() == vtk.VTK_PIECES_EXTENT:
+        # cells are removed later on for missing values, we need our own copy
+        vg.DeepCopy(geometry)
+    else:
+        vg.ShallowCopy(geometry)
+    attributes = vg.GetCellData() if cellData else vg.GetPointData()
+    # The cached grid was wrapped, pedigree ids map it to the data
+    pedigreeIds = VN.vtk_to_numpy(attributes.GetPedigreeIds())
+    values = numpy_to_vtk_wrapper(VN.vtk_to_numpy(attribute)[pedigreeIds], deep=False)
+    values.SetName(attribute.GetName())
+    if genVectors:
+        attributes.SetVectors(values)
+    else:
+        attributes.SetScalars(values)
+    if hasHiddenPoints:
+        removeHiddenPointsOrCells(vg, celldata=False)
+    return vg, xm, xM, ym, yM, geo
+
+
 # Continents first
 # Try to save time and memorize these continents
+# parsed files are cached per (file, xConvertFunction, yConvertFunction)
 vcsContinents = {}
+# VCS_CONTINENTS_SIDECAR=1 (or setting continentsSidecar) also stores the
+# parsed outlines as .npz files in the user's dot directory, so that later
+# sessions do not need to parse the text files again. Off by default, the dot
+# directory may be shared or read-only.
+continentsSidecar = os.environ.get("VCS_CONTINENTS_SIDECAR", "0") not in ("", "0")
+
+
+def continentsSidecarPath(fnm):
+    """Returns the path of the binary (.npz) version of continent file 'fnm'"""
+    fnm = os.path.abspath(fnm)
+    digest = hashlib.sha1(fnm.encode("utf-8")).hexdigest()[:12]
+    dotdir, dotdirenv = vcs.getdotdirectory()
+    return os.path.join(os.path.expanduser("~"),
+                        os.environ.get(dotdirenv, dotdir),
+                        "continents_cache",
+                        "%s_%s.npz" % (os.path.basename(fnm), digest))
+
+
+def parseContinents(fnm):
+    """Reads a vcs continents file.
+    Returns latitudes, longitudes and number of points of each line"""
+    lats = []
+    lons = []
+    lengths = []
+    with open(fnm) as f:
+        ln = f.readline()
+        while ln.strip() and ln.strip().split() != ["-99", "-99"]:
+            # Many lines, need to know number of points
+            N = int(ln.split()[0])
+            # Now read these points
+            n = 0
+            while n < N:
+                ln = str(f.readline())
+                sp = ln.split()
+                sn = len(sp)
+                didIt = False
+                if sn % 2 == 0:
+                    try:
+                        values = [float(v) for v in sp]
+                        lats.extend(values[0::2])
+                        lons.extend(values[1::2])
+                        n += sn
+                        didIt = True
+                    except Exception:
+                        didIt = False
+                if didIt is False:
+                    while len(ln) > 2:
+                        lats.append(float(ln[:8]))
+                        lons.append(float(ln[8:16]))
+                        ln = ln[16:]
+                        n += 2
+            lengths.append(N // 2)
+            ln = f.readline()
+    return (numpy.array(lats, dtype=numpy.float64),
+            numpy.array(lons, dtype=numpy.float64),
+            numpy.array(lengths, dtype=VN.ID_TYPE_CODE))
+
+
+def loadContinents(fnm):
+    """Same as parseContinents but uses (and creates) the .npz sidecar
+    file when continentsSidecar is set"""
+    if not continentsSidecar:
+        return parseContinents(fnm)
+    sidecar = continentsSidecarPath(fnm)
+    stat = os.stat(fnm)
+    signature = numpy.array([stat.st_mtime, stat.st_size])
+    try:
+        with numpy.load(sidecar) as npz:
+            if numpy.array_equal(npz["signature"], signature):
+                return npz["lats"], npz["lons"], npz["lengths"]
+    except Exception:
+        pass
+    lats, lons, lengths = parseContinents(fnm)
+    # write to a temporary file first so that readers never see half a file
+    tmp = "%s.%i.tmp.npz" % (sidecar[:-4], os.getpid())
+    try:
+        if not os.path.exists(os.path.dirname(sidecar)):
+            os.makedirs(os.path.dirname(sidecar))
+        numpy.savez(tmp, signature=signature, lats=lats, lons=lons, lengths=lengths)
+        os.rename(tmp, sidecar)
+    except Exception:
+        # read-only home, no space left... we will parse again next time
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return lats, lons, lengths
+
+
+def convertContinentCoordinates(values, convertFunction):
+    try:
+        converted = numpy.asarray(convertFunction(values), dtype=numpy.float64)
+        if converted.shape == values.shape:
+            return converted
+    except Exception:
+        pass
+    # function does not handle arrays
+    return numpy.array([convertFunction(v) for v in values], dtype=numpy.float64)
 
 
 def prepContinents(fnm, xConvertFunction=lambda x: x, yConvertFunction=lambda y: y):
     """ This converts vcs continents files to vtkpolydata
     Author: Charles Doutriaux
     Input: vcs continent file name
+    The result is cached, each call returns a new copy that can be modified.
     """
-    poly = vtk.vtkPolyData()
-    cells = vtk.vtkCellArray()
+    key = (os.path.abspath(fnm), os.path.getmtime(fnm), xConvertFunction, yConvertFunction)
+    poly = vcsContinents.get(key)
+    if poly is None:
+        poly = readContinents(fnm, xConvertFunction, yConvertFunction)
+        vcsContinents[key] = poly
+    out = vtk.vtkPolyData()
+    out.DeepCopy(poly)
+    return out
+
+
+# Wrapped and projected continents, these only depend on the world
+# coordinates and projection so panels sharing them reuse the polydata.
+continentsCache = LRUCache(maxsize=8)
+
+
+def prepProjectedContinents(fnm, wc, projection,
+                            xConvertFunction=lambda x: x, yConvertFunction=lambda y: y):
+    """Returns the continents in 'fnm' wrapped and clipped to 'wc' and
+    projected with 'projection'. Each call returns a new copy."""
+    key = (os.path.abspath(fnm), os.path.getmtime(fnm), xConvertFunction, yConvertFunction,
+           tuple(wc), projectionCacheKey(projection))
+    contData = continentsCache.get(key)
+    if contData is None:
+        contData = prepContinents(fnm, xConvertFunction, yConvertFunction)
+        contData = doWrapData(contData, wc, fastClip=False)
+        if projection.type != "linear":
+            cpts = contData.GetPoints()
+            # we use plotting coordinates for doing the projection so
+            # that parameters such that central meridian are set correctly.
+            _, gcpts = project(cpts, projection, wc)
+            contData.SetPoints(gcpts)
+        continentsCache.put(key, contData)
+    out = vtk.vtkPolyData()
+    out.DeepCopy(contData)
+    return out
+
+
+def readContinents(fnm, xConvertFunction, yConvertFunction):
+    lats, lons, lengths = loadContinents(fnm)
+    xyz = numpy.zeros((len(lats), 3))
+    xyz[:, 0] = convertContinentCoordinates(lons, xConvertFunction)
+    xyz[:, 1] = convertContinentCoordinates(lats, yConvertFunction)
     pts = vtk.vtkPoints()
-    f = open(fnm)
-    ln = f.readline()
-    while ln.strip().split() != ["-99", "-99"]:
-        # Many lines, need to know number of points
-        N = int(ln.split()[0])
-        # Now create and store these points
-        n = 0
-        npts = pts.GetNumberOfPoints()
-        while n < N:
-            ln = str(f.readline())
-            sp = ln.split()
-            sn = len(sp)
-            didIt = False
-            if sn % 2 == 0:
-                try:
-                    spts = []
-                    for i in range(sn // 2):
-                        l, L = float(sp[i * 2]), float(sp[i * 2 + 1])
-                        spts.append([l, L])
-                    for p in spts:
-                        x = xConvertFunction(p[1])
-                        y = yConvertFunction(p[0])
-                        pts.InsertNextPoint(x, y, 0.)
-                    n += sn
-                    didIt = True
-                except Exception:
-                    didIt = False
-            if didIt is False:
-                while len(ln) > 2:
-                    l, L = float(ln[:8]), float(ln[8:16])
-                    x = xConvertFunction(L)
-                    y = yConvertFunction(l)
-                    pts.InsertNextPoint(x, y, 0.)
-                    ln = ln[16:]
-                    n += 2
-        ln = vtk.vtkPolyLine()
-        ln.GetPointIds().SetNumberOfIds(N // 2)
-        for i in range(N // 2):
-            ln.GetPointIds().SetId(i, i + npts)
-        cells.InsertNextCell(ln)
-        ln = f.readline()
+    pts.SetData(numpy_to_vtk_wrapper(xyz, deep=True))
+    offsets = numpy.zeros(len(lengths) + 1, dtype=VN.ID_TYPE_CODE)
+    numpy.cumsum(lengths, out=offsets[1:])
+    poly = vtk.vtkPolyData()
     poly.SetPoints(pts)
-    poly.SetLines(cells)
+    poly.SetLines(numpyToCellArray(offsets, numpy.arange(offsets[-1], dtype=VN.ID_TYPE_CODE)))
 
     # The dataset has some duplicate lines that extend
     # outside of x=[-180, 180],
@@ -864,49 +1264,160 @@ def apply_proj_parameters(pd, projection, x1, x2, y1, y2):
             pd.SetOptionalParameter('lat_2', str(standardparallel2))
 
 
-def projectArray(w, projection, wc, geo=None):
-    x1, x2, y1, y2 = wc
-    if isinstance(projection, str):
-        projection = vcs.elements["projection"][projection]
-    if projection.type == "linear":
-        return None, w
+class ProjParameters(object):
+    """Records what apply_proj_parameters sets on a vtkGeoProjection so
+    that the resolved proj4 parameters can be used as a key"""
 
-    if geo is None:
-        geo = vtk.vtkGeoTransform()
-        ps = vtk.vtkGeoProjection()
-        pd = vtk.vtkGeoProjection()
+    def __init__(self):
+        self.name = None
+        self.centralMeridian = None
+        self.optional = {}
 
-        apply_proj_parameters(pd, projection, x1, x2, y1, y2)
+    def SetName(self, name):
+        self.name = name
 
-        geo.SetSourceProjection(ps)
-        geo.SetDestinationProjection(pd)
+    def SetCentralMeridian(self, centralMeridian):
+        self.centralMeridian = float(centralMeridian)
 
-    for i in range(0, w.GetNumberOfTuples()):
-        tuple = [0, 0, 0]
-        w.GetTypedTuple(i, tuple)
-        geo.TransformPoint(tuple, tuple)
-        w.SetTypedTuple(i, tuple)
+    def SetOptionalParameter(self, key, value):
+        self.optional[key] = value
 
+    def key(self):
+        return (self.name, self.centralMeridian, tuple(sorted(self.optional.items())))
 
-# Geo projection
-def project(pts, projection, wc, geo=None):
-    x1, x2, y1, y2 = wc
-    if isinstance(projection, str):
-        projection = vcs.elements["projection"][projection]
-    if projection.type == "linear":
-        return None, pts
+
+def resolveProjParameters(projection, wc):
+    """Returns the proj4 parameters used for 'projection' and world
+    coordinates 'wc' as a hashable tuple (name, central meridian, options)"""
+    key = (projectionCacheKey(projection), tuple(wc))
+    resolved = projParametersCache.get(key)
+    if resolved is None:
+        if isinstance(projection, str):
+            projection = vcs.elements["projection"][projection]
+        x1, x2, y1, y2 = wc
+        params = ProjParameters()
+        apply_proj_parameters(params, projection, x1, x2, y1, y2)
+        resolved = params.key()
+        projParametersCache.put(key, resolved)
+    return resolved
+
+
+# Configured transforms are shared between all plots using the same proj4
+# parameters. projParametersCache maps (projection state, wc) to these
+# parameters, a modified projection is a new key so there is nothing
+# to invalidate by hand. Both can be emptied with clear().
+projParametersCache = LRUCache(maxsize=256)
+geoTransformCache = LRUCache(maxsize=32)
+
+
+def getGeoTransform(projection, wc):
+    """Returns the vtkGeoTransform going from lon/lat to 'projection'
+    for world coordinates 'wc'. Transforms are shared, do not modify them."""
+    resolved = resolveProjParameters(projection, wc)
+    geo = geoTransformCache.get(resolved)
     if geo is None:
+        name, centralMeridian, optional = resolved
         geo = vtk.vtkGeoTransform()
         ps = vtk.vtkGeoProjection()
         pd = vtk.vtkGeoProjection()
-
-        apply_proj_parameters(pd, projection, x1, x2, y1, y2)
+        pd.SetName(name)
+        if centralMeridian is not None:
+            pd.SetCentralMeridian(centralMeridian)
+        for k, v in optional:
+            pd.SetOptionalParameter(k, v)
 
         geo.SetSourceProjection(ps)
         geo.SetDestinationProjection(pd)
+        geoTransformCache.put(resolved, geo)
+    return geo
+
+
+def inverseGeoTransform(geo):
+    """Returns a new vtkGeoTransform going back from the destination to the
+    source projection of 'geo'. Shared transforms must not be Inverse()d."""
+    inverse = vtk.vtkGeoTransform()
+    inverse.SetSourceProjection(geo.GetDestinationProjection())
+    inverse.SetDestinationProjection(geo.GetSourceProjection())
+    return inverse
+
+
+def probeSource(dataset):
+    """Returns a dataset sharing the points and cells of 'dataset', with
+    arrays of its cell ids and point ids, to be probed by probePoints."""
+    source = dataset.NewInstance()
+    source.CopyStructure(dataset)
+    cellIds = numpy_to_vtk_wrapper(numpy.arange(dataset.GetNumberOfCells(), dtype=numpy.int64), deep=False)
+    cellIds.SetName("CellIds")
+    source.GetCellData().AddArray(cellIds)
+    pointIds = numpy_to_vtk_wrapper(numpy.arange(dataset.GetNumberOfPoints(), dtype=numpy.int64), deep=False)
+    pointIds.SetName("PointIds")
+    source.GetPointData().AddArray(pointIds)
+    return source
+
+
+def probePoints(source, xyz):
+    """Finds the cells of a probeSource containing the (N, 3) points 'xyz'
+    in one vtkProbeFilter pass.
+    Returns the cell ids, the ids of the cell points with the largest
+    interpolation weight (the closest ones) and which points are in a cell."""
+    pts = vtk.vtkPoints()
+    pts.SetData(numpy_to_vtk_wrapper(numpy.ascontiguousarray(xyz, dtype=numpy.float64), deep=False))
+    probed = vtk.vtkPolyData()
+    probed.SetPoints(pts)
+    probe = vtk.vtkProbeFilter()
+    probe.SetInputData(probed)
+    probe.SetSourceData(source)
+    # point ids are not interpolated, the point of largest weight is used
+    probe.CategoricalDataOn()
+    probe.Update()
+    attributes = probe.GetOutput().GetPointData()
+    found = VN.vtk_to_numpy(attributes.GetArray(probe.GetValidPointMaskArrayName())) != 0
+    cells = numpy.where(found, VN.vtk_to_numpy(attributes.GetArray("CellIds")), -1).astype(numpy.int64)
+    points = numpy.where(found, VN.vtk_to_numpy(attributes.GetArray("PointIds")), -1).astype(numpy.int64)
+    return cells, points, found
+
+
+def projectPoints(points, projection, wc, geo=None):
+    """Projects all 'points' at once.
+    'points' is either a vtkPoints or a numpy array of shape (N, 2) or (N, 3),
+    the projected points are returned in the same form along with the transform
+    (None for linear projections, in which case 'points' is returned as is)."""
+    if isinstance(projection, str):
+        projection = vcs.elements["projection"][projection]
+    if projection.type == "linear":
+        return None, points
+    if geo is None:
+        geo = getGeoTransform(projection, wc)
+    if isinstance(points, vtk.vtkPoints):
+        geopts = vtk.vtkPoints()
+        geo.TransformPoints(points, geopts)
+        return geo, geopts
+    points = numpy.asarray(points, dtype=numpy.float64)
+    xyz = numpy.zeros((len(points), 3))
+    xyz[:, :points.shape[1]] = points
+    pts = vtk.vtkPoints()
+    pts.SetData(numpy_to_vtk_wrapper(xyz, deep=False))
     geopts = vtk.vtkPoints()
     geo.TransformPoints(pts, geopts)
-    return geo, geopts
+    return geo, VN.vtk_to_numpy(geopts.GetData())[:, :points.shape[1]].copy()
+
+
+def projectArray(w, projection, wc, geo=None):
+    """Projects in place the tuples of the 3 components vtkDataArray 'w'"""
+    if isinstance(projection, str):
+        projection = vcs.elements["projection"][projection]
+    if projection.type == "linear":
+        return None, w
+
+    values = VN.vtk_to_numpy(w)
+    geo, projected = projectPoints(values, projection, wc, geo=geo)
+    values[:] = projected
+    w.Modified()
+
+
+# Geo projection
+def project(pts, projection, wc, geo=None):
+    return projectPoints(pts, projection, wc, geo=geo)
 
 
 def setProjectionParameters(pd, proj):
@@ -1092,6 +1603,22 @@ def dump2VTK(obj, fnm=None):
     dsw.Write()
 
 
+def wrapOffsets(dataMin, dataMax, windowMin, windowMax, modulo):
+    """Returns the multiples of 'modulo' by which [dataMin, dataMax] must be
+    translated to cover [windowMin, windowMax], keeping only translations
+    that intersect the window. 0 (no translation) is always included."""
+    if modulo == 0.:
+        return [0.]
+    modulo = abs(modulo)
+    first = int(math.floor((windowMin - dataMax) / modulo))
+    last = int(math.ceil((windowMax - dataMin) / modulo))
+    offsets = [i * modulo for i in range(first, last + 1)
+               if dataMin + i * modulo < windowMax and dataMax + i * modulo > windowMin]
+    if 0. not in offsets:
+        offsets.append(0.)
+    return offsets
+
+
 def doWrapData(data, wc, wrap=[0., 360], fastClip=True):
     '''
     Wrapping around and 'wrap' modulo' and clipping.
@@ -1141,45 +1668,23 @@ def doWrapData(data, wc, wrap=[0., 360], fastClip=True):
         else:
             ymx = bounds[3]
 
+    # Translations whose copy of the data intersects the window
+    xOffsets = wrapOffsets(bounds[0], bounds[1], xmn, xmx, wrap[1])
+    yOffsets = wrapOffsets(bounds[2], bounds[3], ymn, ymx, wrap[0])
     appendFilter = vtk.vtkAppendPolyData()
-    appendFilter.AddInputData(data)
-    appendFilter.Update()
-    # X axis wrappping
-    Amn, Amx = bounds[0], bounds[1]
-    nX = [0, 0]  # number of translations needed (neg and pos)
-    if wrap[1] != 0.:
-        while Amn > xmn:
-            nX[0] += 1
-            Amn -= wrap[1]
-        while Amx < xmx:
-            nX[1] += 1
-            Amx += wrap[1]
-    Amn, Amx = bounds[2], bounds[3]
-    nY = [0, 0]  # number of translations needed (neg and pos)
-    if wrap[0] != 0.:
-        while Amn > ymn:
-            nY[0] += 1
-            Amn -= wrap[0]
-        while Amx < ymx:
-            nY[1] += 1
-            Amx += wrap[0]
-
-    nNeg = -max(nX[0], nY[0])  # Number of negative translation needed
-    nPos = max(nX[1], nY[1]) + 1  # Number of negative translation needed
-    # Negative translation
-    for i in range(nNeg, nPos):
-        for j in range(nNeg, nPos):
-            if i == 0 and j == 0:
+    points = VN.vtk_to_numpy(data.GetPoints().GetData())
+    for dx in xOffsets:
+        for dy in yOffsets:
+            if dx == 0 and dy == 0:
+                appendFilter.AddInputData(data)
                 continue
-            Tpf = vtk.vtkTransformPolyDataFilter()
-            Tpf.SetInputData(data)
-            T = vtk.vtkTransform()
-            T.Translate(i * wrap[1], j * wrap[0], 0)
-            Tpf.SetTransform(T)
-            Tpf.Update()
-            appendFilter.AddInputData(Tpf.GetOutput())
-            appendFilter.Update()
-
+            # copies share everything but the points with data
+            translated = vtk.vtkPolyData()
+            translated.ShallowCopy(data)
+            pts = vtk.vtkPoints()
+            pts.SetData(numpy_to_vtk_wrapper((points + (dx, dy, 0.)).astype(points.dtype), deep=False))
+            translated.SetPoints(pts)
+            appendFilter.AddInputData(translated)
     # Clip the data to the final window:
     clipBox = vtk.vtkBox()
     clipBox.SetXMin(xmn, ymn, -1.0)
@@ -1373,8 +1878,11 @@ def prepTextProperty(p, winSize, to="default", tt="default", cmap=None,
 
 
 class TextActorWrapperItem(object):
-    def __init__(self, textActor):
+    def __init__(self, textActor, height=None, windowHeight=None):
         self.textActor = textActor
+        # text orientation height and window height the font was sized for
+        self.height = height
+        self.windowHeight = windowHeight
 
     def Initialize(self, vtkSelf):
         return True
@@ -1384,6 +1892,13 @@ class TextActorWrapperItem(object):
         text = self.textActor.GetInput()
         textProp = self.textActor.GetTextProperty()
 
+        if self.height is not None:
+            # the window may have been resized without replotting
+            windowHeight = vtkSelf.GetScene().GetSceneHeight()
+            if windowHeight > 0 and windowHeight != self.windowHeight:
+                textProp.SetFontSize(int(self.height * windowHeight / 800.))
+                self.windowHeight = windowHeight
+
         context2D.ApplyTextProp(textProp)
         context2D.DrawString(pos[0], pos[1], text)
 
@@ -1418,36 +1933,33 @@ def genTextActor(contextArea, string=None, x=None, y=None,
 
     sz = renderer.GetRenderWindow().GetSize()
     actors = []
-    pts = vtk.vtkPoints()
     if vcs.elements["projection"][tt.projection].type != "linear":
         if geoBounds is not None:
             wc = geoBounds[:4]
         else:
             wc = None
+        # project all the anchors at once
+        _, anchors = projectPoints(numpy.transpose([x[:n], y[:n]]),
+                                   tt.projection, tt.worldcoordinate, geo=geo)
+        if wc is None:
+            wc = tt.worldcoordinate
+            # Scan a bunch of points within wc
+            # In case the proj deformation bring origin close
+            # from each others
+            wx, wy = numpy.meshgrid(numpy.arange(wc[0], wc[1], (wc[1] - wc[0]) / 25.),
+                                    numpy.arange(wc[2], wc[3], (wc[3] - wc[2]) / 25.))
+            _, as_numpy = projectPoints(numpy.transpose([wx.ravel(), wy.ravel()]),
+                                        tt.projection, tt.worldcoordinate, geo=geo)
+            wx = as_numpy[:, 0]
+            wy = as_numpy[:, 1]
+            wc = [wx.min(), wx.max(), wy.min(), wy.max()]
 
     for i in range(n):
         t = vtk.vtkTextActor()
         p = t.GetTextProperty()
         prepTextProperty(p, sz, to, tt, cmap)
-        pts = vtk.vtkPoints()
-        pts.InsertNextPoint(x[i], y[i], 0.)
         if vcs.elements["projection"][tt.projection].type != "linear":
-            _, pts = project(pts, tt.projection, tt.worldcoordinate, geo=geo)
-            X, Y, tz = pts.GetPoint(0)
-            if wc is None:
-                wc = tt.worldcoordinate
-                pts_wc = vtk.vtkPoints()
-                # Scan a bunch of points within wc
-                # In case the proj deformation bring origin close
-                # from each others
-                for wx in numpy.arange(wc[0], wc[1], (wc[1] - wc[0]) / 25.):
-                    for wy in numpy.arange(wc[2], wc[3], (wc[3] - wc[2]) / 25.):
-                        pts_wc.InsertNextPoint(wx, wy, 0.)
-                _, pts_wc = project(pts_wc, tt.projection, tt.worldcoordinate, geo=geo)
-                as_numpy = VN.vtk_to_numpy(pts_wc.GetData())
-                wx = as_numpy[:, 0]
-                wy = as_numpy[:, 1]
-                wc = [wx.min(), wx.max(), wy.min(), wy.max()]
+            X, Y = anchors[i]
             X, Y = world2Renderer(renderer, X, Y, tt.viewport, wc)
         else:
             X, Y = world2Renderer(
@@ -1456,7 +1968,7 @@ def genTextActor(contextArea, string=None, x=None, y=None,
         t.SetInput(string[i])
 
         item = vtk.vtkPythonItem()
-        item.SetPythonObject(TextActorWrapperItem(t))
+        item.SetPythonObject(TextActorWrapperItem(t, to.height, sz[1]))
         contextArea.GetDrawAreaItem().AddItem(item)
 
         actors.append(t)
@@ -1467,9 +1979,9 @@ def genTextActor(contextArea, string=None, x=None, y=None,
 def prepPrimitive(prim):
     if prim.x is None or prim.y is None:
         return 0
-    if not isinstance(prim.x[0], (list, tuple)):
+    if not isinstance(prim.x[0], (list, tuple, numpy.ndarray)):
         prim.x = [prim.x, ]
-    if not isinstance(prim.y[0], (list, tuple)):
+    if not isinstance(prim.y[0], (list, tuple, numpy.ndarray)):
         prim.y = [prim.y, ]
     if vcs.isfillarea(prim):
         atts = ["x", "y", "color", "style", "index"]
@@ -1919,6 +2431,25 @@ def getMarkerColor(marker, c, cmap=None):
     return retval
 
 
+def lineCoordinates(x, y):
+    """Returns the coordinates of a line as float arrays of the same length,
+    the shorter one is extended by repeating its last value."""
+    x = numpy.asarray(x, dtype=numpy.float64).ravel()
+    y = numpy.asarray(y, dtype=numpy.float64).ravel()
+    n = max(len(x), len(y))
+    return [numpy.concatenate((a, numpy.repeat(a[-1:], n - len(a)))) for a in (x, y)]
+
+
+def interpolateSegments(values, n):
+    """Returns 'values' with each segment between two consecutive values
+    split in n evenly spaced steps, for lines drawn on curved projections."""
+    if len(values) < 2:
+        return values
+    steps = numpy.arange(1, n + 1) / float(n)
+    inner = values[:-1, numpy.newaxis] + steps[numpy.newaxis, :] * numpy.diff(values)[:, numpy.newaxis]
+    return numpy.concatenate((values[:1], inner.ravel()))
+
+
 def prepMarker(marker, screenGeom, scale=None, cmap=None):
     n = prepPrimitive(marker)
     if n == 0:
@@ -1927,16 +2458,13 @@ def prepMarker(marker, screenGeom, scale=None, cmap=None):
     for i in range(n):
         g = vtk.vtkGlyph2D()
         markers = vtk.vtkPolyData()
-        x = marker.x[i]
-        y = marker.y[i]
+        x, y = lineCoordinates(marker.x[i], marker.y[i])
         c = marker.color[i]
-        N = max(len(x), len(y))
-        for a in [x, y]:
-            while len(a) < n:
-                a.append(a[-1])
+        xyz = numpy.zeros((len(x), 3))
+        xyz[:, 0] = x
+        xyz[:, 1] = y
         pts = vtk.vtkPoints()
-        for j in range(N):
-            pts.InsertNextPoint(x[j], y[j], 0.)
+        pts.SetData(numpy_to_vtk_wrapper(xyz, deep=False))
         geo, pts = project(pts, marker.projection, marker.worldcoordinate)
         markers.SetPoints(pts)
 
@@ -1974,18 +2502,6 @@ def prepMarker(marker, screenGeom, scale=None, cmap=None):
     return actors
 
 
-def __build_ld__():
-    pts = vtk.vtkPoints()
-    lines = vtk.vtkCellArray()
-    linePolyData = vtk.vtkPolyData()
-    linePolyData.SetPoints(pts)
-    linePolyData.SetLines(lines)
-    colors = vtk.vtkUnsignedCharArray()
-    colors.SetNumberOfComponents(4)
-    colors.SetName("Colors")
-    return pts, lines, linePolyData, colors
-
-
 def stippleLine(prop, line_type):
     if line_type == 'long-dash':
         prop.SetLineStipplePattern(int('0000111111111111', 2))
@@ -2039,11 +2555,12 @@ def getProjectedBoundsForWorldCoords(wc, proj, subdiv=50):
     # in the projected space.
     x = numpy.linspace(wc[0], wc[1], subdiv)
     y = numpy.linspace(wc[2], wc[3], subdiv)
-    xy = numpy.transpose([numpy.tile(x, len(y)), numpy.repeat(y, len(x))])
+    xyz = numpy.zeros((subdiv * subdiv, 3))
+    xyz[:, 0] = numpy.tile(x, len(y))
+    xyz[:, 1] = numpy.repeat(y, len(x))
 
     pts = vtk.vtkPoints()
-    for idx in range(len(xy)):
-        pts.InsertNextPoint(xy[idx][0], xy[idx][1], 0.0)
+    pts.SetData(numpy_to_vtk_wrapper(xyz, deep=False))
 
     geoTransform, xformPts = project(pts, proj, wc)
     setInfToValid(xformPts)
@@ -2088,8 +2605,9 @@ def prepLine(plotsContext, line, geoBounds=None, cmap=None):
 
     for i in range(number_lines):
 
-        x = line.x[i]
-        y = line.y[i]
+        x, y = lineCoordinates(line.x[i], line.y[i])
+        if len(x) == 0:
+            continue
         if isinstance(line.color[i], int):
             c = cmap.index[line.color[i]]
         else:
@@ -2098,54 +2616,45 @@ def prepLine(plotsContext, line, geoBounds=None, cmap=None):
         t = line.type[i]
 
         if (t, w) not in line_data:
-            line_data[(t, w)] = __build_ld__()
-        pts, lines, linesPoly, colors = line_data[(t, w)]
+            line_data[(t, w)] = ([], [], [])
+        points, colors, counts = line_data[(t, w)]
         vtk_color = [int(component / 100. * 255) for component in c]
 
-        number_points = max(len(x), len(y))
-
-        point_offset = pts.GetNumberOfPoints()
-        # Extend x or y to the length of the other by duplicating the last
-        # coord.
-        for a in [x, y]:
-            while len(a) < number_points:
-                a.append(a[-1])
-
-        if vcs.elements["projection"][line.projection].type == "linear":
-            for j in range(number_points):
-                pts.InsertNextPoint(x[j], y[j], 0.)
-            n2 = number_points - 1
-        else:
-            pts.InsertNextPoint(x[0], y[0], 0.)
-            n2 = 0
-            for j in range(1, number_points):
-                if vcs.elements["projection"][
-                        line.projection].type in round_projections:
-                    NPointsInterp = 50
-                else:
-                    NPointsInterp = 25
-                for i in range(1, NPointsInterp + 1):
-                    if x[j] != x[j - 1]:
-                        tmpx = x[j - 1] + \
-                            float(i) / NPointsInterp * (x[j] - x[j - 1])
-                    else:
-                        tmpx = x[j]
-                    if y[j] != y[j - 1]:
-                        tmpy = y[j - 1] + \
-                            float(i) / NPointsInterp * (y[j] - y[j - 1])
-                    else:
-                        tmpy = y[j]
-                    pts.InsertNextPoint(tmpx, tmpy, 0.)
-                    n2 += 1
-        for j in range(n2):
-            colors.InsertNextTypedTuple(vtk_color)
-            ln_tmp = vtk.vtkLine()
-            ln_tmp.GetPointIds().SetId(0, j + point_offset)
-            ln_tmp.GetPointIds().SetId(1, j + point_offset + 1)
-            lines.InsertNextCell(ln_tmp)
+        if vcs.elements["projection"][line.projection].type != "linear":
+            if vcs.elements["projection"][
+                    line.projection].type in round_projections:
+                NPointsInterp = 50
+            else:
+                NPointsInterp = 25
+            x = interpolateSegments(x, NPointsInterp)
+            y = interpolateSegments(y, NPointsInterp)
+        xyz = numpy.zeros((len(x), 3))
+        xyz[:, 0] = x
+        xyz[:, 1] = y
+        points.append(xyz)
+        colors.append(vtk_color)
+        counts.append(len(x) - 1)
 
     for t, w in line_data:
-        pts, _, linesPoly, colors = line_data[(t, w)]
+        points, colors, counts = line_data[(t, w)]
+        xyz = numpy.concatenate(points)
+        # one segment from each point to the next one, but for the last
+        # point of each line
+        isStart = numpy.ones(len(xyz), dtype=bool)
+        isStart[numpy.cumsum([len(p) for p in points]) - 1] = False
+        starts = numpy.flatnonzero(isStart)
+        connectivity = numpy.empty((len(starts), 2), dtype=numpy.int64)
+        connectivity[:, 0] = starts
+        connectivity[:, 1] = starts + 1
+        lines = numpyToCellArray(numpy.arange(0, 2 * len(starts) + 1, 2), connectivity.ravel())
+        colors = numpy_to_vtk_wrapper(numpy.repeat(numpy.array(colors, dtype=numpy.uint8), counts, axis=0),
+                                      deep=True)
+        colors.SetName("Colors")
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_to_vtk_wrapper(xyz, deep=False))
+        linesPoly = vtk.vtkPolyData()
+        linesPoly.SetPoints(pts)
+        linesPoly.SetLines(lines)
 
         linesPoly.GetCellData().SetScalars(colors)
         geoTransform, pts = project(pts, line.projection, line.worldcoordinate)
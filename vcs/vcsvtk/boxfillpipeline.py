@@ -1,5 +1,4 @@
 from .pipeline2d import Pipeline2D
-from . import fillareautils
 
 import numpy
 import vcs
@@ -26,6 +25,8 @@ class BoxfillPipeline(Pipeline2D):
         self._mappers = None
         self._customBoxfillArgs = {}
         self._needsCellData = True
+        # custom levels often are classes, keep actual values rather than averages
+        self._lodMethod = "nearest" if gm.boxfill_type == "custom" else "mean"
 
     def _updateScalarData(self):
         """Overrides baseclass implementation."""
@@ -85,9 +86,6 @@ class BoxfillPipeline(Pipeline2D):
 
         # And now we need actors to actually render this thing
         actors = []
-        cti = 0
-        ctj = 0
-        _colorMap = self.getColorMap()
         _style = self._gm.fillareastyle
         vp = self._resultDict.get(
             'ratio_autot_viewport',
@@ -165,49 +163,13 @@ class BoxfillPipeline(Pipeline2D):
                 else:
                     actors.append([item, plotting_dataset_bounds])
 
-            if mapper is not self._maskedDataMapper:
-                if self._gm.boxfill_type == "custom":
-                    # Patterns/hatches creation for custom boxfill plots
-                    patact = None
-
-                    tmpColors = self._customBoxfillArgs["tmpColors"]
-                    if ctj >= len(tmpColors[cti]):
-                        ctj = 0
-                        cti += 1
-                    # Since pattern creation requires a single color, assuming the first
-                    c = self.getColorIndexOrRGBA(_colorMap, tmpColors[cti][ctj])
-
-                    patact = fillareautils.make_patterned_polydata(
-                        poly,
-                        fillareastyle=_style,
-                        fillareaindex=self._customBoxfillArgs["tmpIndices"][cti],
-                        fillareacolors=c,
-                        fillareaopacity=self._customBoxfillArgs["tmpOpacities"][cti],
-                        fillareapixelspacing=fareapixelspacing,
-                        fillareapixelscale=fareapixelscale,
-                        size=self._context().renWin.GetSize(),
-                        screenGeom=self._context().renWin.GetSize())
-
-                    ctj += 1
-
-                    if patact is not None:
-                        patMapper = patact.GetMapper()
-                        patMapper.Update()
-                        patPoly = patMapper.GetInput()
-
-                        patItem = vtk.vtkPolyDataItem()
-                        patItem.SetPolyData(patPoly)
-
-                        patItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                        colorArray = patPoly.GetCellData().GetArray('Colors')
-
-                        patItem.SetMappedColors(colorArray)
-                        area.GetDrawAreaItem().AddItem(patItem)
-
-                        actors.append([patItem, plotting_dataset_bounds])
-
             midx += 1
 
+        if self._gm.boxfill_type == "custom":
+            actors.extend(self._addBandItems(area, self._bands, self._customBoxfillArgs,
+                                             fareapixelspacing, fareapixelscale,
+                                             plotting_dataset_bounds))
+
         self._resultDict["vtk_backend_actors"] = actors
 
         z, t = self.getZandT()
@@ -317,12 +279,7 @@ class BoxfillPipeline(Pipeline2D):
         while len(self._contourColors) < numLevels:
             self._contourColors.append(self._contourColors[-1])
 
-        lut = vtk.vtkLookupTable()
-        lut.SetNumberOfTableValues(numLevels)
-        _colorMap = self.getColorMap()
-        for i in range(numLevels):
-            r, g, b, a = self.getColorIndexOrRGBA(_colorMap, self._contourColors[i])
-            lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+        lut = vcs2vtk.colorsLookupTable(self.getColorMap(), self._contourColors[:numLevels])
 
         mapper.SetLookupTable(lut)
         if numpy.allclose(self._contourLevels[0], -1.e20):
@@ -338,58 +295,8 @@ class BoxfillPipeline(Pipeline2D):
 
     def _plotInternalCustomBoxfill(self):
         """Implements the logic to render a custom boxfill."""
+        # All the levels are drawn by a single banded item, see _plotInternal
         self._mappers = []
 
         self._customBoxfillArgs = self._prepContours()
-        tmpLevels = self._customBoxfillArgs["tmpLevels"]
-        tmpColors = self._customBoxfillArgs["tmpColors"]
-        tmpOpacities = self._customBoxfillArgs["tmpOpacities"]
-
-        style = self._gm.fillareastyle
-
-        luts = []
-        geos = []
-        wholeDataMin, wholeDataMax = vcs.minmax(self._originalData1)
-        _colorMap = self.getColorMap()
-        for i, l in enumerate(tmpLevels):
-            # Ok here we are trying to group together levels can be, a join
-            # will happen if: next set of levels continues where one left off
-            # AND pattern is identical
-
-            # TODO this should really just be a single polydata/mapper/actor:
-            for j, color in enumerate(tmpColors[i]):
-                mapper = vtk.vtkPolyDataMapper()
-                lut = vtk.vtkLookupTable()
-                th = vtk.vtkThreshold()
-                th.ThresholdBetween(l[j], l[j + 1])
-                # th.SetInputConnection(self._vtkPolyDataFilter.GetOutputPort())
-                th.SetInputData(self._vtkDataSetFittedToViewport)
-                geoFilter2 = vtk.vtkDataSetSurfaceFilter()
-                geoFilter2.SetInputConnection(th.GetOutputPort())
-                # Make the polydata output available here for patterning later
-                geoFilter2.Update()
-                geos.append(geoFilter2)
-                mapper.SetInputConnection(geoFilter2.GetOutputPort())
-                lut.SetNumberOfTableValues(1)
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
-                if style == 'solid':
-                    tmpOpacity = tmpOpacities[j]
-                    if tmpOpacity is None:
-                        tmpOpacity = a / 100.
-                    else:
-                        tmpOpacity = tmpOpacities[j] / 100.
-                    lut.SetTableValue(0, r / 100., g / 100., b / 100., tmpOpacity)
-                else:
-                    lut.SetTableValue(0, 1., 1., 1., 0.)
-                mapper.SetLookupTable(lut)
-                mapper.SetScalarRange(l[j], l[j + 1])
-                luts.append([lut, [l[j], l[j + 1], False]])
-                # Store the mapper only if it's worth it?
-                # Need to do it with the whole slab min/max for animation
-                # purposes
-                if not (l[j + 1] < wholeDataMin or l[j] > wholeDataMax):
-                    self._mappers.append(mapper)
-
-        self._resultDict["vtk_backend_luts"] = luts
-        if len(geos) > 0:
-            self._resultDict["vtk_backend_geofilters"] = geos
+        self._bands = self._prepBands(self._customBoxfillArgs)
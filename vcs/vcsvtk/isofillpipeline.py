@@ -1,5 +1,4 @@
 from .pipeline2d import Pipeline2D
-from . import fillareautils
 from .. import vcs2vtk
 
 import numpy
@@ -14,6 +13,7 @@ class IsofillPipeline(Pipeline2D):
     def __init__(self, gm, context_, plot_keyargs):
         super(IsofillPipeline, self).__init__(gm, context_, plot_keyargs)
         self._needsCellData = False
+        self._lodMethod = "mean"
 
     def _updateContourLevelsAndColors(self):
         self._updateContourLevelsAndColorsGeneric()
@@ -27,63 +27,35 @@ class IsofillPipeline(Pipeline2D):
         tmpOpacities = preppedCountours["tmpOpacities"]
         style = self._gm.fillareastyle
 
-        luts = []
-        cots = []
         mappers = []
+        bands = None
         _colorMap = self.getColorMap()
 
         plotting_dataset_bounds = self.getPlottingBounds()
         x1, x2, y1, y2 = plotting_dataset_bounds
         fareapixelspacing, fareapixelscale = self._patternSpacingAndScale()
 
-        for i, l in enumerate(tmpLevels):
-            # Ok here we are trying to group together levels can be, a join
-            # will happen if: next set of levels continues where one left off
-            # AND pattern is identical
-            mapper = vtk.vtkPolyDataMapper()
-            lut = vtk.vtkLookupTable()
+        if len(tmpLevels) > 0:
+            # Contour all the level values in one pass, whatever the style
+            # groups, then color the cells by the band their value is in
+            values = sorted(set([v for levels in tmpLevels for v in levels]))
             cot = vtk.vtkBandedPolyDataContourFilter()
             cot.ClippingOn()
-            # cot.SetInputData(self._vtkPolyDataFilter.GetOutput())
             cot.SetInputData(self._vtkDataSetFittedToViewport)
-            cot.SetNumberOfContours(len(l))
+            cot.SetNumberOfContours(len(values))
             cot.SetClipTolerance(0.)
-            for j, v in enumerate(l):
+            for j, v in enumerate(values):
                 cot.SetValue(j, v)
+            # cell scalars in the bands rather than band indices, the indices
+            # shift with the data range. Each cell holds the level below it,
+            # so a band does not hold its top level: cells in the gap between
+            # two bands hold the top of the band below and stay unfilled
+            cot.SetScalarModeToValue()
             cot.Update()
-
-            cots.append(cot)
-            mapper.SetInputConnection(cot.GetOutputPort())
-            lut.SetNumberOfTableValues(len(tmpColors[i]))
-            for j, color in enumerate(tmpColors[i]):
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
-                if style == 'solid':
-                    tmpOpacity = tmpOpacities[j]
-                    if tmpOpacity is None:
-                        tmpOpacity = a / 100.
-                    else:
-                        tmpOpacity = tmpOpacities[j] / 100.
-                    lut.SetTableValue(j, r / 100., g / 100., b / 100., tmpOpacity)
-                else:
-                    lut.SetTableValue(j, 1., 1., 1., 0.)
-            luts.append([lut, [0, len(l) - 1, True]])
-            mapper.SetLookupTable(lut)
-            minRange = 0
-            maxRange = len(l) - 1
-            if (i == 0 and self._scalarRange[0] < l[0]):
-                # band 0 is from self._scalarRange[0] to l[0]
-                # we don't show band 0
-                minRange += 1
-            mapper.SetScalarRange(minRange, maxRange)
-            mapper.SetScalarModeToUseCellData()
-            mappers.append(mapper)
-
-        self._resultDict["vtk_backend_luts"] = luts
-        if len(cots) > 0:
-            self._resultDict["vtk_backend_contours"] = cots
+            bands = self._prepBands(preppedCountours, cot, closed=False)
 
         numLevels = len(self._contourLevels)
-        if mappers == []:  # ok didn't need to have special banded contours
+        if bands is None:  # ok didn't need to have special banded contours
             mapper = vtk.vtkPolyDataMapper()
             mappers = [mapper]
             # Colortable bit
@@ -91,11 +63,7 @@ class IsofillPipeline(Pipeline2D):
             while len(self._contourColors) < len(self._contourLevels):
                 self._contourColors.append(self._contourColors[-1])
 
-            lut = vtk.vtkLookupTable()
-            lut.SetNumberOfTableValues(numLevels)
-            for i in range(numLevels):
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, self._contourColors[i])
-                lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+            lut = vcs2vtk.colorsLookupTable(_colorMap, self._contourColors[:numLevels])
 
             mapper.SetLookupTable(lut)
             if numpy.allclose(self._contourLevels[0], -1.e20):
@@ -114,7 +82,6 @@ class IsofillPipeline(Pipeline2D):
 
         # And now we need actors to actually render this thing
         actors = []
-        ct = 0
         vp = self._resultDict.get('ratio_autot_viewport',
                                   [self._template.data.x1, self._template.data.x2,
                                    self._template.data.y1, self._template.data.y2])
@@ -145,7 +112,6 @@ class IsofillPipeline(Pipeline2D):
             if not poly:
                 continue
 
-            patact = None
             item = None
 
             if style == "solid":
@@ -180,39 +146,31 @@ class IsofillPipeline(Pipeline2D):
             else:
                 actors.append([item, plotting_dataset_bounds])
 
-            if mapper is not self._maskedDataMapper:
+        if bands is not None:
+            area.GetDrawAreaItem().AddItem(bands.item)
+            actors.append([bands.item, plotting_dataset_bounds])
+            first = 0
+            for ct in range(len(tmpLevels)):
+                # one pattern per group, its bands are consecutive
+                last = first + len(tmpColors[ct]) - 1
                 # Since pattern creation requires a single color, assuming the first
                 c = self.getColorIndexOrRGBA(_colorMap, tmpColors[ct][0])
-
-                patact = fillareautils.make_patterned_polydata(poly,
-                                                               fillareastyle=style,
-                                                               fillareaindex=tmpIndices[ct],
-                                                               fillareacolors=c,
-                                                               fillareaopacity=tmpOpacities[ct],
-                                                               fillareapixelspacing=fareapixelspacing,
-                                                               fillareapixelscale=fareapixelscale,
-                                                               size=self._context().renWin.GetSize(),
-                                                               screenGeom=[geom[2], geom[3]],
-                                                               vpScale=[self._context_xScale, self._context_yScale])
-
-                if patact is not None:
-                    patMapper = patact.GetMapper()
-                    patMapper.Update()
-                    patPoly = patMapper.GetInput()
-
-                    patItem = vtk.vtkPolyDataItem()
-                    patItem.SetPolyData(patPoly)
-
-                    patItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                    colorArray = patPoly.GetCellData().GetArray('Colors')
-
-                    patItem.SetMappedColors(colorArray)
-                    area.GetDrawAreaItem().AddItem(patItem)
-
-                    actors.append([patItem, plotting_dataset_bounds])
-
-                # increment the count
-                ct += 1
+                # every group gets an item, even empty ones, so that updating
+                # the data can move the pattern to bands that were empty
+                patItem = bands.patternItem(first, last,
+                                            fillareastyle=style,
+                                            fillareaindex=tmpIndices[ct],
+                                            fillareacolors=c,
+                                            fillareaopacity=tmpOpacities[ct],
+                                            fillareapixelspacing=fareapixelspacing,
+                                            fillareapixelscale=fareapixelscale,
+                                            size=self._context().renWin.GetSize(),
+                                            screenGeom=[geom[2], geom[3]],
+                                            vpScale=[self._context_xScale, self._context_yScale])
+                first = last + 1
+                area.GetDrawAreaItem().AddItem(patItem)
+
+                actors.append([patItem, plotting_dataset_bounds])
 
         self._resultDict["vtk_backend_actors"] = actors
 
@@ -164,12 +164,8 @@ class IsolinePipeline(Pipeline2D):
             # TODO remove update
             cot.Update()
 
-            lut = vtk.vtkLookupTable()
-            lut.SetNumberOfTableValues(len(tmpColors[i]))
             cmap = self.getColorMap()
-            for n, col in enumerate(tmpColors[i]):
-                r, g, b, a = self.getColorIndexOrRGBA(cmap, col)
-                lut.SetTableValue(n, r / 100., g / 100., b / 100., a / 100.)
+            lut = vcs2vtk.colorsLookupTable(cmap, tmpColors[i])
 
             # Setup isoline labels
             if self._gm.label:
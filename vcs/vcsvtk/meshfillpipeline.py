@@ -1,6 +1,5 @@
 from .pipeline2d import Pipeline2D
 from .. import vcs2vtk
-from . import fillareautils
 
 import numpy
 import vcs
@@ -35,18 +34,11 @@ class MeshfillPipeline(Pipeline2D):
     def _plotInternal(self):
 
         prepedContours = self._prepContours()
-        tmpLevels = prepedContours["tmpLevels"]
-        tmpIndices = prepedContours["tmpIndices"]
-        tmpColors = prepedContours["tmpColors"]
-        tmpOpacities = prepedContours["tmpOpacities"]
 
         style = self._gm.fillareastyle
         fareapixelspacing, fareapixelscale = self._patternSpacingAndScale()
 
         mappers = []
-        luts = []
-        geos = []
-        wholeDataMin, wholeDataMax = vcs.minmax(self._data1)
         plotting_dataset_bounds = self.getPlottingBounds()
         x1, x2, y1, y2 = plotting_dataset_bounds
         # We need to do the convertion thing
@@ -58,50 +50,8 @@ class MeshfillPipeline(Pipeline2D):
         _func = vcs.utils.axisConvertFunctions[_convert]["forward"]
         x1 = _func(x1)
         x2 = _func(x2)
-        _colorMap = self.getColorMap()
-        for i, l in enumerate(tmpLevels):
-            # Ok here we are trying to group together levels can be, a join
-            # will happen if: next set of levels contnues where one left off
-            # AND pattern is identical
-            # TODO this should really just be a single polydata that is
-            # colored by scalars:
-            for j, color in enumerate(tmpColors[i]):
-                mapper = vtk.vtkPolyDataMapper()
-                lut = vtk.vtkLookupTable()
-                th = vtk.vtkThreshold()
-                th.ThresholdBetween(l[j], l[j + 1])
-                # th.SetInputConnection(self._vtkPolyDataFilter.GetOutputPort())
-                th.SetInputData(self._vtkDataSetFittedToViewport)
-                geoFilter2 = vtk.vtkDataSetSurfaceFilter()
-                geoFilter2.SetInputConnection(th.GetOutputPort())
-                # Make the polydata output available here for patterning later
-                geoFilter2.Update()
-                geos.append(geoFilter2)
-                mapper.SetInputConnection(geoFilter2.GetOutputPort())
-                lut.SetNumberOfTableValues(1)
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
-                if style == 'solid':
-                    tmpOpacity = tmpOpacities[j]
-                    if tmpOpacity is None:
-                        tmpOpacity = a / 100.
-                    else:
-                        tmpOpacity = tmpOpacities[j] / 100.
-                    lut.SetTableValue(
-                        0, r / 100., g / 100., b / 100., tmpOpacity)
-                else:
-                    lut.SetTableValue(0, 1., 1., 1., 0.)
-                mapper.SetLookupTable(lut)
-                mapper.SetScalarRange(l[j], l[j + 1])
-                luts.append([lut, [l[j], l[j + 1], True]])
-                # Store the mapper only if it's worth it?
-                # Need to do it with the whole slab min/max for animation
-                # purposes
-                if not (l[j + 1] < wholeDataMin or l[j] > wholeDataMax):
-                    mappers.append(mapper)
-
-        self._resultDict["vtk_backend_luts"] = luts
-        if len(geos) > 0:
-            self._resultDict["vtk_backend_geofilters"] = geos
+        # All the levels are drawn by a single banded item
+        bands = self._prepBands(prepedContours)
 
         if self._maskedDataMapper is not None:
             # Note that this is different for meshfill -- others prepend.
@@ -112,10 +62,17 @@ class MeshfillPipeline(Pipeline2D):
         # Add a second mapper for wireframe meshfill:
         if self._gm.mesh:
             lineMappers = []
-            for polyMapper in mappers:
+            # edges of the cells in a band
+            th = vtk.vtkThreshold()
+            th.SetInputData(self._vtkDataSetFittedToViewport)
+            th.SetInputArrayToProcess(0, 0, 0, vtk.vtkDataObject.FIELD_ASSOCIATION_CELLS, "BandIndex")
+            th.ThresholdByUpper(0)
+            bandFilter = vtk.vtkDataSetSurfaceFilter()
+            bandFilter.SetInputConnection(th.GetOutputPort())
+            for polyConnection in [bandFilter.GetOutputPort()] + [
+                    polyMapper.GetInputConnection(0, 0) for polyMapper in mappers]:
                 edgeFilter = vtk.vtkExtractEdges()
-                edgeFilter.SetInputConnection(
-                    polyMapper.GetInputConnection(0, 0))
+                edgeFilter.SetInputConnection(polyConnection)
 
                 lineMapper = vtk.vtkPolyDataMapper()
                 lineMapper.SetInputConnection(
@@ -132,8 +89,6 @@ class MeshfillPipeline(Pipeline2D):
             'ratio_autot_viewport',
             [self._template.data.x1, self._template.data.x2,
              self._template.data.y1, self._template.data.y2])
-        cti = 0
-        ctj = 0
 
         # view and interactive area
         view = self._context().contextView
@@ -152,6 +107,10 @@ class MeshfillPipeline(Pipeline2D):
 
         vcs2vtk.configureContextArea(area, drawAreaBounds, geom)
 
+        actors.extend(self._addBandItems(area, bands, prepedContours,
+                                         fareapixelspacing, fareapixelscale,
+                                         plotting_dataset_bounds))
+
         for mapper in mappers:
             act = vtk.vtkActor()
             act.SetMapper(mapper)
@@ -225,45 +184,6 @@ class MeshfillPipeline(Pipeline2D):
                 else:
                     actors.append([item, plotting_dataset_bounds])
 
-            if mapper is not self._maskedDataMapper:
-
-                if not wireframe:
-                    # Since pattern creation requires a single color, assuming the
-                    # first
-                    if ctj >= len(tmpColors[cti]):
-                        ctj = 0
-                        cti += 1
-                    c = self.getColorIndexOrRGBA(_colorMap, tmpColors[cti][ctj])
-
-                    patact = fillareautils.make_patterned_polydata(poly,
-                                                                   fillareastyle=style,
-                                                                   fillareaindex=tmpIndices[cti],
-                                                                   fillareacolors=c,
-                                                                   fillareaopacity=tmpOpacities[cti],
-                                                                   fillareapixelspacing=fareapixelspacing,
-                                                                   fillareapixelscale=fareapixelscale,
-                                                                   size=self._context().renWin.GetSize(),
-                                                                   screenGeom=self._context().renWin.GetSize())
-                    ctj += 1
-
-                    if patact is not None:
-                        actors.append([patact, plotting_dataset_bounds])
-
-                        patMapper = patact.GetMapper()
-                        patMapper.Update()
-                        patPoly = patMapper.GetInput()
-
-                        patItem = vtk.vtkPolyDataItem()
-                        patItem.SetPolyData(patPoly)
-
-                        patItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                        colorArray = patPoly.GetCellData().GetArray('Colors')
-
-                        patItem.SetMappedColors(colorArray)
-                        area.GetDrawAreaItem().AddItem(patItem)
-
-                        actors.append([patItem, plotting_dataset_bounds])
-
         z, t = self.getZandT()
 
         self._resultDict["vtk_backend_actors"] = actors
@@ -1,4 +1,5 @@
 from .pipeline import Pipeline
+from ..decorations import Decorations
 
 import numpy
 import vcs
@@ -48,35 +49,10 @@ class Pipeline1D(Pipeline):
             Y = smooth(Y, self._gm.smooth)
         Y = self.convertAxis(cdms2.createAxis(Y), "y")
 
-        ln_tmp = self._context().canvas.createline()
-        try:  # Need to squeeze or list it too deep
-            Xs = X[:](squeeze=1).tolist()
-        except Exception:
-            Xs = X[:].tolist()
-        try:  # Need to squeeze or list it too deep
-            Ys = Y[:](squeeze=1).tolist()
-        except Exception:
-            Ys = Y[:].tolist()
-
-        xs = []
-        ys = []
-        prev = None
-        for i, v in enumerate(Ys):
-            if v is not None and Xs[i] is not None:  # Valid data
-                if prev is None:
-                    prev = []
-                    prev2 = []
-                prev.append(Xs[i])
-                prev2.append(v)
-            else:
-                if prev is not None:
-                    xs.append(prev)
-                    ys.append(prev2)
-                    prev = None
-
-        if prev is not None:
-            xs.append(prev)
-            ys.append(prev2)
+        decorations = Decorations(self._context().canvas)
+        ln_tmp = decorations.createline()
+        # runs of valid points are drawn as separate lines
+        xs, ys = vcs.utils.lineRuns(X[:], Y[:])
 
         ln_tmp._x = xs
         ln_tmp._y = ys
@@ -109,55 +85,81 @@ class Pipeline1D(Pipeline):
             x2 += .0001
 
         ln_tmp._worldcoordinate = [x1, x2, y1, y2]
+        result = {}
+        # markers are drawn on every point, only the line is decimated
+        markerXs, markerYs = list(xs), list(ys)
+        lod = self._decimateRuns(xs, ys, tmpl, ln_tmp._worldcoordinate)
+        if lod is not None:
+            result["vtk_backend_lod1d"] = lod
         if self._gm.marker is not None:
-            m = self._context().canvas.createmarker()
+            m = decorations.createmarker()
             m.type = self._gm.marker
             m.color = [self._gm.markercolor, ]
             if self._gm.markersize > 0:
                 m.size = self._gm.markersize
             else:
                 m.priority = 0
-            m._x = ln_tmp.x
-            m._y = ln_tmp.y
+            m._x = markerXs
+            m._y = markerYs
             m._viewport = ln_tmp.viewport
             m._worldcoordinate = ln_tmp.worldcoordinate
 
         if not (Y[:].min() > max(y1, y2) or Y[:].max() < min(y1, y2) or
                 X[:].min() > max(x1, x2) or X[:].max() < min(x1, x2)):
             if ln_tmp.priority > 0:
-                self._context().canvas.plot(ln_tmp, donotstoredisplay=True)
+                decorations.plot(ln_tmp)
             if self._gm.marker is not None and m.priority > 0:
-                self._context().canvas.plot(m, donotstoredisplay=True)
+                decorations.plot(m)
 
         if hasattr(data1, "_yname"):
             del(data1._yname)
-        del(vcs.elements["line"][ln_tmp.name])
-        if self._gm.marker is not None:
-            del(vcs.elements["marker"][m.name])
 
         if tmpl.legend.priority > 0:
-            legd = self._context().canvas.createline()
+            legd = decorations.createline()
             legd.x = [tmpl.legend.x1, tmpl.legend.x2]
             legd.y = [tmpl.legend.y1, tmpl.legend.y1]  # [y1, y1] intentional.
             legd.color = ln_tmp.color
             legd.width = ln_tmp.width
             legd.type = ln_tmp.type
-            t = self._context().canvas.createtext(
+            t = decorations.createtext(
                 To_source=tmpl.legend.textorientation,
                 Tt_source=tmpl.legend.texttable)
             t.x = tmpl.legend.x2
             t.y = tmpl.legend.y2
             t.string = data1.id
-            self._context().canvas.plot(t, donotstoredisplay=True)
-            sp = t.name.split(":::")
-            del(vcs.elements["texttable"][sp[0]])
-            del(vcs.elements["textorientation"][sp[1]])
-            del(vcs.elements["textcombined"][t.name])
-            self._context().canvas.plot(legd, donotstoredisplay=True)
-            del(vcs.elements["line"][legd.name])
+            decorations.plot(t)
+            decorations.plot(legd)
+        decorations.draw()
         z, t = self.getZandT()
         self._context().renderTemplate(
             tmpl,
             self._data1,
             self._gm, t, z)
-        return {}
+        return result
+
+    def _decimateRuns(self, xs, ys, tmpl, wc):
+        """Decimates the runs xs, ys in place down to a few points per pixel
+        column of the template data area when the 'lod' plot keyword is set.
+
+        lod=True uses "minmax", or pass "minmax" or "lttb", other methods (of 2D
+        plots) fall back to "minmax", see vcs.utils.lodMethod. Runs are
+        decimated along x, or along y for flipped graphics methods.
+        Returns the (columns, method) used, None if nothing was done.
+        """
+        method = vcs.utils.lodMethod(self._plot_kargs.get("lod", False), ("minmax", "lttb"), "minmax")
+        if method is None:
+            return None
+        width, height = self._context().renWin.GetSize()
+        x1, x2, y1, y2 = wc
+        if self._gm.flip:
+            along, across = ys, xs
+            columns = int(abs(tmpl.data.y2 - tmpl.data.y1) * height)
+            wc1, wc2 = y1, y2
+        else:
+            along, across = xs, ys
+            columns = int(abs(tmpl.data.x2 - tmpl.data.x1) * width)
+            wc1, wc2 = x1, x2
+        for i in range(len(along)):
+            pixels = vcs.utils.lineColumns(along[i], wc1, wc2, max(columns, 1))
+            along[i], across[i] = vcs.utils.decimate1D(along[i], across[i], pixels, method)
+        return (columns, method)
@@ -2,6 +2,7 @@ from .pipeline import Pipeline
 from .. import vcs2vtk
 
 from . import fillareautils
+import cdms2
 import numpy
 import vcs
 import vtk
@@ -58,6 +59,9 @@ class IPipeline2D(Pipeline):
         - _scalarRange: The range of _data1 as tuple(float min, float max)
         - _vectorRange: The range of the vector magnitude formed from _data1, _data2
         - _maskedDataMapper: The mapper used to render masked data.
+        - _lodMethod: The vcs.utils.blockReduce2D method used when the 'lod'
+            plot keyword is True, None if the plot does not support level of
+            detail.
     """
 
     def __init__(self, gm, context_, plot_keyargs):
@@ -89,6 +93,7 @@ class IPipeline2D(Pipeline):
         self._scalarRange = None
         self._vectorRange = [0.0, 0.0]
         self._maskedDataMapper = None
+        self._lodMethod = None
 
     def _updateScalarData(self):
         """Create _data1 and _data2 from _originalData1 and _originalData2."""
@@ -273,6 +278,72 @@ class Pipeline2D(IPipeline2D):
 
         return result
 
+    def _prepBands(self, prepedContours, polyFilter=None, closed=True):
+        """Returns a vcs2vtk.BandedFill coloring the output of polyFilter (the
+        fitted dataset by default) with the bands of _prepContours, one band
+        per color. The top level of a band is in it when closed, as for data
+        values. Non solid fills are transparent, their patterns are drawn
+        by _addBandItems."""
+        tmpLevels = prepedContours["tmpLevels"]
+        tmpColors = prepedContours["tmpColors"]
+        tmpOpacities = prepedContours["tmpOpacities"]
+        style = self._gm.fillareastyle
+        _colorMap = self.getColorMap()
+        lows = []
+        highs = []
+        colors = []
+        self._bandGroups = []
+        for i, l in enumerate(tmpLevels):
+            for j, color in enumerate(tmpColors[i]):
+                lows.append(l[j])
+                highs.append(l[j + 1])
+                self._bandGroups.append((i, color))
+                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
+                if style == 'solid':
+                    tmpOpacity = tmpOpacities[j]
+                    if tmpOpacity is None:
+                        tmpOpacity = a / 100.
+                    else:
+                        tmpOpacity = tmpOpacities[j] / 100.
+                    colors.append([r / 100., g / 100., b / 100., tmpOpacity])
+                else:
+                    colors.append([1., 1., 1., 0.])
+        if polyFilter is None:
+            polyFilter = self._vtkPolyDataFilter
+        bands = vcs2vtk.BandedFill(polyFilter, lows, highs, colors, closed)
+        self._resultDict["vtk_backend_bands"] = bands
+        return bands
+
+    def _addBandItems(self, area, bands, prepedContours, fareapixelspacing,
+                      fareapixelscale, plotting_dataset_bounds):
+        """Adds the banded fill to area, then the pattern of each band.
+        Returns the [item, bounds] actors."""
+        area.GetDrawAreaItem().AddItem(bands.item)
+        actors = [[bands.item, plotting_dataset_bounds]]
+        style = self._gm.fillareastyle
+        if style == 'solid':
+            return actors
+        _colorMap = self.getColorMap()
+        for index, (i, color) in enumerate(self._bandGroups):
+            # Since pattern creation requires a single color, assuming the first
+            c = self.getColorIndexOrRGBA(_colorMap, color)
+            # every band gets an item, even empty ones, so that updating the
+            # data can move the pattern to bands that were empty
+            patItem = bands.patternItem(
+                index,
+                fillareastyle=style,
+                fillareaindex=prepedContours["tmpIndices"][i],
+                fillareacolors=c,
+                fillareaopacity=prepedContours["tmpOpacities"][i],
+                fillareapixelspacing=fareapixelspacing,
+                fillareapixelscale=fareapixelscale,
+                size=self._context().renWin.GetSize(),
+                screenGeom=self._context().renWin.GetSize())
+            area.GetDrawAreaItem().AddItem(patItem)
+
+            actors.append([patItem, plotting_dataset_bounds])
+        return actors
+
     def plot(self, data1, data2, tmpl, grid, transform, **kargs):
         """Overrides baseclass implementation."""
         # Clear old results:
@@ -286,9 +357,11 @@ class Pipeline2D(IPipeline2D):
 
         # Preprocess the input scalar data:
         self._updateScalarData()
+        # automatic levels span the full data, not its aggregation
         self._min = self._data1.min()
         self._max = self._data1.max()
         self._scalarRange = vcs.minmax(self._data1)
+        self._updateLevelOfDetail()
 
         # Create/update the VTK dataset.
         plotBasedDualGrid = kargs.get('plot_based_dual_grid', True)
@@ -338,6 +411,45 @@ class Pipeline2D(IPipeline2D):
         self._data1 = vcs.utils.trimData2D(data1, frame=frame)
         self._data2 = vcs.utils.trimData2D(self._originalData2, frame=frame)
 
+    def _updateLevelOfDetail(self):
+        """Block-aggregates _data1 down to about one cell per pixel of the
+        template data area when the 'lod' plot keyword is set.
+
+        lod=True uses the method of the graphics method, or pass "mean", "max"
+        or "nearest", other methods (of 1D plots) fall back to the graphics
+        method's, see vcs.utils.lodMethod. Only rectilinear scalar data is
+        aggregated.
+        """
+        method = vcs.utils.lodMethod(self._plot_kargs.get("lod", False),
+                                     ("mean", "max", "nearest"), self._lodMethod)
+        if method is None:
+            return
+        # a grid handed to plot() matches the full resolution data
+        if self._vtkDataSet is not None or self._data2 is not None:
+            return
+        grid = self._data1.getGrid()
+        if isinstance(grid, (cdms2.hgrid.AbstractCurveGrid, cdms2.gengrid.AbstractGenericGrid)):
+            return
+        width, height = self._context().renWin.GetSize()
+        pixels = (self._lodPixels(self._data1.getAxis(-2), self._gm.datawc_y1, self._gm.datawc_y2,
+                                  (self._template.data.y2 - self._template.data.y1) * height),
+                  self._lodPixels(self._data1.getAxis(-1), self._gm.datawc_x1, self._gm.datawc_x2,
+                                  (self._template.data.x2 - self._template.data.x1) * width))
+        factors = vcs.utils.lodFactors(self._data1.shape, pixels)
+        if factors != (1, 1):
+            self._data1 = vcs.utils.blockReduce2D(self._data1, factors, method)
+            # VTKPlots.update_input aggregates new data the same way
+            self._resultDict["vtk_backend_lod"] = (factors, method)
+
+    def _lodPixels(self, axis, wc1, wc2, pixels):
+        """Returns how many pixels the whole axis would span when only the
+        world coordinates wc1 to wc2 are shown on 'pixels'."""
+        if numpy.allclose([wc1, wc2], 1.e20):
+            return abs(pixels)
+        values = axis[:]
+        shown = numpy.count_nonzero((values >= min(wc1, wc2)) & (values <= max(wc1, wc2)))
+        return abs(pixels) * len(values) / max(shown, 1)
+
     def _updateVTKDataSet(self, plotBasedDualGrid):
         """
         """
@@ -222,11 +222,7 @@ class StreamlinePipeline(Pipeline2D):
             while len(self._contourColors) < numLevels:
                 self._contourColors.append(self._contourColors[-1])
 
-            lut = vtk.vtkLookupTable()
-            lut.SetNumberOfTableValues(numLevels)
-            for i in range(numLevels):
-                r, g, b, a = self.getColorIndexOrRGBA(cmap, self._contourColors[i])
-                lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+            lut = vcs2vtk.colorsLookupTable(cmap, self._contourColors[:numLevels])
             lut.SetVectorModeToMagnitude()
             if numpy.allclose(self._contourLevels[0], -1.e20):
                 lmn = self._vectorRange[0]